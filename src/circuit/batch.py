@@ -0,0 +1,208 @@
+"""
+Batch simulation of circuit families sharing column prefixes.
+
+Circuits that only differ in their last columns share the states of their
+common prefix. The batch simulator inserts every circuit into a trie whose
+edges are column contents (the gate signatures in application order) and
+whose roots are the distinct input states, then walks the trie depth first.
+Each distinct prefix is simulated once, and the state is branched where
+circuits diverge, so a variant sweep costs the number of distinct columns
+rather than the total number of columns.
+
+A branch point holds its state until its last child has been simulated.
+With a memory limit, held states closest to the root are dropped first and
+recomputed from the nearest ancestor that still holds its state. A per-column
+run returns the state of every distinct column, so its memory is bounded by
+the result itself and it takes no memory limit.
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    BatchResult: States of every circuit and the work counters of a batch.
+
+Functions:
+    simulate(circuits, per_column, memory_limit, cache): Simulates a batch of
+                                                         circuits.
+"""
+
+import numpy as np
+import qubit.engine as qe
+import qubit.qubit as qb
+import circuit.cache as qcache
+
+
+class _Node:
+    """Trie node holding the gates of one column."""
+
+    __slots__ = ("gates", "parent", "depth", "children", "state", "pending",
+                 "finals")
+
+    def __init__(self, gates, parent):
+        self.gates = gates
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.children = {}
+        self.state = None
+        self.pending = 0
+        self.finals = []
+
+
+class BatchResult:
+    """States of a simulated batch of circuits.
+
+    Attributes:
+        states (list): Per circuit, the final qubit.qubit.Qubit, or the list
+                       of column states if simulated per column.
+        total_columns (int): Number of columns over all circuits.
+        simulated_columns (int): Number of non-empty columns simulated,
+                                 recomputations excluded.
+        recomputed_columns (int): Columns simulated again after their state
+                                  was dropped for the memory limit.
+        cache_hits (int): Circuits answered by the result cache.
+    """
+
+    def __init__(self, states, total_columns, simulated_columns,
+                 recomputed_columns, cache_hits):
+        self.states = states
+        self.total_columns = total_columns
+        self.simulated_columns = simulated_columns
+        self.recomputed_columns = recomputed_columns
+        self.cache_hits = cache_hits
+
+    def __len__(self):
+        """Return the number of circuits."""
+        return len(self.states)
+
+    def __repr__(self) -> str:
+        return (f"BatchResult(circuits={len(self)}, "
+                f"total_columns={self.total_columns}, "
+                f"simulated_columns={self.simulated_columns}, "
+                f"recomputed_columns={self.recomputed_columns}, "
+                f"cache_hits={self.cache_hits})")
+
+
+def _advance(state, gates):
+    """Returns the state after a column, sharing it for empty columns."""
+    if not gates:
+        return state
+    mat = np.array(state.mat, dtype=np.complex128, order='C')
+    qe.apply_gates(mat, gates)
+    ret = qb.Qubit()
+    ret.mat = mat
+    return ret
+
+
+def simulate(circuits, per_column=False, memory_limit=None, cache=None):
+    """Simulates many circuits, sharing the states of common prefixes.
+
+    Args:
+        circuits (list): circuit.quantum_circuit.QuantumCircuit objects
+                         without unbound parameters.
+        per_column (bool, optional): Return every column state instead of
+                                     only the final state (default is False).
+        memory_limit (int, optional): Bytes of branch-point states to hold
+                                      at once (default is unlimited). Only
+                                      applies to final-state runs.
+        cache (circuit.cache.ResultCache, optional): Consulted before
+                                                     simulating a circuit.
+
+    Returns:
+        BatchResult: The states and the work counters.
+
+    Raises:
+        ValueError: If a memory limit is given for a per-column run, whose
+                    result keeps every column state.
+    """
+    if per_column and memory_limit is not None:
+        raise ValueError("memory_limit only applies to final-state runs; "
+                         "a per-column result keeps every column state")
+    states = [None] * len(circuits)
+    roots = {}
+    paths = {}
+    total = hits = 0
+    for index, circuit in enumerate(circuits):
+        total += circuit._shape[1]
+        if cache is not None:
+            result = cache.get(qcache.circuit_key(circuit))
+            if result is not None:
+                hits += 1
+                qubits = result.qubits()
+                states[index] = qubits if per_column else qubits[-1]
+                continue
+        key = (circuit._shape[0], circuit._qubit.mat.tobytes())
+        if key not in roots:
+            roots[key] = _Node([], None)
+            roots[key].state = circuit._qubit
+        node = roots[key]
+        path = []
+        for col in range(circuit._shape[1]):
+            gates = circuit._column_gates(col)
+            signature = tuple(gate.signature() for gate in gates)
+            if signature not in node.children:
+                node.children[signature] = _Node(gates, node)
+            node = node.children[signature]
+            path.append(node)
+        node.finals.append(index)
+        paths[index] = path
+        if not path:
+            states[index] = [] if per_column else circuit._qubit
+
+    column_states = {}
+    held = {}
+    counters = {"simulated": 0, "recomputed": 0}
+
+    def state_of(node):
+        """Returns the state of a node, recomputing it if it was dropped."""
+        chain = []
+        while node.state is None:
+            chain.append(node)
+            node = node.parent
+        state = node.state
+        for lost in reversed(chain):
+            state = _advance(state, lost.gates)
+            counters["recomputed"] += bool(lost.gates)
+        return state
+
+    def hold(node):
+        """Keeps a branch-point state, dropping others over the limit."""
+        held[node] = node.state
+        if memory_limit is None:
+            return
+        while len(held) > 1 and \
+                sum(state.mat.nbytes for state in held.values()) > memory_limit:
+            victim = min(held, key=lambda other: other.depth)
+            victim.state = None
+            del held[victim]
+
+    for root in roots.values():
+        stack = list(root.children.values())
+        root.pending = len(stack)
+        while stack:
+            node = stack.pop()
+            node.state = _advance(state_of(node.parent), node.gates)
+            counters["simulated"] += bool(node.gates)
+            parent = node.parent
+            parent.pending -= 1
+            if parent.pending == 0 and parent.parent is not None:
+                parent.state = None
+                held.pop(parent, None)
+
+            if per_column:
+                column_states[node] = node.state
+            for index in node.finals:
+                if not per_column:
+                    states[index] = node.state
+            if node.children:
+                node.pending = len(node.children)
+                hold(node)
+                stack.extend(node.children.values())
+            else:
+                node.state = None
+
+    if per_column:
+        for index, path in paths.items():
+            states[index] = [column_states[node] for node in path]
+    return BatchResult(states, total, counters["simulated"],
+                       counters["recomputed"], hits)
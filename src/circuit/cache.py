@@ -0,0 +1,247 @@
+"""
+Persistent result cache for quantum circuits.
+
+Simulated column states and their entanglement partitions are stored in a
+local SQLite database, keyed by a canonical hash of the circuit. The hash
+covers the register size, the gates of every column in application order
+(by `Base.signature()`, so control order does not matter), the input state,
+the backend, the precision and `Schema_version`, which is bumped whenever a
+gate definition or the stored format changes; a database written with
+another version is emptied on open. Entries are evicted least recently used
+first once the stored data exceeds a size bound, and hits and misses are
+counted in the database so the hit rate survives restarts.
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    CachedResult: Column states and entanglement partitions of a circuit.
+    ResultCache: Size-bounded LRU cache of circuit results on disk.
+
+Functions:
+    circuit_key(circuit, backend, precision): Canonical hash of a circuit.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+import qubit.qubit as qb
+
+Default_path = os.path.join(os.path.expanduser("~"), ".cache",
+                            "entanglement_visualizer", "results.sqlite")
+Default_max_bytes = 256 * 2**20
+Schema_version = 1
+
+
+def circuit_key(circuit, backend="statevector", precision="complex128"):
+    """Computes the canonical hash of a circuit.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+        backend (str, optional): Simulation backend name.
+        precision (str, optional): Amplitude dtype name.
+
+    Returns:
+        str: Hex digest identifying the circuit result.
+    """
+    columns = [[gate.signature() for gate in circuit._column_gates(col)]
+               for col in range(circuit._shape[1])]
+    digest = hashlib.sha256()
+    digest.update(repr((Schema_version, circuit._shape, columns, backend,
+                        precision)).encode())
+    digest.update(np.ascontiguousarray(circuit._qubit.mat,
+                                       dtype=np.complex128).tobytes())
+    return digest.hexdigest()
+
+
+class CachedResult:
+    """Column states and entanglement partitions of a circuit.
+
+    Attributes:
+        states (numpy.ndarray): State after every column, shape
+                                (gate_num, 2^n).
+        entanglement (list): Per column, the list of entangled qubit sets.
+    """
+
+    def __init__(self, states, entanglement):
+        self.states = states
+        self.entanglement = entanglement
+
+    @property
+    def final_state(self):
+        """The state after the last column as a flat array."""
+        return self.states[-1]
+
+    def qubits(self):
+        """Converts the column states into Qubit objects.
+
+        Consecutive equal columns share one Qubit, as in
+        `QuantumCircuit.calculate_qubit_state`.
+
+        Returns:
+            list: One qubit.qubit.Qubit per column.
+        """
+        ret = []
+        for col, mat in enumerate(self.states):
+            if col and np.array_equal(mat, self.states[col - 1]):
+                ret.append(ret[-1])
+                continue
+            state = qb.Qubit()
+            state.mat = mat.reshape(-1, 1).copy()
+            ret.append(state)
+        return ret
+
+
+class ResultCache:
+    """Size-bounded LRU cache of circuit results in a SQLite file.
+
+    Attributes:
+        path (str): Location of the database.
+        max_bytes (int): Upper bound of the stored result data.
+    """
+
+    def __init__(self, path=None, max_bytes=Default_max_bytes):
+        """Opens (or creates) the cache database.
+
+        Entries written with another `Schema_version` are dropped.
+
+        Args:
+            path (str, optional): Database file; ":memory:" keeps the cache
+                                  in memory. Defaults to `Default_path`.
+            max_bytes (int, optional): Upper bound of the stored data.
+        """
+        self.path = Default_path if path is None else path
+        self.max_bytes = max_bytes
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)),
+                        exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT "
+                         "PRIMARY KEY, states BLOB, entanglement TEXT, "
+                         "size INTEGER, last_used REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT "
+                         "PRIMARY KEY, value INTEGER)")
+        self._db.executemany("INSERT OR IGNORE INTO stats VALUES (?, 0)",
+                             [("hits",), ("misses",)])
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version != Schema_version:
+            # results of another build may be stale
+            self._db.execute("DELETE FROM results")
+            self._db.execute(f"PRAGMA user_version = {int(Schema_version)}")
+        self._db.commit()
+
+    def close(self):
+        """Closes the database connection."""
+        self._db.close()
+
+    def _count(self, name):
+        """Increments a statistics counter (committed by the caller)."""
+        self._db.execute("UPDATE stats SET value = value + 1 WHERE name = ?",
+                         (name,))
+
+    def get(self, key):
+        """Looks up a result and marks it as recently used.
+
+        Args:
+            key (str): Key from `circuit_key`.
+
+        Returns:
+            CachedResult: The stored result, or None on a miss.
+        """
+        row = self._db.execute("SELECT states, entanglement FROM results "
+                               "WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            self._db.commit()
+            return None
+        self._count("hits")
+        self._db.execute("UPDATE results SET last_used = ? WHERE key = ?",
+                         (time.time(), key))
+        self._db.commit()
+        states = np.load(io.BytesIO(row[0]))["states"]
+        entanglement = [[set(group) for group in groups]
+                        for groups in json.loads(row[1])]
+        return CachedResult(states, entanglement)
+
+    def put(self, key, states, entanglement):
+        """Stores a result and evicts least recently used entries.
+
+        Args:
+            key (str): Key from `circuit_key`.
+            states (numpy.ndarray): Column states, shape (gate_num, 2^n).
+            entanglement (list): Per column, the list of entangled sets.
+
+        Returns:
+            bool: False if the result alone exceeds `max_bytes`.
+        """
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, states=np.asarray(states))
+        blob = buffer.getvalue()
+        if len(blob) > self.max_bytes:
+            return False
+        groups = json.dumps([[[int(q) for q in sorted(group)]
+                              for group in groups]
+                             for groups in entanglement])
+        self._db.execute("INSERT OR REPLACE INTO results VALUES "
+                         "(?, ?, ?, ?, ?)",
+                         (key, blob, groups, len(blob), time.time()))
+        total = self._db.execute("SELECT SUM(size) FROM results").fetchone()[0]
+        rows = self._db.execute("SELECT key, size FROM results "
+                                "ORDER BY last_used").fetchall()
+        for old_key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM results WHERE key = ?", (old_key,))
+            total -= size
+        self._db.commit()
+        return True
+
+    def run(self, circuit, optimize=False, backend="statevector",
+            precision="complex128"):
+        """Calculates a circuit, consulting the cache first.
+
+        Args:
+            circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+            optimize (bool, optional): Use the optimization pass on a miss.
+            backend (str, optional): Simulation backend name.
+            precision (str, optional): Amplitude dtype name.
+
+        Returns:
+            tuple: (states, entanglement) as returned by
+                   `calculate_qubit_state` and `calculate_entanglement`.
+        """
+        key = circuit_key(circuit, backend, precision)
+        result = self.get(key)
+        if result is not None:
+            return result.qubits(), result.entanglement
+        states = circuit.calculate_qubit_state(optimize=optimize)
+        entanglement = circuit.calculate_entanglement(states)
+        if states:
+            self.put(key, np.stack([state.mat[:, 0] for state in states]),
+                     entanglement)
+        return states, entanglement
+
+    def stats(self):
+        """Reports the cache usage.
+
+        Returns:
+            dict: hits, misses, hit_rate, entries and bytes.
+        """
+        counts = dict(self._db.execute("SELECT name, value FROM stats"))
+        entries, size = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        lookups = counts["hits"] + counts["misses"]
+        return {"hits": counts["hits"], "misses": counts["misses"],
+                "hit_rate": counts["hits"] / lookups if lookups else 0.0,
+                "entries": entries, "bytes": size}
+
+    def clear(self):
+        """Removes every entry and resets the statistics."""
+        self._db.execute("DELETE FROM results")
+        self._db.execute("UPDATE stats SET value = 0")
+        self._db.commit()
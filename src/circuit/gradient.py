@@ -0,0 +1,94 @@
+"""
+Adjoint-method gradients of parameterized circuits.
+
+The adjoint method computes the derivative of <psi|H|psi> with respect to
+every circuit parameter from one forward sweep and one backward sweep over
+the gate sequence. Going backwards, the state is un-computed with the
+adjoint of each gate and the co-state lambda = U_k^+ ... U_N^+ H |psi> is
+carried along, so only three state vectors are alive at any time instead of
+the per-column list built by `QuantumCircuit.calculate_qubit_state`.
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    GradientResult: Expectation value, gradients and sweep timings.
+
+Functions:
+    adjoint_gradient(circuit, observable, values): Computes all parameter
+                                                   gradients.
+"""
+
+import time
+import numpy as np
+import qubit.engine as qe
+import qubit.gates as qg
+import qubit.pauli as qp
+
+
+class GradientResult:
+    """Result of an adjoint gradient evaluation.
+
+    Attributes:
+        value (float): Expectation value <psi|H|psi> of the final state.
+        gradients (dict): d<H>/d(parameter) keyed by parameter name.
+        forward_time (float): Seconds spent in the forward sweep.
+        backward_time (float): Seconds spent in the backward sweep.
+    """
+
+    def __init__(self, value, gradients, forward_time, backward_time):
+        self.value = value
+        self.gradients = gradients
+        self.forward_time = forward_time
+        self.backward_time = backward_time
+
+    def __repr__(self) -> str:
+        return (f"GradientResult(value={self.value:.6g}, "
+                f"gradients={self.gradients}, "
+                f"forward_time={self.forward_time:.3g}s, "
+                f"backward_time={self.backward_time:.3g}s)")
+
+
+def adjoint_gradient(circuit, observable, values):
+    """Computes the gradient of an expectation value by the adjoint method.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+        observable (str, list or dict): Pauli string, list of strings or
+                                        {pauli: coefficient} dict.
+        values (dict): Values of every circuit parameter keyed by name.
+
+    Returns:
+        GradientResult: Expectation value, gradients and timings.
+
+    Raises:
+        ValueError: If a parameter has no value.
+    """
+    values = {(key.name if isinstance(key, qg.Parameter) else key): float(value)
+              for key, value in values.items()}
+    gates = [gate for _, gate in circuit.gate_sequence()]
+
+    start = time.perf_counter()
+    phi = np.array(circuit._qubit.mat, dtype=np.complex128, order='C')
+    for gate in gates:
+        qe.apply_gate(phi, gate, values)
+    lam = np.ascontiguousarray(qp.apply_observable(phi, observable))
+    value = float(np.vdot(phi, lam).real)
+    forward_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    gradients = {name: 0.0 for name in circuit.parameters}
+    for gate in reversed(gates):
+        qe.apply_gate(phi, gate, values, adjoint=True)
+        if gate.parameters:
+            mu = phi.copy()
+            qe.apply_matrix(mu, gate.base_derivative(values), gate._target,
+                            gate.controls, gate.polarity)
+            qe.project_controls(mu, gate.controls, gate.polarity)
+            for name in gate.parameters:
+                gradients[name] += 2 * np.vdot(lam, mu).real
+        qe.apply_gate(lam, gate, values, adjoint=True)
+    backward_time = time.perf_counter() - start
+
+    return GradientResult(value, gradients, forward_time, backward_time)
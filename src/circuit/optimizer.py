@@ -0,0 +1,170 @@
+"""
+Gate cancellation and commutation pass for quantum circuits.
+
+The pass walks the gates of a `QuantumCircuit` in application order and
+keeps a list of surviving gates. A new gate is moved backwards past every
+kept gate it commutes with; if it meets an identical self-inverse gate
+(X, Y, Z, H, Swap with the same target and controls) both are removed.
+
+Two gates commute when they agree on every qubit they share: control qubits
+and diagonal targets act diagonally ('D'), X/RX targets act along X, Y/RY
+along Y and H targets as H. Operators of the same kind commute, so gates
+acting on disjoint qubits, diagonal gates among each other and a control
+next to a Z all commute.
+
+The surviving gates after each column (its prefix) determine the state
+after that column. Columns whose prefix equals the one of an earlier column
+provably leave that state unchanged, so the state can be shared instead of
+simulated.
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    Optimization: Result of the optimization pass.
+
+Functions:
+    actions(gate): Kind of operator a gate applies to each of its qubits.
+    commutes(a, b): Checks if two gates commute.
+    cancels(a, b): Checks if two gates multiply to the identity.
+    optimize(circuit): Runs the pass over a circuit.
+"""
+
+import qubit.gates as qg
+
+Self_inverse = {"X", "Y", "Z", "H", "Swap"}
+
+
+class Optimization:
+    """Result of the optimization pass.
+
+    Attributes:
+        gates (list): Surviving (col, gate) pairs in application order.
+        prefixes (list): Per column, the ids of the gates surviving after
+                         that column. Gate ids are positions in
+                         `QuantumCircuit.gate_sequence()`.
+        same_as (list): Per column, the earliest column (-1 for the input)
+                        with the same prefix, i.e. the same state, or None.
+        removed (int): Number of gates cancelled.
+    """
+
+    def __init__(self, gates, prefixes, same_as, removed):
+        self.gates = gates
+        self.prefixes = prefixes
+        self.same_as = same_as
+        self.removed = removed
+
+    @property
+    def identity_columns(self):
+        """Columns that provably leave the state unchanged, empty ones too."""
+        previous = ()
+        ret = []
+        for col, prefix in enumerate(self.prefixes):
+            if prefix == previous:
+                ret.append(col)
+            previous = prefix
+        return ret
+
+    def __repr__(self) -> str:
+        return (f"Optimization(gates={len(self.gates)}, "
+                f"removed={self.removed}, "
+                f"identity_columns={self.identity_columns})")
+
+
+def actions(gate):
+    """Gets the kind of operator a gate applies to each of its qubits.
+
+    Args:
+        gate (qubit.gates.Base): The gate.
+
+    Returns:
+        dict: {qubit: kind}; kind is 'D', 'X', 'Y', 'H' or None for an
+              operator that commutes with nothing else on that qubit.
+    """
+    if isinstance(gate, qg.Swap):
+        return {gate._target: None, gate._control: None}
+    if isinstance(gate, qg.Diagonal):
+        kind = 'D'
+    elif isinstance(gate, (qg.X, qg.RX)):
+        kind = 'X'
+    elif isinstance(gate, (qg.Y, qg.RY)):
+        kind = 'Y'
+    elif isinstance(gate, qg.H):
+        kind = 'H'
+    else:
+        kind = None
+    ret = {control: 'D' for control in gate.controls}
+    ret[gate._target] = kind
+    return ret
+
+
+def commutes(a, b):
+    """Checks if two gates commute.
+
+    Args:
+        a (qubit.gates.Base): The first gate.
+        b (qubit.gates.Base): The second gate.
+
+    Returns:
+        bool: True if ab = ba is guaranteed.
+    """
+    acts_a, acts_b = actions(a), actions(b)
+    for qubit, kind in acts_a.items():
+        if qubit in acts_b and (kind is None or kind != acts_b[qubit]):
+            return False
+    return True
+
+
+def cancels(a, b):
+    """Checks if two gates are the same self-inverse gate.
+
+    Args:
+        a (qubit.gates.Base): The first gate.
+        b (qubit.gates.Base): The second gate.
+
+    Returns:
+        bool: True if ab is the identity.
+    """
+    signature = a.signature()
+    return signature[0] in Self_inverse and signature == b.signature()
+
+
+def optimize(circuit):
+    """Cancels self-inverse gate pairs through commuting gates.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+
+    Returns:
+        Optimization: Surviving gates and per-column prefixes.
+    """
+    kept = []
+    prefixes = []
+    removed = 0
+    sequence = list(circuit.gate_sequence())
+    position = 0
+    for col in range(circuit._shape[1]):
+        while position < len(sequence) and sequence[position][0] == col:
+            gate = sequence[position][1]
+            for i in range(len(kept) - 1, -1, -1):
+                other = sequence[kept[i]][1]
+                if cancels(other, gate):
+                    del kept[i]
+                    removed += 2
+                    break
+                if not commutes(other, gate):
+                    kept.append(position)
+                    break
+            else:
+                kept.append(position)
+            position += 1
+        prefixes.append(tuple(kept))
+
+    first = {(): -1}
+    same_as = []
+    for col, prefix in enumerate(prefixes):
+        same_as.append(first.get(prefix))
+        first.setdefault(prefix, col)
+    return Optimization([sequence[i] for i in kept], prefixes, same_as,
+                        removed)
@@ -0,0 +1,296 @@
+"""
+Resource estimation and backend planning for quantum circuits.
+
+The planner inspects a circuit (qubit count, gate kinds, controlled-gate
+connectivity, Clifford-ness, depth) and predicts the run time and peak
+memory of every simulation strategy the package offers:
+
+* classical: basis-state bitstrings through (multi-)controlled X gates,
+* statevector: one state per column, as `calculate_qubit_state`,
+* final_state: only the output state, as `final_state`,
+* distributed: the output state partitioned across worker processes,
+* density_matrix: one 4^n density matrix per column, for noisy runs.
+
+It then picks the fastest strategy that provides the requested results and
+fits a memory budget. The cost model counts amplitude updates; its
+constants are rough single-core figures of the NumPy engine and the
+entanglement analysis and can be overridden for other machines. Entanglement
+analysis is estimated with its worst case of testing every cut of up to
+n / 2 qubits.
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    Estimate: Predicted cost of one strategy.
+    Plan: Estimates of all strategies and the chosen one.
+
+Functions:
+    features(circuit): Structural features of a circuit.
+    estimate(features, per_column, entanglement, noise): Costs of all
+                                                         strategies.
+    plan(circuit, memory_budget, ...): Picks the cheapest fitting strategy.
+"""
+
+import math
+import os
+import qubit.density as qdm
+import qubit.gates as qg
+
+Default_memory_budget = 2**30
+Amplitude_bytes = 16
+Seconds_per_amplitude = 1.5e-8
+Seconds_per_copy = 5e-9
+Seconds_per_analysis_amplitude = 3e-7
+Analysis_bytes_per_amplitude = 200
+Worker_start_seconds = 0.2
+Seconds_per_eigen_cube = 1e-9
+Clifford_kinds = {"X", "Y", "Z", "H", "S", "Swap"}
+
+
+class Estimate:
+    """Predicted cost of one simulation strategy.
+
+    Attributes:
+        strategy (str): The strategy name.
+        seconds (float): Predicted run time, including analysis.
+        memory (int): Predicted peak memory in bytes.
+        per_column (bool): True if the strategy yields every column state.
+        available (bool): False if the strategy cannot run the circuit.
+    """
+
+    def __init__(self, strategy, seconds, memory, per_column, available=True):
+        self.strategy = strategy
+        self.seconds = seconds
+        self.memory = memory
+        self.per_column = per_column
+        self.available = available
+
+    def __repr__(self) -> str:
+        return (f"Estimate({self.strategy!r}, seconds={self.seconds:.3g}, "
+                f"memory={self.memory})")
+
+
+class Plan:
+    """Estimates of all strategies and the chosen one.
+
+    Attributes:
+        features (dict): Output of `features`.
+        estimates (list): Estimate of every strategy.
+        budget (int): The memory budget in bytes.
+        time_budget (float): The run time budget in seconds, or None.
+        per_column (bool): Every column state is needed.
+        choice (Estimate): The fastest usable strategy within the budgets,
+                           or None if none fits.
+    """
+
+    def __init__(self, features, estimates, budget, choice, time_budget=None,
+                 per_column=True):
+        self.features = features
+        self.estimates = estimates
+        self.budget = budget
+        self.time_budget = time_budget
+        self.per_column = per_column
+        self.choice = choice
+
+    def _in_memory(self):
+        """Usable estimates within the memory budget."""
+        return [e for e in self.estimates if e.available and
+                e.memory <= self.budget and
+                (e.per_column or not self.per_column)]
+
+    @property
+    def fits(self):
+        """True if some strategy fits the budgets."""
+        return self.choice is not None
+
+    @property
+    def limit(self):
+        """The budget that rules out every strategy: "memory", "time" or
+        None if the plan fits."""
+        if self.fits:
+            return None
+        return "time" if self._in_memory() else "memory"
+
+    @property
+    def min_seconds(self):
+        """Smallest predicted run time of the available strategies within
+        the memory budget."""
+        return min((e.seconds for e in self._in_memory()),
+                   default=float("inf"))
+
+    @property
+    def min_memory(self):
+        """Smallest predicted peak memory of the available strategies."""
+        return min((e.memory for e in self.estimates if e.available),
+                   default=0)
+
+    def __repr__(self) -> str:
+        name = self.choice.strategy if self.choice else None
+        return f"Plan(choice={name!r}, budget={self.budget})"
+
+
+def _components(n, edges):
+    """Groups of qubits connected by multi-qubit gates."""
+    parent = list(range(n))
+
+    def find(q):
+        while parent[q] != q:
+            parent[q] = parent[parent[q]]
+            q = parent[q]
+        return q
+
+    for a, b in edges:
+        parent[find(a)] = find(b)
+    groups = {}
+    for q in range(n):
+        groups.setdefault(find(q), set()).add(q)
+    return sorted(groups.values(), key=min)
+
+
+def features(circuit):
+    """Collects the structural features of a circuit.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+
+    Returns:
+        dict: n, columns, busy_columns (columns holding gates), gates, kinds
+              ({kind: count}), max_controls, edges (qubit pairs coupled by
+              a gate), components (coupled qubit groups), clifford,
+              classical (classical gates on a basis-state input), depth and
+              parameters.
+    """
+    n, columns = circuit._shape
+    kinds = {}
+    edges = set()
+    clifford = True
+    max_controls = 0
+    gates = 0
+    for _, gate in circuit.gate_sequence():
+        gates += 1
+        kind = gate.signature()[0]
+        kinds[kind] = kinds.get(kind, 0) + 1
+        controls = (gate._control,) if isinstance(gate, qg.Swap) \
+            else gate.controls
+        max_controls = max(max_controls, len(controls))
+        edges.update(tuple(sorted((gate._target, c))) for c in controls)
+        if kind not in Clifford_kinds or len(controls) > 1 or \
+                (controls and kind in ("H", "S")):
+            clifford = False
+    return {"n": n, "columns": columns,
+            "busy_columns": sum(1 for col in range(columns)
+                                if circuit._column_gates(col)),
+            "gates": gates, "kinds": kinds, "max_controls": max_controls,
+            "edges": sorted(edges), "components": _components(n, edges),
+            "clifford": clifford,
+            "classical": circuit._basis_input() is not None and
+            circuit.is_classical(),
+            "depth": circuit.depth, "parameters": circuit.parameters}
+
+
+def _analysis_cost(n, states):
+    """Worst-case (seconds, bytes) of entanglement analysis of states."""
+    cuts = n + sum(math.comb(n, r) for r in range(2, n // 2 + 1))
+    return (states * cuts * 2**n * Seconds_per_analysis_amplitude,
+            Analysis_bytes_per_amplitude * 2**n)
+
+
+def _ppt_cost(n, states):
+    """Worst-case (seconds, bytes) of PPT analysis of density matrices.
+
+    Every cut of up to n / 2 qubits needs one 2^n x 2^n eigendecomposition;
+    a batch holds `qdm.ppt_chunk(n)` transposed matrices plus the working
+    copy of `eigvalsh`.
+    """
+    cuts = n + sum(math.comb(n, r) for r in range(2, n // 2 + 1))
+    batch = min(math.comb(n, n // 2), qdm.ppt_chunk(n))
+    return (states * cuts * 8**n * Seconds_per_eigen_cube,
+            2 * batch * 4**n * Amplitude_bytes)
+
+
+def estimate(features, per_column=True, entanglement=True, noise=False):
+    """Predicts time and memory of every strategy.
+
+    Args:
+        features (dict): Output of `features`.
+        per_column (bool, optional): Every column state is needed.
+        entanglement (bool, optional): The states are analysed.
+        noise (bool, optional): The run is noisy; only the density matrix
+                                strategy applies, and only to noisy runs.
+
+    Returns:
+        list: One Estimate per strategy.
+    """
+    n, gates = features["n"], features["gates"]
+    busy = features["busy_columns"]
+    dim = 2**n
+    vector = dim * Amplitude_bytes
+    states = features["columns"] if per_column else 1
+    analysed = busy if per_column else 1
+    analysis_seconds, analysis_bytes = _analysis_cost(n, analysed) \
+        if entanglement else (0.0, 0)
+    workers = os.cpu_count() or 1
+    ret = []
+
+    # basis states need no entanglement analysis
+    ret.append(Estimate("classical", gates * 1e-6 + states * n * 1e-7,
+                        states * (n * 8 + vector), True,
+                        features["classical"] and not noise))
+
+    ret.append(Estimate(
+        "statevector",
+        gates * dim * Seconds_per_amplitude + busy * dim * Seconds_per_copy +
+        analysis_seconds,
+        (busy + 1) * vector + analysis_bytes, True, not noise))
+
+    final_seconds = gates * dim * Seconds_per_amplitude + analysis_seconds
+    final_bytes = 2 * vector + analysis_bytes
+    ret.append(Estimate("final_state", final_seconds, final_bytes, False,
+                        not noise))
+
+    ret.append(Estimate(
+        "distributed",
+        gates * dim * Seconds_per_amplitude / workers +
+        workers * Worker_start_seconds + analysis_seconds,
+        final_bytes + vector, False, workers > 1 and not noise))
+
+    # 4^n entries per column; PPT analysis diagonalizes chunks of cuts
+    density = dim * vector
+    ppt_seconds, ppt_bytes = _ppt_cost(n, analysed) \
+        if entanglement else (0.0, 0)
+    ret.append(Estimate(
+        "density_matrix",
+        2 * gates * dim * dim * Seconds_per_amplitude + ppt_seconds,
+        (busy + 1) * density + ppt_bytes, True, noise))
+    return ret
+
+
+def plan(circuit, memory_budget=Default_memory_budget, per_column=True,
+         entanglement=True, noise=False, extra_qubits=0, time_budget=None):
+    """Picks the fastest strategy that fits the memory and time budgets.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+        memory_budget (int, optional): Peak memory limit in bytes.
+        per_column (bool, optional): Every column state is needed.
+        entanglement (bool, optional): The states are analysed.
+        noise (bool, optional): The run is noisy.
+        extra_qubits (int, optional): Plan as if the register had this many
+                                      more idle qubits, e.g. before adding a
+                                      row.
+        time_budget (float, optional): Run time limit in seconds (default
+                                       is no limit).
+
+    Returns:
+        Plan: The estimates and the chosen strategy.
+    """
+    info = features(circuit)
+    info["n"] += extra_qubits
+    estimates = estimate(info, per_column, entanglement, noise)
+    ret = Plan(info, estimates, memory_budget, None, time_budget, per_column)
+    ret.choice = min((e for e in ret._in_memory()
+                      if time_budget is None or e.seconds <= time_budget),
+                     key=lambda e: e.seconds, default=None)
+    return ret
@@ -0,0 +1,369 @@
+"""
+OpenQASM 2 import and export.
+
+The parser reads a program line by line and turns every gate statement into
+a compact record (kind, target, controls, theta, line) without creating
+gate objects, so large files are scanned quickly and can be inspected
+before a circuit is built. `to_circuit` then places the records into
+columns as soon as their qubits are free and creates the `qubit.gates`
+objects.
+
+Supported gates are x, y, z, h, s, t, rx, ry, rz, p/u1, swap and their
+controlled forms cx, cy, cz, ch, ccx, crx, cry, crz, cp/cu1. Several qreg
+declarations are concatenated in order; creg, measure and barrier
+statements are accepted, where a barrier keeps later gates out of earlier
+columns. Anything else is reported with its line number.
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    QasmProgram: Gate records parsed from an OpenQASM 2 program.
+
+Functions:
+    parse(lines): Parses OpenQASM 2 source lines into gate records.
+    load(path): Parses an OpenQASM 2 file.
+    loads(text): Parses an OpenQASM 2 string.
+    to_circuit(program, strict): Builds a QuantumCircuit from gate records.
+    dumps(circuit): Exports a circuit as OpenQASM 2 text.
+    dump(circuit, path): Writes a circuit to an OpenQASM 2 file.
+"""
+
+import ast
+import functools
+import math
+import operator
+import re
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+
+# name: (kind, number of controls, takes an angle)
+Gate_table = {
+    "x": ("X", 0, False), "y": ("Y", 0, False), "z": ("Z", 0, False),
+    "h": ("H", 0, False), "s": ("S", 0, False), "t": ("T", 0, False),
+    "rx": ("RX", 0, True), "ry": ("RY", 0, True), "rz": ("RZ", 0, True),
+    "p": ("Phase", 0, True), "u1": ("Phase", 0, True),
+    "swap": ("Swap", 0, False),
+    "cx": ("X", 1, False), "cy": ("Y", 1, False), "cz": ("Z", 1, False),
+    "ch": ("H", 1, False), "ccx": ("X", 2, False),
+    "crx": ("RX", 1, True), "cry": ("RY", 1, True), "crz": ("RZ", 1, True),
+    "cp": ("Phase", 1, True), "cu1": ("Phase", 1, True),
+}
+Gate_classes = {"X": qg.X, "Y": qg.Y, "Z": qg.Z, "H": qg.H, "S": qg.S,
+                "T": qg.T, "RX": qg.RX, "RY": qg.RY, "RZ": qg.RZ,
+                "Phase": qg.Phase, "Swap": qg.Swap}
+Gate_names = {(kind, controls): name
+              for name, (kind, controls, _) in Gate_table.items()
+              if name not in ("u1", "cu1")}
+Ignored = {"creg", "measure", "OPENQASM", "include"}
+
+_statement = re.compile(r"(\w+)\s*(?:\(([^)]*)\))?\s*(.*)$", re.S)
+_operand = re.compile(r"(\w+)\s*(?:\[\s*(\d+)\s*\])?$")
+_operators = {ast.Add: operator.add, ast.Sub: operator.sub,
+              ast.Mult: operator.mul, ast.Div: operator.truediv,
+              ast.Pow: operator.pow, ast.USub: operator.neg,
+              ast.UAdd: operator.pos}
+_functions = {"sin": math.sin, "cos": math.cos, "tan": math.tan,
+              "exp": math.exp, "ln": math.log, "sqrt": math.sqrt}
+
+
+class QasmProgram:
+    """Gate records parsed from an OpenQASM 2 program.
+
+    Attributes:
+        n (int): Total number of qubits over all qregs.
+        records (list): (kind, target, controls, theta, line) per gate. A
+                        barrier is ("barrier", None, qubits, None, line).
+        unsupported (list): (line, statement) of every rejected statement.
+    """
+
+    def __init__(self, n, records, unsupported):
+        self.n = n
+        self.records = records
+        self.unsupported = unsupported
+
+    def __len__(self):
+        """Return the number of records."""
+        return len(self.records)
+
+
+@functools.lru_cache(maxsize=4096)
+def _angle(expr):
+    """Evaluates an angle expression such as "-pi/4" or "2*pi/3"."""
+    def evaluate(node):
+        if isinstance(node, ast.Expression):
+            return evaluate(node.body)
+        if isinstance(node, ast.Constant) and \
+                isinstance(node.value, (int, float)):
+            return float(node.value)
+        if isinstance(node, ast.Name) and node.id == "pi":
+            return math.pi
+        if isinstance(node, ast.BinOp) and type(node.op) in _operators:
+            return _operators[type(node.op)](evaluate(node.left),
+                                             evaluate(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _operators:
+            return _operators[type(node.op)](evaluate(node.operand))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+                and node.func.id in _functions and len(node.args) == 1:
+            return _functions[node.func.id](evaluate(node.args[0]))
+        raise ValueError(f"Invalid angle expression '{expr}'")
+    return evaluate(ast.parse(expr.strip(), mode="eval"))
+
+
+def _statements(lines):
+    """Yields (line number, statement) with comments removed."""
+    pending = ""
+    start = 0
+    for number, text in enumerate(lines, 1):
+        if "//" in text:
+            text = text.split("//", 1)[0]
+        stripped = text.strip()
+        if not stripped:
+            continue
+        if not pending and stripped.find(";") == len(stripped) - 1:
+            # the common case of one complete statement per line
+            yield number, stripped[:-1].strip()
+            continue
+        if not pending:
+            start = number
+        pending += text
+        while ";" in pending:
+            statement, pending = pending.split(";", 1)
+            statement = statement.strip()
+            if statement:
+                yield start, statement
+            start = number
+        if not pending.strip():
+            pending = ""
+    if pending.strip():
+        yield start, pending.strip()
+
+
+def _resolve(operand, registers):
+    """Converts an operand such as "q[3]" or "q" into qubit indices."""
+    reg = _operand.match(operand.strip())
+    offset, size = registers[reg.group(1)]
+    if reg.group(2) is None:
+        return [offset + i for i in range(size)]
+    if int(reg.group(2)) >= size:
+        raise ValueError(f"Index out of range in '{operand}'")
+    return [offset + int(reg.group(2))]
+
+
+def parse(lines):
+    """Parses OpenQASM 2 source lines into gate records.
+
+    Args:
+        lines (iterable): Source lines, e.g. an open file.
+
+    Returns:
+        QasmProgram: The gate records and the rejected statements.
+    """
+    registers = {}
+    resolved = {}
+    n = 0
+    records = []
+    unsupported = []
+    for number, statement in _statements(lines):
+        match = _statement.match(statement)
+        if match is None:
+            unsupported.append((number, statement))
+            continue
+        name, args, operands = match.groups()
+        if name == "qreg":
+            reg = _operand.match(operands.strip())
+            if reg is None or reg.group(2) is None:
+                unsupported.append((number, statement))
+                continue
+            registers[reg.group(1)] = (n, int(reg.group(2)))
+            n += int(reg.group(2))
+            resolved = {}
+            continue
+        if name in Ignored:
+            continue
+
+        spec = Gate_table.get(name)
+        if spec is None and name != "barrier":
+            unsupported.append((number, statement))
+            continue
+        try:
+            qubits = []
+            for operand in operands.split(","):
+                group = resolved.get(operand)
+                if group is None:
+                    group = resolved[operand] = _resolve(operand, registers)
+                qubits.append(group)
+            if name == "barrier":
+                records.append(("barrier", None,
+                                tuple(q for group in qubits for q in group),
+                                None, number))
+                continue
+            kind, controls, angled = spec
+            arity = controls + (2 if kind == "Swap" else 1)
+            theta = _angle(args) if angled else None
+            if len(qubits) != arity or (args is not None) != angled:
+                raise ValueError
+            # a register operand broadcasts the gate over its qubits, so
+            # all register operands must have the same width
+            widths = {len(group) for group in qubits if len(group) > 1}
+            if len(widths) > 1:
+                raise ValueError
+            width = widths.pop() if widths else 1
+            if width == 1:
+                picks = [[group[0] for group in qubits]]
+            else:
+                picks = [[group[i] if len(group) > 1 else group[0]
+                          for group in qubits] for i in range(width)]
+            # a gate acts on distinct qubits
+            if len(qubits) > 1 and any(len(set(picked)) != len(picked)
+                                       for picked in picks):
+                raise ValueError
+        except (AttributeError, KeyError, ValueError, SyntaxError):
+            unsupported.append((number, statement))
+            continue
+        for picked in picks:
+            if kind == "Swap":
+                records.append((kind, picked[1], (picked[0],), None, number))
+            else:
+                records.append((kind, picked[-1], tuple(picked[:-1]), theta,
+                                number))
+    return QasmProgram(n, records, unsupported)
+
+
+def loads(text):
+    """Parses an OpenQASM 2 program given as a string.
+
+    Args:
+        text (str): The program.
+
+    Returns:
+        QasmProgram: The parsed program.
+    """
+    return parse(text.splitlines())
+
+
+def load(path):
+    """Parses an OpenQASM 2 file line by line.
+
+    Args:
+        path (str): Path of the .qasm file.
+
+    Returns:
+        QasmProgram: The parsed program.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return parse(file)
+
+
+def to_circuit(program, strict=True):
+    """Builds a QuantumCircuit from parsed gate records.
+
+    Each gate is placed in the first column after the last column that used
+    one of its qubits. The circuit starts with an empty undo history.
+
+    Args:
+        program (QasmProgram): The parsed program.
+        strict (bool, optional): Raise if the program had unsupported
+                                 statements (default is True); otherwise
+                                 they are skipped.
+
+    Returns:
+        circuit.quantum_circuit.QuantumCircuit: The circuit with |0...0>
+                                                input.
+
+    Raises:
+        ValueError: If strict and a statement was unsupported.
+    """
+    if strict and program.unsupported:
+        lines = "; ".join(f"line {number}: {statement}"
+                          for number, statement in program.unsupported)
+        raise ValueError(f"Unsupported OpenQASM statements: {lines}")
+    ready = [0] * program.n
+    placed = []
+    for kind, target, controls, theta, _ in program.records:
+        if kind == "barrier":
+            level = max((ready[q] for q in controls), default=0)
+            for q in controls:
+                ready[q] = level
+            continue
+        qubits = (target,) + controls
+        col = max(ready[q] for q in qubits)
+        for q in qubits:
+            ready[q] = col + 1
+        placed.append((col, kind, target, controls, theta))
+
+    # the grid is filled directly, as in QuantumCircuit.load: a fresh
+    # circuit has no cached states and starts with an empty undo history
+    circuit = qc.QuantumCircuit(qb.Qubit(program.n, 0),
+                                max(ready, default=0))
+    grid = circuit._gate_list
+    # gates are immutable, so equal records share one gate object
+    made = {}
+    for col, kind, target, controls, theta in placed:
+        key = (kind, target, controls, theta)
+        gate = made.get(key)
+        if gate is None:
+            if kind == "Swap":
+                gate = qg.Swap(program.n, target, controls[0])
+            elif theta is not None:
+                gate = Gate_classes[kind](program.n, target, list(controls),
+                                          theta=theta)
+            else:
+                gate = Gate_classes[kind](program.n, target, list(controls))
+            made[key] = gate
+        grid[target][col] = gate
+    return circuit
+
+
+def _gate_lines(gate):
+    """Returns the OpenQASM 2 statements of one gate."""
+    kind, target, controls, theta = gate.signature()
+    if kind == "Swap":
+        return [f"swap q[{target}],q[{controls[0][0]}];"]
+    if isinstance(theta, qg.Parameter):
+        raise ValueError(f"Cannot export unbound parameter {theta!r}")
+    name = Gate_names.get((kind, len(controls)))
+    if name is None:
+        raise ValueError(f"{kind} with {len(controls)} controls has no "
+                         "OpenQASM 2 equivalent")
+    flips = [f"x q[{control}];" for control, value in controls if not value]
+    args = "" if theta is None else f"({theta!r})"
+    operands = ",".join(f"q[{q}]" for q in
+                        [control for control, _ in controls] + [target])
+    return flips + [f"{name}{args} {operands};"] + flips
+
+
+def dumps(circuit):
+    """Exports a circuit as an OpenQASM 2 program.
+
+    Controls triggering on |0> are written as X gates around the gate. The
+    input state is not part of the program.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+
+    Returns:
+        str: The program text.
+
+    Raises:
+        ValueError: If a gate has no OpenQASM 2 equivalent or an unbound
+                    parameter.
+    """
+    lines = ["OPENQASM 2.0;", 'include "qelib1.inc";',
+             f"qreg q[{circuit._shape[0]}];"]
+    for _, gate in circuit.gate_sequence():
+        lines.extend(_gate_lines(gate))
+    return "\n".join(lines) + "\n"
+
+
+def dump(circuit, path):
+    """Writes a circuit to an OpenQASM 2 file.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+        path (str): Path of the .qasm file.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(dumps(circuit))
@@ -8,12 +8,50 @@ Website: https://github.com/tlemsl/Entanglement_visualizer
 
 Classes:
     QuantumCircuit: Represents a user-created quantum circuit.
+    SweepResult: Holds the states and entanglement timeline of a sweep.
 """
 
 import numpy as np
 import qubit.qubit as qb
 import qubit.gates as qg
+import qubit.engine as qe
+import qubit.entanglment as qent
+import qubit.snapshot as qsnap
+import qubit.density as qdm
+import qubit.distributed as qdist
 import util.utils as ut
+import util.profiler as prof
+import circuit.optimizer as qopt
+import circuit.schedule as qsched
+
+
+class SweepResult:
+    """Result of evaluating a circuit for an array of parameter values.
+
+    Attributes:
+        values (dict): Parameter arrays of length P keyed by name.
+        states (numpy.ndarray): States after each column, shape
+                                (gate_num, 2^n, P).
+        labels (numpy.ndarray): Entanglement group label of every qubit after
+                                each column, shape (P, gate_num, n). Entangled
+                                qubits carry the smallest qubit index of their
+                                set, separable qubits -1. None if entanglement
+                                was not analysed.
+    """
+
+    def __init__(self, values, states, labels):
+        self.values = values
+        self.states = states
+        self.labels = labels
+
+    def __len__(self):
+        """Return the number of parameter points."""
+        return self.states.shape[2]
+
+    @property
+    def entangled(self):
+        """Boolean array (P, gate_num, n), True where a qubit is entangled."""
+        return self.labels >= 0
 
 
 class QuantumCircuit:
@@ -39,6 +77,11 @@ class QuantumCircuit:
         self._gate_list = [[None for _ in range(gate_num)]
                            for _ in range(self._qubit._n)]
         self._shape = self._qubit._n, gate_num
+        self._history = []
+        self._redo = []
+        self._states = []
+        self._valid = 0
+        self._unitary = None
 
     def __len__(self):
         """return the shape of the gate list
@@ -63,10 +106,12 @@ class QuantumCircuit:
         if not (0 <= col < len(self._gate_list[0])):
             raise IndexError(f"column not in [0, {len(self._gate_list[0])-1}]")
 
-        self._gate_list[row][col] = gate
+        self._record(("gate", row, col, self._gate_list[row][col], gate))
+        self._set_gate(row, col, gate)
 
     def add_circuit_row(self):
         """Adds a new row at the bottom of the circuit and updates the qubit."""
+        before = self._layout()
         qubit_num, gate_num = self._shape        
         self._gate_list.append([None for _ in range(gate_num)]) # add new qubit list.
         self._shape = qubit_num + 1, gate_num # update the circuit shape
@@ -79,14 +124,10 @@ class QuantumCircuit:
         for row, gate_sequence in enumerate(self._gate_list):
             for col, gate in enumerate(gate_sequence):
                 if gate != None:
-                    if isinstance(gate, qg.H):
-                        self._gate_list[row][col] = qg.H(qubit_num+1, gate._target, gate._control)
-                    elif isinstance(gate, qg.X):
-                        self._gate_list[row][col] = qg.X(qubit_num+1, gate._target, gate._control)
-                    elif isinstance(gate, qg.Y):
-                        self._gate_list[row][col] = qg.Y(qubit_num+1, gate._target, gate._control)
-                    elif isinstance(gate, qg.Z):
-                        self._gate_list[row][col] = qg.Z(qubit_num+1, gate._target, gate._control)
+                    self._gate_list[row][col] = gate.resized(qubit_num+1)
+        self._record(("layout", before, self._layout()))
+        self._valid = 0
+        self._unitary = None
 
     def change_qubit_value(self, v):
         """Changes the qubit value.
@@ -97,7 +138,8 @@ class QuantumCircuit:
         n = self._qubit._n
         data = np.zeros((2**n, 1), dtype=np.complex128)
         data[v, 0] = 1
-        self._qubit.mat = data
+        self._record(("input", self._qubit.mat, data))
+        self._set_input(data)
 
     def del_gate(self, row, col):
         """Deletes a gate from the circuit.
@@ -114,7 +156,8 @@ class QuantumCircuit:
         if not (0 <= col < len(self._gate_list[0])):
             raise IndexError(f"column not in [0, {len(self._gate_list[0])-1}]")
 
-        self._gate_list[row][col] = None
+        self._record(("gate", row, col, self._gate_list[row][col], None))
+        self._set_gate(row, col, None)
 
     def del_circuit_row(self):
         """Deletes the bottom row of the circuit."""
@@ -122,6 +165,7 @@ class QuantumCircuit:
         qubit_num, gate_num = self._shape
         if qubit_num == 0:
             raise IndexError("no rows to delete.")
+        before = self._layout()
         self._shape = qubit_num-1, gate_num
 
         self._gate_list.pop()
@@ -133,55 +177,603 @@ class QuantumCircuit:
         for row, gate_sequence in enumerate(self._gate_list):
             for col, gate in enumerate(gate_sequence):
                 if gate != None:
-                    if isinstance(gate, qg.H):
-                        self._gate_list[row][col] = qg.H(qubit_num-1, gate._target, gate._control)
-                    elif isinstance(gate, qg.X):
-                        self._gate_list[row][col] = qg.X(qubit_num-1, gate._target, gate._control)
-                    elif isinstance(gate, qg.Y):
-                        self._gate_list[row][col] = qg.Y(qubit_num-1, gate._target, gate._control)
-                    elif isinstance(gate, qg.Z):
-                        self._gate_list[row][col] = qg.Z(qubit_num-1, gate._target, gate._control)
+                    self._gate_list[row][col] = gate.resized(qubit_num-1)
+        self._record(("layout", before, self._layout()))
+        self._valid = 0
+        self._unitary = None
         
 
-    def calculate_qubit_state(self):
+    def _layout(self):
+        """Returns a snapshot of the gate grid and the input qubit."""
+        return ([list(gate_sequence) for gate_sequence in self._gate_list],
+                self._qubit, self._shape)
+
+    def _record(self, edit):
+        """Pushes an edit onto the undo history and clears the redo stack."""
+        self._history.append(edit)
+        self._redo.clear()
+
+    def _set_input(self, data):
+        """Replaces the input state and drops every cached state."""
+        self._qubit.mat = data
+        self._valid = 0
+
+    def _set_gate(self, row, col, gate):
+        """Places a gate (or None) into a cell and updates the state cache.
+
+        If every column state is cached and no gate follows the edited
+        column, the cached output is patched with the removed gate's inverse
+        and the new gate, which costs one pass over the state. This needs
+        the gates applied after the cell in its column (the rows above it)
+        to commute with both gates. Any other edit only invalidates the
+        cached states from the edited column on.
+        """
+        old = self._gate_list[row][col]
+        self._gate_list[row][col] = gate
+        self._unitary = None
+        col_num = self._shape[1]
+        edited = [g for g in (old, gate) if g != None]
+        patch = self._valid == col_num and \
+            not any(g.parameters for g in edited) and \
+            not any(self._column_gates(c) for c in range(col + 1, col_num))
+        if patch:
+            later = [self._gate_list[r][col] for r in range(row)
+                     if self._gate_list[r][col] != None]
+            patch = all(qopt.commutes(g, other)
+                        for g in edited for other in later)
+        if not patch:
+            self._valid = min(self._valid, col)
+            return
+        mat = np.array(self._states[col].mat, dtype=np.complex128, order='C')
+        if old != None:
+            qe.apply_gate(mat, old, adjoint=True)
+        if gate != None:
+            qe.apply_gate(mat, gate)
+        state = qb.Qubit()
+        state.mat = mat
+        self._states[col:] = [state] * (col_num - col)
+
+    def _apply_edit(self, edit, undo):
+        """Applies an edit record forwards or backwards."""
+        kind = edit[0]
+        if kind == "gate":
+            _, row, col, old, new = edit
+            self._set_gate(row, col, old if undo else new)
+        elif kind == "input":
+            self._set_input(edit[1] if undo else edit[2])
+        else:
+            gate_list, qubit, shape = edit[1] if undo else edit[2]
+            self._gate_list = [list(gate_sequence) for gate_sequence in gate_list]
+            self._qubit = qubit
+            self._shape = shape
+            self._valid = 0
+            self._unitary = None
+
+    def undo(self):
+        """Reverts the last edit.
+
+        Returns:
+            bool: False if there was nothing to undo.
+        """
+        if not self._history:
+            return False
+        edit = self._history.pop()
+        self._apply_edit(edit, undo=True)
+        self._redo.append(edit)
+        return True
+
+    def redo(self):
+        """Repeats the last undone edit.
+
+        Returns:
+            bool: False if there was nothing to redo.
+        """
+        if not self._redo:
+            return False
+        edit = self._redo.pop()
+        self._apply_edit(edit, undo=False)
+        self._history.append(edit)
+        return True
+
+    def save(self, path, sparse=False):
+        """Writes the gate grid and the input state to a snapshot file.
+
+        Gates are stored as (kind, row, column, target, controls, angle)
+        records, never as matrices.
+
+        Args:
+            path (str): The output file.
+            sparse (bool, optional): Store only the nonzero amplitudes of the
+                                     input state (default is False).
+        """
+        names = self.parameters
+        records = []
+        for row, gate_sequence in enumerate(self._gate_list):
+            for col, gate in enumerate(gate_sequence):
+                if gate == None:
+                    continue
+                theta = getattr(gate, "theta", None)
+                parameter = qsnap.No_parameter
+                if isinstance(theta, qg.Parameter):
+                    parameter, theta = names.index(theta.name), None
+                records.append((
+                    qsnap.Gate_kinds.index(type(gate).__name__), 0, row, col,
+                    gate._target, parameter,
+                    sum(1 << c for c in gate.controls),
+                    sum(1 << c for c, p in zip(gate.controls, gate.polarity)
+                        if p),
+                    np.nan if theta is None else theta))
+        qsnap.write_circuit(path, self._shape[0], self._shape[1],
+                            np.array(records, dtype=qsnap.Record_dtype),
+                            names, self._qubit.mat, sparse)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Reads a circuit from a snapshot file.
+
+        Args:
+            path (str): The snapshot file.
+            mmap (bool, optional): Map a dense input state copy-on-write
+                                   (default is True).
+
+        Returns:
+            QuantumCircuit: The loaded circuit.
+        """
+        n, gate_num, records, names, mat = qsnap.read_circuit(path, mmap)
+        qubit = qb.Qubit()
+        qubit.mat = mat
+        ret = cls(qubit, gate_num)
+        for record in records:
+            kind = qsnap.Gate_kinds[record["kind"]]
+            target = int(record["target"])
+            controls = [c for c in range(n) if int(record["controls"]) >> c & 1]
+            polarity = [int(record["polarity"]) >> c & 1 for c in controls]
+            if kind == "Swap":
+                gate = qg.Swap(n, target, controls[0])
+            elif kind in ("RX", "RY", "RZ", "Phase"):
+                theta = float(record["theta"])
+                if record["parameter"] != qsnap.No_parameter:
+                    theta = qg.Parameter(names[record["parameter"]])
+                gate = getattr(qg, kind)(n, target, controls, theta=theta,
+                                         polarity=polarity)
+            else:
+                gate = getattr(qg, kind)(n, target, controls, polarity)
+            ret._gate_list[int(record["row"])][int(record["column"])] = gate
+        return ret
+
+    @property
+    def parameters(self):
+        """Getter for the names of the circuit's symbolic parameters.
+
+        Returns:
+            list: Sorted parameter names.
+        """
+        names = set()
+        for gate_sequence in self._gate_list:
+            for gate in gate_sequence:
+                if gate != None:
+                    names |= gate.parameters
+        return sorted(names)
+
+    def _column_gates(self, col):
+        """Returns the gates of a column in application order.
+
+        Stacking a column as G = g_0 * g_1 * ... applies the bottom row
+        first, so the rows are returned bottom-up.
+        """
+        return [self._gate_list[row][col]
+                for row in range(self._shape[0] - 1, -1, -1)
+                if self._gate_list[row][col] != None]
+
+    def gate_sequence(self):
+        """Iterates over all gates in application order.
+
+        Yields:
+            tuple: (col, gate) for every gate, column by column.
+        """
+        for col in range(self._shape[1]):
+            for gate in self._column_gates(col):
+                yield col, gate
+
+    def is_classical(self):
+        """Checks if the circuit only contains (multi-)controlled X gates.
+
+        Returns:
+            bool: True if the circuit permutes basis states.
+        """
+        return all(qe.is_classical(gate) for _, gate in self.gate_sequence())
+
+    def _basis_input(self):
+        """Returns (index, amplitude) if the input is a single basis state."""
+        nonzero = np.flatnonzero(self._qubit.mat[:, 0])
+        if len(nonzero) != 1:
+            return None
+        return int(nonzero[0]), self._qubit.mat[nonzero[0], 0]
+
+    def run_classical(self, inputs, per_column=False):
+        """Pushes basis-state inputs through a classical circuit.
+
+        Args:
+            inputs (int or array-like): Input basis indices (qubit k in bit k).
+            per_column (bool, optional): Return the bitstrings after every
+                                         column instead of only the outputs
+                                         (default is False).
+
+        Returns:
+            numpy.ndarray: uint64 outputs of the same shape as inputs, or of
+                           shape (gate_num,) + inputs.shape if per_column.
+
+        Raises:
+            ValueError: If the circuit is not classical or too wide.
+        """
+        if not self.is_classical():
+            raise ValueError("Circuit contains gates other than X/CNOT/Toffoli")
+        if self._shape[0] > 64:
+            raise ValueError("Classical mode supports at most 64 qubits")
+        bits = np.array(inputs, dtype=np.uint64)
+        if not per_column:
+            return qe.apply_classical(
+                bits, [gate for _, gate in self.gate_sequence()])
+        ret = np.empty((self._shape[1],) + bits.shape, dtype=np.uint64)
+        for col in range(self._shape[1]):
+            ret[col] = qe.apply_classical(bits, self._column_gates(col))
+        return ret
+
+    def optimize(self):
+        """Runs the gate cancellation and commutation pass.
+
+        Returns:
+            circuit.optimizer.Optimization: Surviving gates and the columns
+                                            whose states can be shared.
+        """
+        return qopt.optimize(self)
+
+    def schedule(self):
+        """Packs the gates into as-soon-as-possible layers.
+
+        Returns:
+            circuit.schedule.Schedule: The layers, their gate counts and the
+                                       mapping to the original columns.
+        """
+        return qsched.schedule(self)
+
+    @property
+    def depth(self):
+        """Getter for the minimum number of layers of the circuit.
+
+        Returns:
+            int: The depth of the scheduled circuit.
+        """
+        return self.schedule().depth
+
+    def calculate_layer_states(self, values=None):
+        """Calculates the states after each layer of the scheduled circuit.
+
+        Args:
+            values (dict, optional): Values of symbolic parameters keyed by
+                                     name.
+
+        Returns:
+            tuple: (schedule, states); states holds one Qubit per layer and
+                   `schedule.column_layers` maps original columns to them.
+        """
+        layout = self.schedule()
+        return layout, layout.compact(self).calculate_qubit_state(values)
+
+    def calculate_qubit_state(self, values=None, optimize=False):
         """Calculates the qubit state of the circuit.
 
+        Classical circuits acting on a basis-state input are simulated on
+        bitstrings; only the resulting basis states are materialized.
+
+        Args:
+            values (dict, optional): Values of symbolic parameters keyed by
+                                     name.
+            optimize (bool, optional): Simulate the optimized gate sequence
+                                       and share the states of provably
+                                       identical columns (default is False).
+
         Returns:
             list: Quantum states calculated for each column.
         """
+        if values is None:
+            if self._valid == 0:
+                self._states = self._calculate(None, optimize)
+            elif self._valid < self._shape[1]:
+                self._states[self._valid:] = self._calculate_columns(
+                    self._states[self._valid - 1], self._valid)
+            self._valid = self._shape[1]
+            return list(self._states)
+        return self._calculate(values, optimize)
+
+    def _calculate(self, values, optimize):
+        """Calculates every column state without using the cache."""
         quantum_states = []        
         row_num, col_num = self._shape
-        n = self._qubit._n        
-        for col in range(col_num):    
-            G = None # stacking gates column wize(axis 0) by tensor product.                        
-            for row in range(row_num):                       
-                gate = self._gate_list[row][col]                
-                if gate == None:
-                    continue
-                else:
-                    if G == None:
-                        G = gate
-                    else:
-                        G = G*gate
-            # apply G to qubit
-            if G == None:
-                if col == 0:
-                    quantum_states.append(self._qubit)
-                elif col >= 1:
-                    quantum_states.append(quantum_states[col-1])
-            else:
-                if col==0:
-                    quantum_states.append(G*self._qubit)
-                elif col >= 1:
-                    quantum_states.append(G*quantum_states[col-1])
+        basis = self._basis_input()
+        if basis is not None and row_num <= 64 and self.is_classical():
+            index, amplitude = basis
+            outputs = self.run_classical([index], per_column=True)[:, 0]
+            state = self._qubit
+            for col in range(col_num):
+                if self._column_gates(col):
+                    state = qb.Qubit(row_num, int(outputs[col]))
+                    state.mat[int(outputs[col]), 0] = amplitude
+                quantum_states.append(state)
+            return quantum_states
+        if optimize:
+            return self._calculate_optimized(values)
+        return self._calculate_columns(self._qubit, 0, values)
+
+    @prof.timed("circuit.calculate_columns")
+    def _calculate_columns(self, state, start, values=None):
+        """Calculates the column states from column start on.
+
+        Args:
+            state (qubit.qubit.Qubit): The state before column start.
+            start (int): The first column to simulate.
+            values (dict, optional): Values of symbolic parameters.
+
+        Returns:
+            list: Quantum states of columns start, start + 1, ...
+        """
+        quantum_states = []
+        for col in range(start, self._shape[1]):
+            gates = self._column_gates(col)
+            if gates:
+                mat = np.array(state.mat, dtype=np.complex128, order='C')
+                qe.apply_gates(mat, gates, values)
+                state = qb.Qubit()
+                state.mat = mat
+            quantum_states.append(state)
+        prof.count("circuit.columns_simulated", self._shape[1] - start)
+        return quantum_states
+
+    @prof.timed("circuit.calculate_optimized")
+    def _calculate_optimized(self, values=None):
+        """Calculates the column states from the optimized gate sequence.
+
+        A column whose surviving prefix was seen before reuses that state.
+        Otherwise the state is continued from the longest stored prefix if
+        that takes fewer gates than simulating the column itself.
+        """
+        result = self.optimize()
+        sequence = [gate for _, gate in self.gate_sequence()]
+        known = {(): self._qubit}
+        quantum_states = []
+        state = self._qubit
+        for col, prefix in enumerate(result.prefixes):
+            if prefix in known:
+                state = known[prefix]
+                quantum_states.append(state)
+                prof.count("circuit.columns_reused")
+                continue
+            gates = self._column_gates(col)
+            source = state
+            for k in range(len(prefix) - 1,
+                           max(len(prefix) - len(gates), -1), -1):
+                if prefix[:k] in known:
+                    source = known[prefix[:k]]
+                    gates = [sequence[i] for i in prefix[k:]]
+                    break
+            mat = np.array(source.mat, dtype=np.complex128, order='C')
+            qe.apply_gates(mat, gates, values)
+            state = qb.Qubit()
+            state.mat = mat
+            known[prefix] = state
+            quantum_states.append(state)
+            prof.count("circuit.columns_simulated")
         return quantum_states
 
-            
+    def calculate_density_matrix(self, noise=None, values=None):
+        """Calculates the mixed state after each column.
+
+        Args:
+            noise (qubit.noise.NoiseModel, optional): Channels applied after
+                                                      every gate.
+            values (dict, optional): Values of symbolic parameters keyed by
+                                     name.
+
+        Returns:
+            list: qubit.density.DensityMatrix after each column.
+        """
+        quantum_states = []
+        state = qdm.DensityMatrix(self._qubit.mat)
+        for col in range(self._shape[1]):
+            gates = self._column_gates(col)
+            if gates:
+                state = state.copy()
+                for gate in gates:
+                    state.apply_gate(gate, values)
+                    if noise:
+                        for qubit, kraus in noise.after(gate):
+                            state.apply_channel(kraus, qubit)
+            quantum_states.append(state)
+        return quantum_states
+
+    def final_state(self, values=None):
+        """Calculates only the output state of the circuit.
+
+        Without per-column states to report, diagonal gates are fused across
+        column boundaries, so a phase-heavy stretch of the circuit costs one
+        pass over the state, and gates cancelled by the optimization pass
+        are skipped.
+
+        Args:
+            values (dict, optional): Values of symbolic parameters keyed by
+                                     name.
+
+        Returns:
+            qubit.qubit.Qubit: The state after the last column.
+        """
+        mat = np.array(self._qubit.mat, dtype=np.complex128, order='C')
+        qe.apply_gates(mat, [gate for _, gate in self.optimize().gates],
+                       values)
+        state = qb.Qubit()
+        state.mat = mat
+        return state
 
-    def calculate_entanglement(self):
+    def unitary(self, values=None):
+        """Calculates the unitary matrix of the circuit.
+
+        The identity is evolved as a batch of 2^n basis columns through the
+        gate engine, so no 2^n x 2^n gate matrix is multiplied. Without
+        parameter values the result is cached until the circuit is edited.
+
+        Args:
+            values (dict, optional): Scalar values of symbolic parameters
+                                     keyed by name.
+
+        Returns:
+            numpy.ndarray: The read-only (2^n, 2^n) unitary.
+        """
+        if values is None and self._unitary is not None:
+            return self._unitary
+        mat = self._evolve_basis(0, 2**self._shape[0], values)
+        mat.flags.writeable = False
+        if values is None:
+            self._unitary = mat
+        return mat
+
+    def _evolve_basis(self, start, stop, values=None):
+        """Returns the columns start..stop-1 of the unitary."""
+        if self._unitary is not None and values is None:
+            return self._unitary[:, start:stop]
+        mat = np.zeros((2**self._shape[0], stop - start), dtype=np.complex128)
+        mat[np.arange(start, stop), np.arange(stop - start)] = 1
+        return qe.apply_gates(mat, [gate for _, gate in
+                                    self.optimize().gates], values)
+
+    def equivalent(self, other, values=None, tolerance=1e-9):
+        """Checks if two circuits have the same unitary up to global phase.
+
+        Basis columns are evolved in blocks of doubling size, so a mismatch
+        in an early column is found after simulating only a few columns.
+        Cached unitaries are used when available.
+
+        Args:
+            other (QuantumCircuit): The circuit to compare with.
+            values (dict, optional): Scalar values of symbolic parameters
+                                     of both circuits.
+            tolerance (float, optional): Largest allowed amplitude error.
+
+        Returns:
+            bool: True if the circuits are equivalent.
+        """
+        if other._shape[0] != self._shape[0]:
+            return False
+        dim = 2**self._shape[0]
+        phase = None
+        start, size = 0, 1
+        while start < dim:
+            stop = min(start + size, dim)
+            mine = self._evolve_basis(start, stop, values)
+            theirs = other._evolve_basis(start, stop, values)
+            if phase is None:
+                # the largest amplitude of the first column fixes the phase
+                k = np.argmax(np.abs(mine[:, 0]))
+                phase = theirs[k, 0] / mine[k, 0]
+                if abs(abs(phase) - 1) > tolerance:
+                    return False
+            if np.max(np.abs(theirs - phase * mine)) > tolerance:
+                return False
+            start, size = stop, 2 * size
+        return True
+
+    def calculate_distributed(self, workers=2, values=None):
+        """Calculates the output state on a partitioned state vector.
+
+        The amplitudes are split across `workers` processes sharing one
+        memory block, and the gate sequence is driven from this process.
+
+        Args:
+            workers (int, optional): Number of worker processes, a power of
+                                     two (default is 2).
+            values (dict, optional): Values of symbolic parameters keyed by
+                                     name.
+
+        Returns:
+            qubit.qubit.Qubit: The state after the last column.
+        """
+        with qdist.DistributedState(self._qubit.mat, workers) as dist:
+            dist.apply_gates((gate for _, gate in self.gate_sequence()),
+                             values)
+            state = qb.Qubit()
+            state.mat = dist.mat
+        return state
+
+    def sweep(self, values, entanglement=True):
+        """Evaluates the circuit for arrays of parameter values in one pass.
+
+        All parameter points are carried as columns of a single (2^n, P)
+        state batch, so every gate is applied once for the whole sweep.
+
+        Args:
+            values (dict): Parameter values keyed by name. Arrays must share
+                           one length P; scalars are broadcast.
+            entanglement (bool, optional): Analyse the entanglement of every
+                                           state (default is True).
+
+        Returns:
+            SweepResult: States and entanglement timeline of the sweep.
+
+        Raises:
+            ValueError: If a parameter has no value or arrays differ in length.
+        """
+        values = {(key.name if isinstance(key, qg.Parameter) else key):
+                  np.atleast_1d(np.asarray(value, dtype=np.float64))
+                  for key, value in values.items()}
+        missing = set(self.parameters) - set(values)
+        if missing:
+            raise ValueError(f"No values given for parameters {sorted(missing)}")
+        lengths = {len(value) for value in values.values() if len(value) != 1}
+        if len(lengths) > 1:
+            raise ValueError("Parameter arrays must have the same length")
+        points = lengths.pop() if lengths else 1
+        values = {key: np.broadcast_to(value, (points,))
+                  for key, value in values.items()}
+
+        row_num, col_num = self._shape
+        state = np.repeat(np.asarray(self._qubit.mat, dtype=np.complex128),
+                          points, axis=1)
+        states = np.empty((col_num,) + state.shape, dtype=np.complex128)
+        for col in range(col_num):
+            qe.apply_gates(state, self._column_gates(col), values)
+            states[col] = state
+
+        labels = None
+        if entanglement:
+            labels = np.empty((points, col_num, row_num), dtype=np.int64)
+            for col in range(col_num):
+                for point in range(points):
+                    groups = qent.entanglement(states[col][:, point:point + 1])
+                    labels[point, col] = qent.labels(groups, row_num)
+        return SweepResult(values, states, labels)
+
+    @prof.timed("circuit.calculate_entanglement")
+    def calculate_entanglement(self, quantum_states=None):
         """Calculates entangled qubit sets in each quantum state.
 
+        A classical circuit on a basis-state input only ever produces basis
+        states, which are fully separable, so no analysis is run for it. A
+        state shared with the previous column reuses its result.
+
+        Args:
+            quantum_states (list, optional): States returned by
+                                             calculate_qubit_state; computed
+                                             if omitted.
+
         Returns:
             list: 2D list containing lists of entangled qubits.
         """
-        pass
+        if self._basis_input() is not None and self.is_classical():
+            return [[set()] for _ in range(self._shape[1])]
+        if quantum_states is None:
+            quantum_states = self.calculate_qubit_state()
+        ret = []
+        for col, state in enumerate(quantum_states):
+            if col and state is quantum_states[col - 1]:
+                ret.append(ret[-1])
+            else:
+                ret.append(state.entangled())
+        return ret
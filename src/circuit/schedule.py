@@ -0,0 +1,116 @@
+"""
+As-soon-as-possible (ASAP) layer scheduling for quantum circuits.
+
+Hand-drawn circuits are often sparse: a column holding a single gate still
+costs a full state copy when the per-column states are calculated. The
+scheduler places every gate in the first layer after the last layer that
+touched one of its qubits (target or controls), which packs the gates into
+the minimum number of layers that keeps the order of dependent gates.
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    Schedule: Layers of a circuit and their mapping to the original columns.
+
+Functions:
+    schedule(circuit): Packs the gates of a circuit into layers.
+"""
+
+import numpy as np
+import qubit.qubit as qb
+
+
+class Schedule:
+    """Layers of a scheduled circuit.
+
+    Attributes:
+        layers (list): Per layer, the (col, gate) pairs placed in it. Gates of
+                       one layer act on disjoint qubits.
+        gate_layers (list): Layer of every gate, in the order of
+                            `QuantumCircuit.gate_sequence()`.
+        column_layers (list): Per original column, the layer after which the
+                              state equals the state after that column, or
+                              None if gates of later columns were moved
+                              before it (-1 means the input state).
+    """
+
+    def __init__(self, layers, gate_layers, column_layers):
+        self.layers = layers
+        self.gate_layers = gate_layers
+        self.column_layers = column_layers
+
+    @property
+    def depth(self):
+        """Number of layers."""
+        return len(self.layers)
+
+    @property
+    def layer_sizes(self):
+        """Number of gates in each layer."""
+        return [len(layer) for layer in self.layers]
+
+    def __repr__(self) -> str:
+        return f"Schedule(depth={self.depth}, layer_sizes={self.layer_sizes})"
+
+    def compact(self, circuit):
+        """Builds a circuit with one column per layer.
+
+        Args:
+            circuit (circuit.quantum_circuit.QuantumCircuit): The scheduled
+                                                              circuit.
+
+        Returns:
+            circuit.quantum_circuit.QuantumCircuit: The packed circuit with a
+                                                    copy of the input state.
+        """
+        qubit = qb.Qubit()
+        qubit.mat = np.array(circuit._qubit.mat, copy=True)
+        ret = type(circuit)(qubit, self.depth)
+        for layer, gates in enumerate(self.layers):
+            for _, gate in gates:
+                ret.add_gate(gate._target, layer, gate)
+        return ret
+
+
+def schedule(circuit):
+    """Packs the gates of a circuit into as few layers as possible.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+
+    Returns:
+        Schedule: The layers and their mapping to the original columns.
+    """
+    ready = [0] * circuit._shape[0]
+    layers = []
+    gate_layers = []
+    sequence = list(circuit.gate_sequence())
+    for col, gate in sequence:
+        qubits = (gate._target,) + gate.controls
+        layer = max(ready[q] for q in qubits)
+        if layer == len(layers):
+            layers.append([])
+        layers[layer].append((col, gate))
+        gate_layers.append(layer)
+        for q in qubits:
+            ready[q] = layer + 1
+
+    # the state after column c is a layer state if every gate up to c sits
+    # below every gate after c
+    col_num = circuit._shape[1]
+    last = [-1] * col_num
+    first = [len(layers)] * col_num
+    for (col, _), layer in zip(sequence, gate_layers):
+        last[col] = max(last[col], layer)
+        first[col] = min(first[col], layer)
+    column_layers = []
+    done = -1
+    later = [len(layers)] * (col_num + 1)
+    for col in range(col_num - 1, -1, -1):
+        later[col] = min(later[col + 1], first[col])
+    for col in range(col_num):
+        done = max(done, last[col])
+        column_layers.append(done if done < later[col + 1] else None)
+    return Schedule(layers, gate_layers, column_layers)
@@ -0,0 +1,274 @@
+"""
+Monte Carlo trajectory simulation of noisy circuits.
+
+Instead of evolving a 4^n density matrix, each trajectory evolves a single
+state vector and, after every gate, picks one Kraus operator K_k of each
+noise channel with probability ||K_k psi||^2, then renormalizes. Averaging
+many trajectories reproduces the density-matrix statistics.
+
+The probabilities ||K_k psi||^2 are read off the 2x2 reduced density matrix
+of the affected qubit, so a trajectory never holds more than its one state
+vector. Trajectories run in batches on a process pool; trajectory i always
+uses the i-th child of one `numpy.random.SeedSequence`, so results are
+reproducible for any number of workers. Batch results are merged
+incrementally and the run stops early once the 95% confidence intervals of
+the outcome probabilities and entanglement frequencies are narrow enough.
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    TrajectoryResult: Aggregated statistics of a trajectory run.
+
+Functions:
+    compile_circuit(circuit, values): Converts gates to raw kernel arguments.
+    run_batch(program, mat, noise, seeds, shots, entanglement): Runs
+        trajectories and returns their partial sums.
+    simulate(circuit, noise, ...): Runs trajectories until convergence.
+"""
+
+import concurrent.futures
+import itertools
+import os
+import numpy as np
+import qubit.engine as qe
+import qubit.entanglment as qent
+import qubit.gates as qg
+import qubit.measure as qm
+
+Z_value = 1.96
+X_matrix = np.array([[0, 1], [1, 0]], dtype=np.complex128)
+
+
+class TrajectoryResult:
+    """Aggregated statistics of a trajectory run.
+
+    Attributes:
+        trajectories (int): Number of trajectories run.
+        probabilities (numpy.ndarray): Mean outcome probabilities (2^n,).
+        probability_error (numpy.ndarray): 95% confidence half-widths.
+        counts (dict): Sampled outcomes {bitstring: count} over all
+                       trajectories.
+        entangled (numpy.ndarray): Fraction of trajectories in which a qubit
+                                   is entangled after each column, shape
+                                   (gate_num, n), or None.
+        entangled_error (numpy.ndarray): 95% confidence half-widths of
+                                         `entangled`, or None.
+        converged (bool): True if the run stopped on the tolerance.
+    """
+
+    def __init__(self, trajectories, probabilities, probability_error,
+                 counts, entangled, entangled_error, converged):
+        self.trajectories = trajectories
+        self.probabilities = probabilities
+        self.probability_error = probability_error
+        self.counts = counts
+        self.entangled = entangled
+        self.entangled_error = entangled_error
+        self.converged = converged
+
+    def __repr__(self) -> str:
+        return (f"TrajectoryResult(trajectories={self.trajectories}, "
+                f"converged={self.converged})")
+
+
+def compile_circuit(circuit, values=None):
+    """Converts the gates of a circuit into raw kernel arguments.
+
+    The result only holds 2x2 matrices and indices, so it is cheap to send
+    to worker processes.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+        values (dict, optional): Values of symbolic parameters.
+
+    Returns:
+        list: Per column, a list of (ops, qubits) per gate, where ops are
+              (u, target, controls, polarity) tuples applied in order and
+              qubits are the qubits the gate touches.
+    """
+    program = []
+    for col in range(circuit._shape[1]):
+        column = []
+        for gate in circuit._column_gates(col):
+            if isinstance(gate, qg.Swap):
+                a, b = gate._target, gate._control
+                ops = [(X_matrix, a, (b,), (1,)), (X_matrix, b, (a,), (1,)),
+                       (X_matrix, a, (b,), (1,))]
+            else:
+                ops = [(np.asarray(gate.base_matrix(values)), gate._target,
+                        gate.controls, gate.polarity)]
+            column.append((ops, (gate._target,) + tuple(gate.controls)))
+        program.append(column)
+    return program
+
+
+def _reduced(mat, qubit):
+    """2x2 reduced density matrix of one qubit of a (2^n, 1) state."""
+    view = mat.reshape(-1, 2, 1 << qubit)
+    amp0, amp1 = view[:, 0], view[:, 1]
+    off = np.vdot(amp1, amp0)
+    return np.array([[np.vdot(amp0, amp0).real, off],
+                     [np.conj(off), np.vdot(amp1, amp1).real]])
+
+
+def _apply_noise(mat, qubit, kraus, rng):
+    """Applies one randomly selected Kraus operator in place."""
+    rho = _reduced(mat, qubit)
+    weights = np.einsum("kab,bc,kac->k", kraus, rho, kraus.conj()).real
+    weights = np.clip(weights, 0, None)
+    pick = rng.choice(len(kraus), p=weights / weights.sum())
+    qe.apply_matrix(mat, kraus[pick] / np.sqrt(weights[pick]), qubit)
+
+
+def run_batch(program, mat, noise, seeds, shots=1, entanglement=True):
+    """Runs trajectories and returns their partial sums.
+
+    Args:
+        program (list): Output of `compile_circuit`.
+        mat (numpy.ndarray): Input state of shape (2^n, 1).
+        noise (list): Kraus operator arrays applied after every gate to
+                      every qubit it touches.
+        seeds (list): One numpy.random.SeedSequence per trajectory.
+        shots (int, optional): Samples drawn from every final state.
+        entanglement (bool, optional): Analyse every column state.
+
+    Returns:
+        dict: count, prob_sum, prob_sq_sum, hist and ent_sum.
+    """
+    n = int(np.log2(mat.shape[0]))
+    prob_sum = np.zeros(mat.shape[0])
+    prob_sq_sum = np.zeros(mat.shape[0])
+    hist = np.zeros(mat.shape[0], dtype=np.int64)
+    ent_sum = np.zeros((len(program), n), dtype=np.int64)
+    state = np.empty((mat.shape[0], 1), dtype=np.complex128)
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        state[...] = mat
+        for col, column in enumerate(program):
+            for ops, qubits in column:
+                for u, target, controls, polarity in ops:
+                    qe.apply_matrix(state, u, target, controls, polarity)
+                for qubit in qubits:
+                    for kraus in noise:
+                        _apply_noise(state, qubit, kraus, rng)
+            if entanglement:
+                labels = qent.labels(qent.entanglement(state), n)
+                ent_sum[col] += labels >= 0
+        prob = qm.marginal_probabilities(state)[:, 0]
+        prob_sum += prob
+        prob_sq_sum += prob**2
+        if shots:
+            hist += qm.sample_counts(state, shots, seed=rng)[:, 0]
+    return {"count": len(seeds), "prob_sum": prob_sum,
+            "prob_sq_sum": prob_sq_sum, "hist": hist, "ent_sum": ent_sum}
+
+
+def _half_widths(total):
+    """95% confidence half-widths of the running means."""
+    count = total["count"]
+    mean = total["prob_sum"] / count
+    var = np.clip(total["prob_sq_sum"] / count - mean**2, 0, None)
+    prob_error = Z_value * np.sqrt(var / max(count - 1, 1))
+    freq = total["ent_sum"] / count
+    ent_error = Z_value * np.sqrt(freq * (1 - freq) / count)
+    return mean, prob_error, freq, ent_error
+
+
+def simulate(circuit, noise, max_trajectories=1000, tolerance=0.01,
+             min_trajectories=50, batch_size=25, processes=None, seed=None,
+             shots=1, entanglement=True, values=None):
+    """Runs noisy trajectories of a circuit until the statistics converge.
+
+    Args:
+        circuit (circuit.quantum_circuit.QuantumCircuit): The circuit.
+        noise (qubit.noise.NoiseModel): Channels applied after every gate.
+        max_trajectories (int, optional): Upper bound of trajectories.
+        tolerance (float, optional): Stop once every 95% confidence
+                                     half-width is below this value.
+        min_trajectories (int, optional): Trajectories run before checking.
+        batch_size (int, optional): Trajectories per worker task.
+        processes (int, optional): Worker processes; 0 or 1 runs in this
+                                   process (default is os.cpu_count()).
+        seed (int, optional): Root seed of the run.
+        shots (int, optional): Samples drawn from every final state.
+        entanglement (bool, optional): Track per-column entanglement.
+        values (dict, optional): Values of symbolic parameters.
+
+    Returns:
+        TrajectoryResult: The aggregated statistics.
+
+    Raises:
+        ValueError: If max_trajectories or batch_size is smaller than 1, or
+                    min_trajectories exceeds max_trajectories.
+    """
+    if max_trajectories < 1:
+        raise ValueError(f"max_trajectories({max_trajectories}) must be at "
+                         "least 1")
+    if min_trajectories > max_trajectories:
+        raise ValueError(f"min_trajectories({min_trajectories}) must not "
+                         f"exceed max_trajectories({max_trajectories})")
+    if batch_size < 1:
+        raise ValueError(f"batch_size({batch_size}) must be at least 1")
+    program = compile_circuit(circuit, values)
+    mat = np.ascontiguousarray(circuit._qubit.mat, dtype=np.complex128)
+    channels = list(noise.channels) if noise else []
+    seeds = np.random.SeedSequence(seed).spawn(max_trajectories)
+    batches = [seeds[i:i + batch_size]
+               for i in range(0, max_trajectories, batch_size)]
+    processes = os.cpu_count() if processes is None else processes
+
+    total = None
+    converged = False
+
+    def merge(part):
+        """Adds the partial sums of a batch to the running totals."""
+        nonlocal total
+        if total is None:
+            total = part
+        else:
+            for key in total:
+                total[key] = total[key] + part[key]
+
+    def done():
+        """Checks the stopping rule on the running totals."""
+        if total["count"] < min_trajectories:
+            return False
+        _, prob_error, _, ent_error = _half_widths(total)
+        return prob_error.max() < tolerance and \
+            (not entanglement or ent_error.max(initial=0) < tolerance)
+
+    if processes <= 1:
+        for batch in batches:
+            merge(run_batch(program, mat, channels, batch, shots,
+                            entanglement))
+            if done():
+                converged = True
+                break
+    else:
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            pending = iter(batches)
+            running = [pool.submit(run_batch, program, mat, channels, batch,
+                                   shots, entanglement)
+                       for batch in itertools.islice(pending, processes)]
+            # results are merged in submission order for reproducibility
+            while running:
+                merge(running.pop(0).result())
+                if done():
+                    converged = True
+                    for future in running:
+                        future.cancel()
+                    break
+                batch = next(pending, None)
+                if batch is not None:
+                    running.append(pool.submit(run_batch, program, mat,
+                                               channels, batch, shots,
+                                               entanglement))
+
+    mean, prob_error, freq, ent_error = _half_widths(total)
+    return TrajectoryResult(total["count"], mean, prob_error,
+                            qm.counts_to_dict(total["hist"],
+                                              circuit._shape[0]),
+                            freq if entanglement else None,
+                            ent_error if entanglement else None, converged)
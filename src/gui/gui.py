@@ -17,11 +17,20 @@ from PyQt5 import uic
 from PyQt5.QtGui import QPainter, QPen, QColor, QFont
 from PyQt5.QtCore import Qt, QPoint
 import circuit.quantum_circuit as circuit
+import circuit.cache as cache
+import circuit.planner as planner
 import qubit.qubit as qb
 import qubit.gates as qg
 
 QUBIT_NUM = 2
+MEMORY_BUDGET = planner.Default_memory_budget
+TIME_BUDGET = 30
+# per-column backends of the planner: use the optimization pass or not
+PLAN_OPTIMIZE = {"classical": False, "statevector": True}
+TABLE_TERMS = 16
 CIRCUIT_LEN = 10
+GATE_TYPES = {"X": qg.X, "Y": qg.Y, "Z": qg.Z, "H": qg.H}
+GATE_ITEMS = ["", "X", "Y", "Z", "H", "⊙", "○"]
 
 
 class TwoInputDialog(QDialog):
@@ -90,94 +99,99 @@ class QuantumGate(QComboBox):
         self.setFont(font)
         self.is_active = False
 
+    def cell(self):
+        '''Return the (row, col) encoded in the object name "gate<row>_<col>"'''
+        row, col = self.objectName()[len("gate"):].split("_")
+        return int(row), int(col)
+
     def handle_selection(self, index):
         ''''handle function when gate is selected on the box'''
         if self.objectName():
             selected_item = self.currentText()
             if self.is_control:
-                idx = 0
-                for _, x, y, to in self.parent().control_draw_list:
-                    if (x == int(self.objectName()[4])
-                            and y == int(self.objectName()[6])):
-                        self.parent().gate_widget_list[to][y + 2].show()
-                        self.parent().gate_widget_list[to][y + 2].is_active = False
-                        self.is_active = False
+                row, col = self.cell()
+                for idx, (gate, x, y, to, _) in enumerate(self.parent().control_draw_list):
+                    if x == row and y == col:
                         del self.parent().control_draw_list[idx]
-
-                        self.parent().QC.del_gate(to, y)
+                        self.is_control = False
+                        self.is_active = False
+                        self.update_controlled_gate(gate, to, col)
                         print("deleted")
                         break
-                    idx += 1
 
             # IF control gated is choosen
             if selected_item == "⊙":
-                self.handle_control()
+                self.handle_control(1)
+            elif selected_item == "○":
+                self.handle_control(0)
             # IF X,Y,Z,H gate is choosen
-            elif selected_item in ["X", "Y", "Z", "H"]:
+            elif selected_item in GATE_TYPES:
                 self.is_active = True
-                if selected_item == "X":
-                    self.parent().QC.add_gate(
-                        int(self.objectName()[4]), int(self.objectName()[6]),
-                        qg.X(QUBIT_NUM, int(self.objectName()[4])))
-                elif selected_item == "Y":
-                    self.parent().QC.add_gate(
-                        int(self.objectName()[4]), int(self.objectName()[6]),
-                        qg.Y(QUBIT_NUM, int(self.objectName()[4])))
-                elif selected_item == "Z":
-                    self.parent().QC.add_gate(
-                        int(self.objectName()[4]), int(self.objectName()[6]),
-                        qg.Z(QUBIT_NUM, int(self.objectName()[4])))
-                elif selected_item == "H":
-                    self.parent().QC.add_gate(
-                        int(self.objectName()[4]), int(self.objectName()[6]),
-                        qg.H(QUBIT_NUM, int(self.objectName()[4])))
+                row, col = self.cell()
+                self.parent().QC.add_gate(
+                    row, col, GATE_TYPES[selected_item](QUBIT_NUM, row))
             else:
-                self.parent().QC.del_gate(int(self.objectName()[4]),
-                                          int(self.objectName()[6]))
+                self.parent().QC.del_gate(*self.cell())
                 self.is_active = False
 
             self.parent().update()
 
+    def update_controlled_gate(self, gate, target, col):
+        '''Rebuild the gate at (target, col) from every control pointing at it
 
-    def handle_control(self):
-        '''handle function for control gate'''
+        Controls in the same column with the same target and gate type are
+        merged into one multi-controlled gate. When the last control is
+        removed, the target cell is freed again.
+        '''
+        controls = []
+        polarity = []
+        for _, x, y, to, value in self.parent().control_draw_list:
+            if y == col and to == target:
+                controls.append(x)
+                polarity.append(value)
+        target_widget = self.parent().gate_widget_list[target][col + 2]
+        if controls:
+            self.parent().QC.add_gate(
+                target, col, GATE_TYPES[gate](QUBIT_NUM, target, controls, polarity))
+            target_widget.is_active = True
+        else:
+            self.parent().QC.del_gate(target, col)
+            target_widget.show()
+            target_widget.is_active = False
+
+    def handle_control(self, polarity):
+        '''handle function for control gate
+
+        Args:
+            polarity (int): 1 for a control on |1> (⊙), 0 for a control on |0> (○).
+        '''
         dialog = TwoInputDialog()
         dialog.exec_()
-        if not dialog.return_value2.isnumeric() or (int(dialog.return_value2) >= QUBIT_NUM) or int(dialog.return_value2)==int(self.objectName()[4]):
+        row, col = self.cell()
+        if not dialog.return_value2 or not dialog.return_value2.isnumeric() or (int(dialog.return_value2) >= QUBIT_NUM) or int(dialog.return_value2)==row:
             QMessageBox.warning(self, 'Warning', 'Please check your input', QMessageBox.Ok)
             self.setCurrentIndex(0)
             return None
-
+        target = int(dialog.return_value2)
+        target_widget = self.parent().gate_widget_list[target][col + 2]
+        merged = [gate for gate, _, y, to, _ in self.parent().control_draw_list
+                  if y == col and to == target]
+        if target_widget.is_control or (merged and merged[0] != dialog.return_value1) or \
+                (not merged and target_widget.is_active):
+            QMessageBox.warning(self, 'Warning', 'Target is already used', QMessageBox.Ok)
+            self.setCurrentIndex(0)
+            return None
 
         self.parent().control_draw_list.append([
             dialog.return_value1,
-            int(self.objectName()[4]),
-            int(self.objectName()[6]),
-            int(dialog.return_value2)
+            row,
+            col,
+            target,
+            polarity
         ])
         self.is_control = True
         self.is_active = True
-        self.parent().gate_widget_list[int(dialog.return_value2)][int(self.objectName()[6])+2].is_active = True
-        if dialog.return_value1 == "X":
-            self.parent().QC.add_gate(
-                int(dialog.return_value2), int(self.objectName()[6]),
-                qg.X(QUBIT_NUM, int(dialog.return_value2),
-                     int(self.objectName()[4])))
-        elif dialog.return_value1 == "Y":
-            self.parent().QC.add_gate(
-                int(dialog.return_value2), int(self.objectName()[6]),
-                qg.Y(QUBIT_NUM, int(dialog.return_value2),
-                     int(self.objectName()[4])))
-        elif dialog.return_value1 == "Z":
-            self.parent().QC.add_gate(
-                int(dialog.return_value2), int(self.objectName()[6]),
-                qg.Z(QUBIT_NUM, int(dialog.return_value2),
-                     int(self.objectName()[4])))
-        elif dialog.return_value1 == "H":
-            self.parent().QC.add_gate(
-                int(dialog.return_value2), int(self.objectName()[6]),
-                qg.H(QUBIT_NUM, int(dialog.return_value2),
-                     int(self.objectName()[4])))
+        self.update_controlled_gate(dialog.return_value1, target, col)
 
         print(self.parent().control_draw_list)
 
@@ -235,6 +249,8 @@ class WindowClass(QMainWindow, form_class):
         self.entangled_draw_list = []
         # result of qubit
         self.qubit_cal_list = []
+        # results of earlier runs, shared across sessions
+        self.result_cache = cache.ResultCache()
 
 
         y = 80
@@ -259,7 +275,7 @@ class WindowClass(QMainWindow, form_class):
                 tmp = QuantumGate(self)
                 tmp.resize(60, 60)
                 tmp.move(x, y)
-                tmp.addItems(["", "X", "Y", "Z", "H", "⊙"])
+                tmp.addItems(GATE_ITEMS)
                 tmp.setObjectName("gate" + str(i) + "_" + str(j))
                 x += 110
                 tmp_list.append(tmp)
@@ -282,7 +298,7 @@ class WindowClass(QMainWindow, form_class):
         start_point = (0, 0)
         end_point = (0, 0)
 
-        for gate, x, y, to in self.control_draw_list:
+        for gate, x, y, to, _ in self.control_draw_list:
             position1 = self.gate_widget_list[x][y + 2].pos()
             position2 = self.gate_widget_list[to][y + 2].pos()
             start_point = (position1.x() + 30, position1.y() + 30)
@@ -347,22 +363,46 @@ class WindowClass(QMainWindow, form_class):
 
         
 
+    def check_plan(self, extra_qubits=0):
+        '''Return the simulation plan, or warn and return None if the circuit
+        exceeds the memory or time budget'''
+        plan = planner.plan(self.QC, memory_budget=MEMORY_BUDGET,
+                            time_budget=TIME_BUDGET, extra_qubits=extra_qubits)
+        if plan.limit == "memory":
+            QMessageBox.warning(self, 'Error',
+                                'Qubit number exceeds the memory budget '
+                                f'({plan.min_memory / 2**20:.0f} MiB needed, '
+                                f'{MEMORY_BUDGET / 2**20:.0f} MiB allowed)',
+                                QMessageBox.Ok)
+        elif plan.limit == "time":
+            QMessageBox.warning(self, 'Error',
+                                'Circuit exceeds the time budget '
+                                f'({plan.min_seconds:.3g} s estimated, '
+                                f'{TIME_BUDGET} s allowed)',
+                                QMessageBox.Ok)
+        return plan if plan.fits else None
+
     def handle_button_cal(self):
         '''Handle function when click calculate button'''
-        self.qubit_cal_list = self.QC.calculate_qubit_state()
-        self.entangled_draw_list = []
+        plan = self.check_plan()
+        if plan is None:
+            return None
+        # every column state is shown, so the planner picks one of the
+        # per-column backends
+        strategy = plan.choice.strategy
+        self.qubit_cal_list, self.entangled_draw_list = \
+            self.result_cache.run(self.QC, optimize=PLAN_OPTIMIZE[strategy],
+                                  backend=strategy)
 
         for idx, qubit_cal in enumerate(self.qubit_cal_list):
-            # will be changed when Qubit code fixed
-            self.entangled_draw_list.append(qubit_cal.entangled())
             # update qubit result at result table
             self.tableWidget.setItem(idx+1, 0, QTableWidgetItem(str(idx)))
-            self.tableWidget.setItem(idx+1, 1, QTableWidgetItem(str(qubit_cal)))
+            self.tableWidget.setItem(idx+1, 1, QTableWidgetItem(qubit_cal.ket(TABLE_TERMS)))
 
         
-        print("entangle",self.qubit_cal_list[-1].entangled())
+        print("entangle",self.entangled_draw_list[-1])
 
-        self.result_0.setText(str(self.qubit_cal_list[-1]))
+        self.result_0.setText(self.qubit_cal_list[-1].ket(TABLE_TERMS))
         print("check",self.entangled_draw_list)
         self.update()
 
@@ -371,8 +411,7 @@ class WindowClass(QMainWindow, form_class):
     def handle_button_add(self):
         '''Handle function when click add qubit button'''
         global QUBIT_NUM
-        if QUBIT_NUM >= 7:
-            QMessageBox.warning(self, 'Error', 'Qubit number exceed max', QMessageBox.Ok)
+        if not self.check_plan(extra_qubits=1):
             return None
         QUBIT_NUM += 1
         y = self.gate_widget_list[-1][0].pos().y() + 80
@@ -398,7 +437,7 @@ class WindowClass(QMainWindow, form_class):
             tmp.move(x, y)
             tmp.show()
 
-            tmp.addItems(["", "X", "Y", "Z", "H", "⊙"])
+            tmp.addItems(GATE_ITEMS)
             tmp.setObjectName("gate" + str(label_no) + "_" + str(j))
             x += 110
             tmp_list.append(tmp)
@@ -0,0 +1,259 @@
+"""
+Density-Matrix Backend
+
+This module simulates mixed states. A density matrix rho of n qubits is
+stored C-contiguous as (2^n, 2^n); flattened, it is a vector of 2n qubits
+whose bit q + n is bit q of the row index and bit q is bit q of the column
+index. A gate U therefore acts as the superoperator U (x) conj(U), i.e. U on
+qubit q + n and conj(U) on qubit q of that vector, which the gate engine
+applies in place without ever forming a 4^n x 4^n matrix. Noise channels act
+as 4x4 superoperators on the (row bit, column bit) pair of a qubit, updated
+in place block by block so the only temporaries are one block of
+`Channel_block` amplitudes.
+
+Mixed-state entanglement is detected with the PPT (positive partial
+transpose) criterion: a negative eigenvalue of rho partially transposed on a
+qubit subset proves entanglement across that cut. The cuts of one size are
+stacked and diagonalized in batched `eigvalsh` calls of at most
+`Ppt_chunk_bytes` of matrices each.
+
+Author: Minjong Kim
+Email: tlemsl@dgist.ac.kr
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    DensityMatrix: Mixed state of n qubits.
+
+Functions:
+    apply_gate(vec, gate, n, values): Applies a gate superoperator in place.
+    apply_channel(vec, kraus, qubit, n): Applies a noise channel in place.
+    partial_transposes(mat, cuts): Batch of partially transposed matrices.
+    ppt_chunk(n): Cuts diagonalized per batch.
+    ppt_entanglement(mat): Entangled qubit sets of a mixed state.
+"""
+
+import itertools
+import math
+import numpy as np
+import qubit.engine as qe
+import qubit.gates as qg
+import qubit.noise as qn
+
+Threshold = 1e-9
+Channel_block = 2**16
+Ppt_chunk_bytes = 2**27
+X_matrix = np.array([[0, 1], [1, 0]], dtype=np.complex128)
+
+
+def apply_gate(vec, gate, n, values=None):
+    """Applies a gate to a flattened density matrix in place.
+
+    Args:
+        vec (numpy.ndarray): rho reshaped to (4^n, 1).
+        gate (qubit.gates.Base): The gate.
+        n (int): The number of qubits of rho.
+        values (dict, optional): Parameter values of symbolic gates.
+
+    Returns:
+        numpy.ndarray: The updated vector (the same array).
+    """
+    if isinstance(gate, qg.Swap):
+        pairs = [(gate._target, gate._control), (gate._control, gate._target),
+                 (gate._target, gate._control)]
+        for target, control in pairs:
+            qe.apply_matrix(vec, X_matrix, target + n, control + n)
+            qe.apply_matrix(vec, X_matrix, target, control)
+        return vec
+    controls = gate.controls
+    shifted = [c + n for c in controls]
+    if isinstance(gate, qg.Diagonal):
+        d0, d1 = gate.diagonal(values)
+        qe.apply_phase(vec, d0, d1, gate._target + n, shifted, gate.polarity)
+        return qe.apply_phase(vec, np.conj(d0), np.conj(d1), gate._target,
+                              controls, gate.polarity)
+    u = gate.base_matrix(values)
+    qe.apply_matrix(vec, u, gate._target + n, shifted, gate.polarity)
+    return qe.apply_matrix(vec, np.conj(u), gate._target, controls,
+                           gate.polarity)
+
+
+def apply_channel(vec, kraus, qubit, n):
+    """Applies a single-qubit channel to a flattened density matrix in place.
+
+    Args:
+        vec (numpy.ndarray): rho reshaped to (4^n, 1).
+        kraus (numpy.ndarray): Kraus operators of shape (k, 2, 2).
+        qubit (int): The qubit the channel acts on.
+        n (int): The number of qubits of rho.
+
+    Returns:
+        numpy.ndarray: The updated vector (the same array).
+    """
+    sop = qn.superoperator(kraus).reshape(2, 2, 2, 2)
+    terms = [[(sop[a, b, c, d], c, d)
+              for c, d in itertools.product(range(2), repeat=2)
+              if sop[a, b, c, d] != 0]
+             for a, b in itertools.product(range(2), repeat=2)]
+    # axes: (higher bits, row bit, middle bits, column bit, lower bits)
+    view = vec.reshape(-1, 2, 2**(n - 1), 2, 2**qubit)
+    high, _, middle, _, low = view.shape
+    step_middle = min(middle, max(1, Channel_block // (4 * low)))
+    step_high = min(high, max(1, Channel_block // (4 * low * step_middle)))
+    for h in range(0, high, step_high):
+        for m in range(0, middle, step_middle):
+            block = view[h:h + step_high, :, m:m + step_middle]
+            old = block.copy()
+            for (a, b), products in zip(
+                    itertools.product(range(2), repeat=2), terms):
+                block[:, a, :, b] = sum(value * old[:, c, :, d]
+                                        for value, c, d in products)
+    return vec
+
+
+def partial_transposes(mat, cuts):
+    """Builds rho partially transposed on each qubit subset.
+
+    Args:
+        mat (numpy.ndarray): Density matrix of shape (2^n, 2^n).
+        cuts (list): Qubit subsets to transpose.
+
+    Returns:
+        numpy.ndarray: Array of shape (len(cuts), 2^n, 2^n).
+    """
+    dim = mat.shape[0]
+    n = int(math.log2(dim))
+    tensor = mat.reshape((2,) * (2 * n))
+    ret = np.empty((len(cuts), dim, dim), dtype=np.complex128)
+    for i, cut in enumerate(cuts):
+        axes = list(range(2 * n))
+        for q in cut:
+            row, col = n - 1 - q, 2 * n - 1 - q
+            axes[row], axes[col] = col, row
+        ret[i] = tensor.transpose(axes).reshape(dim, dim)
+    return ret
+
+
+def ppt_chunk(n):
+    """Number of cuts diagonalized per batch for n qubits.
+
+    Args:
+        n (int): The number of qubits.
+
+    Returns:
+        int: Cuts whose partially transposed matrices fit `Ppt_chunk_bytes`,
+             at least 1.
+    """
+    return max(1, Ppt_chunk_bytes // (16 * 4**n))
+
+
+def ppt_entanglement(mat):
+    """Calculates the entangled qubit sets of a mixed state.
+
+    Subsets of increasing size are tested against the rest of the register,
+    `ppt_chunk(n)` cuts per batched diagonalization; a subset whose partial
+    transpose has no negative eigenvalue is split off. The remaining qubits
+    form one entangled set. As in `qubit.entanglment.entanglement`,
+    separable qubits are omitted.
+
+    Args:
+        mat (numpy.ndarray): Density matrix of shape (2^n, 2^n).
+
+    Returns:
+        list: A list of set of entangled qubits, [set()] if none.
+    """
+    n = int(math.log2(mat.shape[0]))
+    chunk = ppt_chunk(n)
+    remaining = list(range(n))
+    groups = []
+    size = 1
+    while 2 * size <= len(remaining):
+        cuts = list(itertools.combinations(remaining, size))
+        for start in range(0, len(cuts), chunk):
+            # cuts overlapping a split-off subset are no longer tested
+            part = [cut for cut in cuts[start:start + chunk]
+                    if set(cut) <= set(remaining)]
+            if not part:
+                continue
+            lowest = np.linalg.eigvalsh(partial_transposes(mat, part))[:, 0]
+            for cut, value in zip(part, lowest):
+                if value >= -Threshold and set(cut) <= set(remaining):
+                    groups.append(set(cut))
+                    remaining = [q for q in remaining if q not in cut]
+        size += 1
+    groups.append(set(remaining))
+    ret = [group for group in groups if len(group) > 1]
+    return ret if ret else [set()]
+
+
+class DensityMatrix:
+    """Mixed state of n qubits.
+
+    Attributes:
+        mat (numpy.ndarray): The (2^n, 2^n) density matrix.
+        n (int): The number of qubits.
+    """
+
+    def __init__(self, mat):
+        """Initialize a density matrix.
+
+        Args:
+            mat (numpy.ndarray): Square matrix of shape (2^n, 2^n), or a state
+                                 vector of shape (2^n, 1) to purify.
+
+        Raises:
+            ValueError: If the shape is invalid.
+        """
+        mat = np.asarray(mat, dtype=np.complex128)
+        if mat.ndim == 2 and mat.shape[1] == 1:
+            mat = mat @ mat.conj().T
+        if mat.ndim != 2 or mat.shape[0] != mat.shape[1]:
+            raise ValueError("Density matrix must be square")
+        self._mat = np.ascontiguousarray(mat)
+        self._n = int(math.log2(mat.shape[0]))
+
+    def __len__(self):
+        """Return the number of qubits."""
+        return self._n
+
+    @property
+    def mat(self):
+        """Getter for the density matrix."""
+        return self._mat
+
+    def copy(self):
+        """Returns an independent copy."""
+        return DensityMatrix(self._mat.copy())
+
+    def apply_gate(self, gate, values=None):
+        """Applies a gate in place.
+
+        Args:
+            gate (qubit.gates.Base): The gate.
+            values (dict, optional): Parameter values of symbolic gates.
+        """
+        apply_gate(self._mat.reshape(-1, 1), gate, self._n, values)
+
+    def apply_channel(self, kraus, qubit):
+        """Applies a single-qubit noise channel in place.
+
+        Args:
+            kraus (numpy.ndarray): Kraus operators of shape (k, 2, 2).
+            qubit (int): The qubit the channel acts on.
+        """
+        apply_channel(self._mat.reshape(-1, 1), kraus, qubit, self._n)
+
+    def probabilities(self):
+        """Basis state probabilities, the real diagonal of rho."""
+        return self._mat.diagonal().real.copy()
+
+    def purity(self):
+        """Purity tr(rho^2), 1 for pure states."""
+        return float(np.vdot(self._mat, self._mat).real)
+
+    def entangled(self):
+        """Determines the entangled qubit sets with the PPT criterion.
+
+        Returns:
+            list: A list of set of entangled qubits.
+        """
+        return ppt_entanglement(self._mat)
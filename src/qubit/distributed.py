@@ -0,0 +1,292 @@
+"""
+Distributed State Vector
+
+This module partitions the amplitudes of an n qubit state across P = 2^g
+local worker processes. The state lives in one `multiprocessing`
+shared-memory block; worker r owns the contiguous rows
+[r 2^(n-g), (r + 1) 2^(n-g)), so the low n - g bits of an index are "local"
+to a worker and the top g bits are "global", fixed by the worker rank.
+
+A coordinator sends gate commands to every worker over a pipe:
+
+* Controls on global bits are resolved by the rank; a worker whose global
+  bits do not match simply skips the gate.
+* Diagonal gates on a global bit reduce to a phase on the whole partition.
+* Any other gate on a global bit first swaps that bit with a local one:
+  each worker whose global bit is 0 exchanges its half with local bit 1 for
+  the partner's half with local bit 0. The coordinator only records the new
+  qubit-to-bit layout, so a qubit stays local until it is swapped out
+  again, and Swap gates cost nothing but a layout change.
+
+Commands between two exchanges are sent as one batch; an exchange waits for
+every worker to finish, since it touches its partner's partition.
+
+Author: Minjong Kim
+Email: tlemsl@dgist.ac.kr
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    DistributedState: State vector partitioned across worker processes.
+"""
+
+import math
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+import numpy as np
+import qubit.engine as qe
+import qubit.gates as qg
+
+
+def _split_controls(rank, local_n, controls, polarity):
+    """Resolves global controls by rank.
+
+    Returns:
+        tuple: (active, local controls, local polarity).
+    """
+    local, values = [], []
+    for control, value in zip(controls, polarity):
+        if control < local_n:
+            local.append(control)
+            values.append(value)
+        elif (rank >> (control - local_n)) & 1 != value:
+            return False, None, None
+    return True, local, values
+
+
+def _execute(command, rank, local_n, parts):
+    """Runs one command on the partition of a worker."""
+    kind = command[0]
+    local = parts[rank]
+    if kind == "exchange":
+        _, global_bit, local_bit = command
+        shift = global_bit - local_n
+        if (rank >> shift) & 1:
+            return
+        batch = local.shape[1]
+        mine = local.reshape(-1, 2, 1 << local_bit, batch)[:, 1]
+        theirs = parts[rank | (1 << shift)].reshape(
+            -1, 2, 1 << local_bit, batch)[:, 0]
+        buffer = mine.copy()
+        mine[...] = theirs
+        theirs[...] = buffer
+        return
+
+    target, controls, polarity = command[-3:]
+    active, controls, polarity = _split_controls(rank, local_n, controls,
+                                                 polarity)
+    if not active:
+        return
+    if kind == "matrix":
+        qe.apply_matrix(local, command[1], target, controls, polarity)
+        return
+    d0, d1 = command[1], command[2]
+    if target < local_n:
+        qe.apply_phase(local, d0, d1, target, controls, polarity)
+        return
+    # the global target bit selects one phase for the whole partition
+    phase = d1 if (rank >> (target - local_n)) & 1 else d0
+    if not controls:
+        local *= phase
+    elif polarity[0]:
+        qe.apply_phase(local, 1, phase, controls[0], controls[1:],
+                       polarity[1:])
+    else:
+        qe.apply_phase(local, phase, 1, controls[0], controls[1:],
+                       polarity[1:])
+
+
+def _worker(name, shape, rank, workers, threads, conn):
+    """Worker process loop; executes command batches until None."""
+    qe.set_threads(threads)
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        full = np.ndarray(shape, dtype=np.complex128, buffer=memory.buf)
+        rows = shape[0] // workers
+        parts = [full[i * rows:(i + 1) * rows] for i in range(workers)]
+        local_n = int(math.log2(rows))
+        while True:
+            commands = conn.recv()
+            if commands is None:
+                break
+            try:
+                for command in commands:
+                    _execute(command, rank, local_n, parts)
+                conn.send(None)
+            except Exception as error:  # reported to the coordinator
+                conn.send(error)
+        del full, parts
+    finally:
+        memory.close()
+        conn.close()
+
+
+class DistributedState:
+    """State vector partitioned across worker processes.
+
+    Use as a context manager, or call `close` to stop the workers and free
+    the shared memory.
+
+    Attributes:
+        n (int): The number of qubits.
+        workers (int): The number of worker processes.
+        mat (numpy.ndarray): Copy of the state in qubit order, (2^n, B).
+    """
+
+    def __init__(self, mat, workers=2):
+        """Copies a state into shared memory and starts the workers.
+
+        Args:
+            mat (numpy.ndarray): The state of shape (2^n, B).
+            workers (int, optional): Number of worker processes, a power of
+                                     two smaller than 2^n (default is 2).
+
+        Raises:
+            ValueError: If the worker count is invalid.
+        """
+        mat = np.asarray(mat, dtype=np.complex128)
+        if mat.ndim == 1:
+            mat = mat.reshape(-1, 1)
+        self._n = int(math.log2(mat.shape[0]))
+        if workers < 1 or workers & (workers - 1) or workers >= mat.shape[0]:
+            raise ValueError("Worker count must be a power of two below 2^n")
+        self._workers = workers
+        self._local_n = self._n - int(math.log2(workers))
+        # physical bit holding each qubit
+        self._layout = list(range(self._n))
+        self._pending = []
+
+        self._memory = shared_memory.SharedMemory(create=True,
+                                                  size=max(mat.nbytes, 1))
+        self._shape = mat.shape
+        self._full = np.ndarray(mat.shape, dtype=np.complex128,
+                                buffer=self._memory.buf)
+        self._full[...] = mat
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        context = multiprocessing.get_context("spawn")
+        self._conns = []
+        self._processes = []
+        for rank in range(workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker,
+                                      args=(self._memory.name, mat.shape,
+                                            rank, workers, threads, child),
+                                      daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        """Return the number of qubits."""
+        return self._n
+
+    @property
+    def n(self):
+        """Getter for the number of qubits."""
+        return self._n
+
+    @property
+    def workers(self):
+        """Getter for the number of worker processes."""
+        return self._workers
+
+    @property
+    def mat(self):
+        """Gathers the state in qubit order."""
+        self._flush()
+        n, batch = self._n, self._shape[1]
+        tensor = self._full.reshape((2,) * n + (batch,))
+        # qubit q sits on axis n - 1 - layout[q] of the shared buffer
+        axes = [n - 1 - self._layout[n - 1 - axis] for axis in range(n)]
+        return np.ascontiguousarray(
+            tensor.transpose(axes + [n])).reshape(self._shape)
+
+    def close(self):
+        """Stops the workers and frees the shared memory."""
+        if self._memory is None:
+            return
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        for conn in self._conns:
+            conn.close()
+        del self._full
+        self._memory.close()
+        self._memory.unlink()
+        self._memory = None
+
+    def _round(self, commands):
+        """Sends a command batch to every worker and waits for all."""
+        if self._memory is None:
+            raise ValueError("Distributed state is closed")
+        for conn in self._conns:
+            conn.send(commands)
+        errors = [conn.recv() for conn in self._conns]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _flush(self):
+        """Runs the queued commands."""
+        if self._pending:
+            commands, self._pending = self._pending, []
+            self._round(commands)
+
+    def _localize(self, qubit, keep):
+        """Swaps a qubit on a global bit with a local bit."""
+        bit = self._layout[qubit]
+        free = [b for b in range(self._local_n - 1, -1, -1) if b not in keep]
+        swap = free[0] if free else self._local_n - 1
+        self._flush()
+        self._round([("exchange", bit, swap)])
+        other = self._layout.index(swap)
+        self._layout[qubit], self._layout[other] = swap, bit
+
+    def apply_gate(self, gate, values=None):
+        """Queues a gate on the distributed state.
+
+        Args:
+            gate (qubit.gates.Base): The gate.
+            values (dict, optional): Parameter values of symbolic gates.
+        """
+        if isinstance(gate, qg.Swap):
+            a, b = gate._target, gate._control
+            self._layout[a], self._layout[b] = self._layout[b], \
+                self._layout[a]
+            return
+        controls = [self._layout[c] for c in gate.controls]
+        polarity = list(gate.polarity)
+        if isinstance(gate, qg.Diagonal):
+            d0, d1 = gate.diagonal(values)
+            self._pending.append(("phase", d0, d1,
+                                  self._layout[gate._target], controls,
+                                  polarity))
+            return
+        if self._layout[gate._target] >= self._local_n:
+            self._localize(gate._target, controls)
+            controls = [self._layout[c] for c in gate.controls]
+        self._pending.append(("matrix", gate.base_matrix(values),
+                              self._layout[gate._target], controls,
+                              polarity))
+
+    def apply_gates(self, gates, values=None):
+        """Applies a sequence of gates and waits for the workers.
+
+        Args:
+            gates (iterable): Gates in application order.
+            values (dict, optional): Parameter values of symbolic gates.
+        """
+        for gate in gates:
+            self.apply_gate(gate, values)
+        self._flush()
@@ -0,0 +1,499 @@
+"""
+Gate Application Engine
+
+This module applies gates directly to state vectors instead of multiplying
+2^n x 2^n gate matrices. A state is a C-contiguous array of shape (2^n, B)
+holding B column states, e.g. `Qubit.mat` (B = 1) or a batch of states of a
+parameter sweep. A gate only mixes amplitude pairs whose indices differ in the
+target bit, so it is applied by viewing the state as a (2^(n-1-t), 2, 2^t, B)
+tensor and combining the two halves of the target axis. Controlled gates only
+touch the 2^(n-c) amplitudes whose c control bits match, selected through an
+index mask; masks of small states are kept in a cache bounded by bytes.
+
+Diagonal gates (`qubit.gates.Diagonal`) are applied as element-wise phase
+multiplications. A run of consecutive diagonal gates is fused into one phase
+table that only spans the qubits the run touches; the table is broadcast
+against the (2, ..., 2, B) tensor view of the state, so the whole run costs a
+single pass over the state.
+
+Large states are split into blocks of amplitudes that never straddle the
+target or control bits, i.e. ranges of the high bits above the target (or
+of the low bits below it when the target is high), and the blocks run on a
+shared thread pool. NumPy releases the GIL inside its element-wise loops,
+so the blocks proceed in parallel. States below `Parallel_threshold`
+amplitudes, or a thread count of 1, take the serial path. When the compiled
+kernels of `qubit.kernels` are enabled, single gates are handed to them
+instead and the NumPy code serves as the reference path.
+
+Author: Minjong Kim
+Email: tlemsl@dgist.ac.kr
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Functions:
+    set_threads(count): Sets the number of kernel threads.
+    get_threads(): Gets the number of kernel threads.
+    controlled_indices(n, target, controls, polarity): Index mask of the
+                                                      controlled subspace.
+    clear_index_cache(): Drops the cached index masks.
+    apply_matrix(state, u, target, control, polarity): Applies a 2x2 matrix
+                                                       in place.
+    apply_gate(state, gate, values, adjoint): Applies a gate object in place.
+    apply_phase(state, d0, d1, target, control, polarity): Applies a diagonal
+                                                           gate in place.
+    phase_table(n, gates, values): Fused phase table of diagonal gates.
+    apply_gates(state, gates, values): Applies a gate sequence in place,
+                                       fusing runs of diagonal gates.
+    project_controls(state, control, polarity): Zeroes the amplitudes outside
+                                                the controlled subspace.
+    is_classical(gate): Checks if a gate maps basis states to basis states.
+    apply_classical(bits, gates): Pushes basis indices through X gates.
+"""
+
+import collections
+import concurrent.futures
+import math
+import os
+import threading
+import numpy as np
+import qubit.gates as qg
+import qubit.kernels as qk
+import util.profiler as prof
+
+Parallel_threshold = 2**16
+Index_cache_bytes = 2**26
+Index_cache_entry_bytes = 2**23
+_threads = os.cpu_count() or 1
+_pool = None
+_index_cache = collections.OrderedDict()
+_index_cache_bytes = 0
+_index_lock = threading.Lock()
+
+
+def set_threads(count):
+    """Sets the number of threads used by the gate kernels.
+
+    Args:
+        count (int): Thread count; 1 disables threading.
+
+    Raises:
+        ValueError: If count is smaller than 1.
+    """
+    global _threads, _pool
+    if count < 1:
+        raise ValueError("Thread count must be at least 1")
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+    _threads = int(count)
+
+
+def get_threads():
+    """Gets the number of threads used by the gate kernels.
+
+    Returns:
+        int: The thread count.
+    """
+    return _threads
+
+
+def _block_count(size):
+    """Number of blocks to split a kernel over `size` amplitudes into."""
+    if _threads <= 1 or size < Parallel_threshold:
+        return 1
+    return _threads
+
+
+def _ranges(length, blocks):
+    """Splits range(length) into at most `blocks` contiguous slices."""
+    bounds = np.linspace(0, length, min(blocks, length) + 1).astype(int)
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _run(kernel, blocks):
+    """Runs kernel(block) for every block, on the thread pool if several."""
+    global _pool
+    if len(blocks) == 1:
+        kernel(blocks[0])
+        return
+    if _pool is None:
+        _pool = concurrent.futures.ThreadPoolExecutor(_threads)
+    for future in [_pool.submit(kernel, block) for block in blocks]:
+        future.result()
+
+
+def _pair_blocks(view):
+    """Blocks of a (high, 2, low, B) view that keep target pairs together."""
+    high, _, low, _ = view.shape
+    blocks = _block_count(view.size)
+    if blocks == 1:
+        return [(slice(None), slice(None))]
+    if high >= blocks:
+        return [(part, slice(None)) for part in _ranges(high, blocks)]
+    return [(slice(None), part) for part in _ranges(low, blocks)]
+
+
+def controlled_indices(n, target, controls, polarity):
+    """Indices with the target bit cleared and every control bit matching.
+
+    The 2^(n-1-c) free indices are enumerated directly by inserting the fixed
+    bits into a counter, so the cost never depends on the full 2^n range.
+    Results up to `Index_cache_entry_bytes` are kept in a least recently
+    used cache of at most `Index_cache_bytes`; larger ones are rebuilt per
+    call, as the gate pass over the state costs more than building them.
+    The result must not be modified.
+
+    Args:
+        n (int): The number of qubits.
+        target (int): The target qubit index.
+        controls (tuple): The control qubit indices.
+        polarity (tuple): The control values (1 or 0) per control.
+
+    Returns:
+        numpy.ndarray: Sorted basis indices (read-only).
+    """
+    global _index_cache_bytes
+    key = (n, target, tuple(controls), tuple(polarity))
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+    index = _build_indices(n, target, controls, polarity)
+    if index.nbytes <= Index_cache_entry_bytes:
+        with _index_lock:
+            if key not in _index_cache:
+                _index_cache[key] = index
+                _index_cache_bytes += index.nbytes
+            while _index_cache_bytes > Index_cache_bytes:
+                _, old = _index_cache.popitem(last=False)
+                _index_cache_bytes -= old.nbytes
+    return index
+
+
+def clear_index_cache():
+    """Drops all cached control index arrays."""
+    global _index_cache_bytes
+    with _index_lock:
+        _index_cache.clear()
+        _index_cache_bytes = 0
+
+
+def _build_indices(n, target, controls, polarity):
+    """Builds the read-only index array of `controlled_indices`."""
+    index = np.arange(2**(n - 1 - len(controls)), dtype=np.int64)
+    for bit in sorted((target,) + tuple(controls)):
+        low = index & ((1 << bit) - 1)
+        index = ((index >> bit) << (bit + 1)) | low
+    for control, value in zip(controls, polarity):
+        if value:
+            index |= 1 << control
+    index.flags.writeable = False
+    return index
+
+
+def project_controls(state, control, polarity=None):
+    """Zeroes the amplitudes whose control bits do not match, in place.
+
+    Args:
+        state (numpy.ndarray): State array of shape (2^n, B).
+        control (int or list): The control qubit index or indices.
+        polarity (int or list, optional): Control values (default all 1).
+
+    Returns:
+        numpy.ndarray: The updated state (the same array).
+    """
+    controls = qg.as_controls(control)
+    if controls:
+        polarity = qg.as_polarity(polarity, len(controls))
+        mask = sum(1 << c for c in controls)
+        value = sum(1 << c for c, p in zip(controls, polarity) if p)
+        index = np.arange(state.shape[0])
+        state[(index & mask) != value] = 0
+    return state
+
+
+def apply_matrix(state, u, target, control=-1, polarity=None):
+    """Applies a single-qubit matrix to a state in place.
+
+    Args:
+        state (numpy.ndarray): C-contiguous state array of shape (2^n, B).
+        u (numpy.ndarray): 2x2 matrix, or (B, 2, 2) with one matrix per
+                           column of the state.
+        target (int): The target qubit index.
+        control (int or list, optional): The control qubit index or indices
+                                         (default is -1, which means
+                                         uncontrolled).
+        polarity (int or list, optional): Control values; 1 triggers on |1>,
+                                          0 on |0> (default is all 1).
+
+    Returns:
+        numpy.ndarray: The updated state (the same array).
+
+    Raises:
+        ValueError: If the state is not a C-contiguous 2D array.
+    """
+    if state.ndim != 2 or not state.flags.c_contiguous:
+        raise ValueError("State must be a C-contiguous (2^n, B) array")
+    dim, batch = state.shape
+    u = np.asarray(u)
+    if u.ndim == 3:
+        u00, u01, u10, u11 = u[:, 0, 0], u[:, 0, 1], u[:, 1, 0], u[:, 1, 1]
+    else:
+        u00, u01, u10, u11 = u[0, 0], u[0, 1], u[1, 0], u[1, 1]
+
+    controls = qg.as_controls(control)
+    if qk.enabled() and state.dtype == np.complex128:
+        mask, value = qk.control_masks(
+            controls, qg.as_polarity(polarity, len(controls)))
+        qk.matrix_kernel(state, np.ascontiguousarray(u.reshape(-1, 2, 2),
+                                                     dtype=np.complex128),
+                         target, mask, value)
+        return state
+    if not controls:
+        view = state.reshape(-1, 2, 1 << target, batch)
+
+        def kernel(block):
+            part = view[block[0], :, block[1]]
+            amp0 = part[:, 0].copy()
+            amp1 = part[:, 1]
+            part[:, 0] = u00 * amp0 + u01 * amp1
+            part[:, 1] = u10 * amp0 + u11 * amp1
+        _run(kernel, _pair_blocks(view))
+    else:
+        n = int(math.log2(dim))
+        index = controlled_indices(n, target, controls,
+                                   qg.as_polarity(polarity, len(controls)))
+
+        def kernel(block):
+            index0 = index[block]
+            index1 = index0 | (1 << target)
+            amp0 = state[index0]
+            amp1 = state[index1]
+            state[index0] = u00 * amp0 + u01 * amp1
+            state[index1] = u10 * amp0 + u11 * amp1
+        _run(kernel, _ranges(len(index), _block_count(2 * len(index) * batch)))
+    return state
+
+
+@prof.timed("engine.apply_gate")
+def apply_gate(state, gate, values=None, adjoint=False):
+    """Applies a gate object to a state in place.
+
+    Args:
+        state (numpy.ndarray): C-contiguous state array of shape (2^n, B).
+        gate (qubit.gates.Base): The gate to apply.
+        values (dict, optional): Parameter values of symbolic gates. Array
+                                 values must have one entry per column.
+        adjoint (bool, optional): Apply the conjugate transpose of the gate
+                                  (default is False).
+
+    Returns:
+        numpy.ndarray: The updated state (the same array).
+    """
+    prof.count("engine.gates_applied")
+    if isinstance(gate, qg.Swap):
+        x_mat = np.array([[0, 1], [1, 0]], dtype=np.complex128)
+        apply_matrix(state, x_mat, gate._target, gate._control)
+        apply_matrix(state, x_mat, gate._control, gate._target)
+        return apply_matrix(state, x_mat, gate._target, gate._control)
+
+    if isinstance(gate, qg.Diagonal):
+        d0, d1 = gate.diagonal(values)
+        if adjoint:
+            d0, d1 = np.conj(d0), np.conj(d1)
+        return apply_phase(state, d0, d1, gate._target, gate.controls,
+                           gate.polarity)
+
+    u = gate.base_matrix(values)
+    if adjoint:
+        u = np.conj(np.swapaxes(u, -1, -2))
+    return apply_matrix(state, u, gate._target, gate.controls, gate.polarity)
+
+
+def apply_phase(state, d0, d1, target, control=-1, polarity=None):
+    """Applies a diagonal single-qubit gate diag(d0, d1) to a state in place.
+
+    Args:
+        state (numpy.ndarray): C-contiguous state array of shape (2^n, B).
+        d0 (complex or numpy.ndarray): Phase of target |0> (scalar or (B,)).
+        d1 (complex or numpy.ndarray): Phase of target |1> (scalar or (B,)).
+        target (int): The target qubit index.
+        control (int or list, optional): The control qubit index or indices
+                                         (default is -1, which means
+                                         uncontrolled).
+        polarity (int or list, optional): Control values (default all 1).
+
+    Returns:
+        numpy.ndarray: The updated state (the same array).
+    """
+    if state.ndim != 2 or not state.flags.c_contiguous:
+        raise ValueError("State must be a C-contiguous (2^n, B) array")
+    dim, batch = state.shape
+    skip0 = np.ndim(d0) == 0 and d0 == 1
+    controls = qg.as_controls(control)
+    if qk.enabled() and state.dtype == np.complex128:
+        mask, value = qk.control_masks(
+            controls, qg.as_polarity(polarity, len(controls)))
+        d = np.stack(np.broadcast_arrays(d0, d1), axis=-1)
+        qk.phase_kernel(state, np.ascontiguousarray(d.reshape(-1, 2),
+                                                    dtype=np.complex128),
+                        target, mask, value)
+        return state
+    if not controls:
+        view = state.reshape(-1, 2, 1 << target, batch)
+
+        def kernel(block):
+            part = view[block[0], :, block[1]]
+            if not skip0:
+                part[:, 0] *= d0
+            part[:, 1] *= d1
+        _run(kernel, _pair_blocks(view))
+    else:
+        index = controlled_indices(int(math.log2(dim)), target, controls,
+                                   qg.as_polarity(polarity, len(controls)))
+
+        def kernel(block):
+            index0 = index[block]
+            if not skip0:
+                state[index0] *= d0
+            state[index0 | (1 << target)] *= d1
+        _run(kernel, _ranges(len(index), _block_count(2 * len(index) * batch)))
+    return state
+
+
+def _axis_vector(n, qubit, entries, batch_shape):
+    """Places a length-2 vector on the tensor axis of a qubit."""
+    shape = [1] * n + list(batch_shape)
+    shape[n - 1 - qubit] = 2
+    return np.asarray(entries).reshape(shape)
+
+
+def phase_table(n, gates, values=None):
+    """Fuses diagonal gates into one phase table.
+
+    Every gate contributes 1 + active * (diag(d0, d1) - 1), where `active`
+    marks the matching control values, so the product is built from
+    length-2 factors on the touched qubit axes only.
+
+    Args:
+        n (int): The number of qubits.
+        gates (list): Diagonal gates (qubit.gates.Diagonal).
+        values (dict, optional): Parameter values of symbolic gates.
+
+    Returns:
+        numpy.ndarray: Table broadcastable against the (2,)*n + (B,) tensor
+                       view of a state; untouched qubit axes have length 1.
+    """
+    table = np.ones((1,) * n + (1,), dtype=np.complex128)
+    for gate in gates:
+        d0, d1 = gate.diagonal(values)
+        d0, d1 = np.broadcast_arrays(np.asarray(d0, dtype=np.complex128),
+                                     np.asarray(d1, dtype=np.complex128))
+        batch_shape = d0.shape if d0.ndim else (1,)
+        diag = _axis_vector(n, gate._target,
+                            np.stack([d0.reshape(batch_shape),
+                                      d1.reshape(batch_shape)]), batch_shape)
+        active = np.ones((1,) * n + (1,))
+        for control, value in zip(gate.controls, gate.polarity):
+            active = active * _axis_vector(n, control, [1 - value, value],
+                                           (1,))
+        table = table * (1 + active * (diag - 1))
+    return table
+
+
+def _multiply_table(state, n, table):
+    """Multiplies a state by a broadcastable phase table in place.
+
+    Blocks fix the values of the highest qubits, so each block multiplies a
+    contiguous range of rows by the matching slice of the table.
+    """
+    batch = state.shape[1]
+    blocks = _block_count(state.size)
+    top = min(n, max(0, (blocks - 1).bit_length()))
+
+    def kernel(high):
+        rows = state[high << (n - top):(high + 1) << (n - top)]
+        index = tuple((high >> (top - 1 - axis)) & 1
+                      if table.shape[axis] == 2 else 0
+                      for axis in range(top))
+        rows.reshape((2,) * (n - top) + (batch,))[...] *= table[index]
+    _run(kernel, list(range(2**top)))
+
+
+def apply_gates(state, gates, values=None):
+    """Applies a sequence of gates in place.
+
+    Runs of two or more consecutive diagonal gates are fused into one phase
+    table before touching the state.
+
+    Args:
+        state (numpy.ndarray): C-contiguous state array of shape (2^n, B).
+        gates (list): Gates in application order.
+        values (dict, optional): Parameter values of symbolic gates.
+
+    Returns:
+        numpy.ndarray: The updated state (the same array).
+    """
+    dim, batch = state.shape
+    n = int(math.log2(dim))
+    run = []
+    for gate in list(gates) + [None]:
+        if isinstance(gate, qg.Diagonal):
+            run.append(gate)
+            continue
+        if len(run) == 1:
+            apply_gate(state, run[0], values)
+        elif run:
+            with prof.timer("engine.fused_phases"):
+                _multiply_table(state, n, phase_table(n, run, values))
+            prof.count("engine.fused_gates", len(run))
+        run = []
+        if gate is not None:
+            apply_gate(state, gate, values)
+    return state
+
+
+def is_classical(gate):
+    """Checks if a gate is an X gate with any controls.
+
+    Such gates permute basis states, so circuits made only of them can be
+    simulated on integer bitstrings.
+
+    Args:
+        gate (qubit.gates.Base): The gate to check.
+
+    Returns:
+        bool: True for X and multi-controlled X gates.
+    """
+    return type(gate) is qg.X
+
+
+def apply_classical(bits, gates):
+    """Applies (multi-)controlled X gates to basis indices in place.
+
+    Each basis index is a bitstring with qubit k in bit k. Uncontrolled X
+    gates are collected into one XOR mask that is flushed before the next
+    controlled gate.
+
+    Args:
+        bits (numpy.ndarray): uint64 array of basis indices (any shape).
+        gates (list): X gates in application order.
+
+    Returns:
+        numpy.ndarray: The updated indices (the same array).
+    """
+    flips = 0
+    for gate in gates:
+        if not gate.controls:
+            flips ^= 1 << gate._target
+            continue
+        if flips:
+            bits ^= np.uint64(flips)
+            flips = 0
+        mask = sum(1 << c for c in gate.controls)
+        value = sum(1 << c for c, p in zip(gate.controls, gate.polarity) if p)
+        active = (bits & np.uint64(mask)) == np.uint64(value)
+        bits ^= active.astype(np.uint64) << np.uint64(gate._target)
+    if flips:
+        bits ^= np.uint64(flips)
+    return bits
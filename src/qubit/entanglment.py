@@ -24,16 +24,21 @@ Functions:
     zero(lst): Determines if all elements in a list are approximately zero.
     proportional(vec_set): Checks if elements of 
                            two lists are proportional to each other.
+    labels(groups, n): Converts entangled sets into per-qubit group labels.
 """
 
 import math
 import itertools
 import numpy as np
+import qubit.engine as qe
 import qubit.gates as qg
+import qubit.kernels as qk
+import util.profiler as prof
 
 Threshold = complex(0.0001)
 
 
+@prof.timed("entanglement.entanglement")
 def entanglement(mat):
     """Calculates the entanglement of a matrix.
 
@@ -48,6 +53,7 @@ def entanglement(mat):
     seperatable_set = set()
 
     for i in range(n):
+        prof.count("entanglement.cuts")
         mat, index_state = reorder(mat, {i}, index_state)
         sep_vec = split(mat, step=2**(n - 1))
         if proportional(sep_vec):
@@ -60,6 +66,26 @@ def entanglement(mat):
     return _entanglement(mat, index_state, 2, [])
 
 
+def labels(groups, n):
+    """Converts entangled sets into per-qubit group labels.
+
+    Args:
+        groups (list): A list of set of entangled states, as returned by
+                       `entanglement`.
+        n (int): The number of qubits.
+
+    Returns:
+        numpy.ndarray: Integer array of length n. Entangled qubits are
+                       labeled with the smallest qubit of their set and
+                       separable qubits with -1.
+    """
+    ret = np.full(n, -1, dtype=np.int64)
+    for group in groups:
+        if len(group) > 1:
+            ret[list(group)] = min(group)
+    return ret
+
+
 def _entanglement(mat, index_state, r, ret):
     """Helper function to calculate entanglement recursively.
 
@@ -80,6 +106,7 @@ def _entanglement(mat, index_state, r, ret):
 
     seperatable_set = set()
     for combination in combinations:
+        prof.count("entanglement.cuts")
         mat, index_state = reorder(mat, set(combination), index_state)
         sep_vec = split(mat, step=2**(n - r), split=2**r)
         vec_combinations = itertools.combinations(sep_vec, 2)
@@ -121,6 +148,7 @@ def split(mat, split=2, step=-1):
     return ret
 
 
+@prof.timed("entanglement.reorder")
 def reorder(mat, index_set: set, index_status):
     """Reorders a matrix based on index sets.
 
@@ -132,7 +160,7 @@ def reorder(mat, index_set: set, index_status):
     Returns:
         tuple: Reordered matrix and updated index status.
     """
-    ret = np.array(mat)
+    ret = np.array(mat, dtype=np.complex128, order='C')
     n = int(math.log2(mat.shape[0]))
     selected_set_n = len(index_set)
     need_to_swap_set = index_set - set(index_status[-selected_set_n:])
@@ -145,7 +173,8 @@ def reorder(mat, index_set: set, index_status):
         gate = qg.Swap(n, idx_idx, other_idx)
         index_status[idx_idx], index_status[other_idx] = (
             index_status[other_idx], index_status[idx_idx])
-        ret = np.dot(gate.mat, ret)
+        ret = qe.apply_gate(ret, gate)
+    prof.count("entanglement.swaps", len(need_to_swap_set))
     return ret, index_status
 
 
@@ -178,6 +207,7 @@ def zero(lst):
     return all(abs(v) <= Threshold for v in lst)
 
 
+@prof.timed("entanglement.proportional")
 def proportional(vec_set):
     """Checks if elements of two lists are proportional to each other.
 
@@ -192,6 +222,10 @@ def proportional(vec_set):
     if any(zero(vec) for vec in vec_set):
         return True
 
+    if qk.enabled():
+        return qk.proportional_kernel(np.asarray(list1, dtype=np.complex128),
+                                      np.asarray(list2, dtype=np.complex128),
+                                      abs(Threshold))
     val = _calculate_proportional_value(list1, list2)
     for v1, v2 in zip(list1, list2):
         if not _is_proportional(v1, v2, val):
@@ -213,7 +247,7 @@ def _calculate_proportional_value(list1, list2):
         if abs(x) < Threshold and abs(y) < Threshold:
             continue
         if abs(y) > Threshold:
-            return complex(list1[0] / list2[0])
+            return complex(x / y)
         elif abs(x) < Threshold:
             return complex(1)
         else:
@@ -2,7 +2,12 @@
 Quantum Gates and Operations
 
 This module defines quantum gates and operations for quantum computing. It includes the
-base quantum gate class `Base`, X gate `X`, Y gate `Y`, Z gate `Z`, and Hadamard gate `H`.
+base quantum gate class `Base`, X gate `X`, Y gate `Y`, Z gate `Z`, and Hadamard gate `H`,
+and the rotation gates `RX`, `RY`, `RZ` and `Phase` whose angle may be a symbolic
+`Parameter` bound at simulation time. Gates deriving from `Diagonal` (Z, S, T, RZ,
+Phase) are applied by the simulation engine as element-wise phase multiplications.
+Dense 2^n x 2^n gate matrices are only formed when `mat` is read, and products of
+gates are lazy `Operator`s that apply their factors through the gate engine.
 
 Author: Minjong Kim
 Email: tlemsl@dgist.ac.kr
@@ -10,22 +15,75 @@ Website: https://github.com/tlemsl/Entanglement_visualizer
 
 Classes:
     Base: Base class representing a quantum gate.
+    Diagonal: Base class of gates with a diagonal matrix.
     X: Class representing an X gate.
     Y: Class representing a Y (Pauli-Y) gate.
     Z: Class representing a Z gate.
+    S: Class representing an S (sqrt Z) gate.
+    T: Class representing a T (fourth root of Z) gate.
     H: Class representing an H (Hadamard) gate.
     Swap: Class representing a Swap gate.
+    Parameter: Symbolic gate parameter.
+    Rotation: Base class of single-angle rotation gates.
+    RX: Class representing a rotation about the X axis.
+    RY: Class representing a rotation about the Y axis.
+    RZ: Class representing a rotation about the Z axis.
+    Phase: Class representing a phase gate.
+    Operator: Lazy product of gates and small dense factors.
 """
 
+import abc
+import copy
 import math
 import numpy as np
+import qubit.engine as qe
 import qubit.qubit as qb
+import util.profiler as prof
 
 Identity_matrix = np.identity(2, dtype=np.complex128)
 Base0 = np.array([[1, 0], [0, 0]], dtype=np.complex128)
 Base1 = np.array([[0, 0], [0, 1]], dtype=np.complex128)
 
 
+def as_controls(control):
+    """Normalize a control argument into a tuple of qubit indices.
+
+    Args:
+        control (int or list): A control index, -1 for none, or a list.
+
+    Returns:
+        tuple: The control qubit indices.
+    """
+    if isinstance(control, (int, np.integer)):
+        return () if control == -1 else (int(control),)
+    return tuple(int(c) for c in control)
+
+
+def as_polarity(polarity, count):
+    """Normalize a polarity argument into a tuple of control values.
+
+    Args:
+        polarity (int or list): 1 (trigger on |1>) or 0 (trigger on |0>) for
+                                every control, or one value per control.
+                                None means all 1.
+        count (int): The number of controls.
+
+    Returns:
+        tuple: One control value (0 or 1) per control.
+
+    Raises:
+        ValueError: If the number of values does not match the controls.
+    """
+    if polarity is None:
+        return (1,) * count
+    if isinstance(polarity, (int, np.integer)):
+        return (int(bool(polarity)),) * count
+    ret = tuple(int(bool(p)) for p in polarity)
+    if len(ret) != count:
+        raise ValueError(f"Expected {count} polarity values, got {len(ret)}")
+    return ret
+
+
 class Base(object):
     """Base class representing a quantum gate.
 
@@ -34,20 +92,32 @@ class Base(object):
     Attributes:
         _n (int): The number of qubits.
         _target (int): The target qubit index.
+        _controls (tuple): The control qubit indices.
+        _polarity (tuple): The control values, 1 for |1> and 0 for |0>.
         _base_mat (numpy.ndarray): The base matrix representing the gate.
+        _mat (numpy.ndarray): The dense matrix, formed on first access.
+        _dense (bool): True if the matrix was set directly and does not
+                       follow from target, controls and base matrix.
     """
 
-    def __init__(self, n: int = 1, target: int = 0, control: int = -1) -> None:
+    _dense = False
+
+    def __init__(self, n: int = 1, target: int = 0, control=-1,
+                 polarity=None) -> None:
         """Initialize a base quantum gate.
 
         Args:
             n (int, optional): The number of qubits (default is 1).
             target (int, optional): The target qubit index (default is 0).
-            control (int, optional): The index of the control qubit
-                                     (default is -1, which means uncontrolled).
+            control (int or list, optional): The index or list of indices of
+                                             the control qubits (default is -1,
+                                             which means uncontrolled).
+            polarity (int or list, optional): Control values; 1 triggers on
+                                              |1>, 0 on |0> (default is all 1).
 
         Raises:
-            ValueError: If the target qubit is not smaller than n.
+            ValueError: If the target or a control qubit is not smaller than
+                        n, or the controls overlap the target.
         """
         if n <= target:
             raise ValueError(f"Target({target}) must be smaller than n({n})")
@@ -55,24 +125,30 @@ class Base(object):
         self._n = n
         self._target = target
         self._control = control
-        self._mat = self.form_matrix(self._target, self._control)
+        self._controls = as_controls(control)
+        self._polarity = as_polarity(polarity, len(self._controls))
+        if any(not 0 <= c < n for c in self._controls):
+            raise ValueError(f"Controls{self._controls} must be in [0, {n-1}]")
+        if target in self._controls or \
+                len(set(self._controls)) != len(self._controls):
+            raise ValueError("Control qubits must be distinct from the target")
+        self._mat = None
+        prof.count("gates.construct")
 
     def __mul__(self, other):
-        """Multiply two quantum gates using matrix multiplication.
+        """Multiply two quantum gates, or a gate and a qubit, lazily.
 
         Args:
-            other (Base or qb.Qubit): The other gate or qubit to multiply with.
+            other (Base, Operator or qb.Qubit): The other gate or qubit to
+                                                multiply with.
 
         Returns:
-            Base or qb.Qubit: A new gate or qubit representing 
-                              the result of the multiplication.
+            Operator or qb.Qubit: The product operator, or the qubit with
+                                  the gate applied.
         """
-        if isinstance(other, qb.Qubit):
-            ret = qb.Qubit()
-        else:
-            ret = Base()
-        ret.mat = np.dot(self.mat, other.mat)
-        return ret
+        return Operator.of(self) * other
+
+    __matmul__ = __mul__
 
     def __len__(self):
         """Get the number of qubits affected by the gate.
@@ -83,7 +159,7 @@ class Base(object):
         return self._n
 
     def __str__(self) -> str:
-        return self._mat.__str__()
+        return self.mat.__str__()
 
     @property
     def mat(self):
@@ -91,7 +167,15 @@ class Base(object):
 
         Returns:
             numpy.ndarray: The matrix representation of the gate.
+
+        Raises:
+            ValueError: If the gate has unbound parameters.
         """
+        if self._mat is None:
+            if self._base_mat is None:
+                raise ValueError("Gate has unbound parameters, bind() it "
+                                 "first")
+            self._mat = self._full_matrix()
         return self._mat
 
     @mat.setter
@@ -108,15 +192,99 @@ class Base(object):
             raise ValueError("Matrix must be a square matrix")
         self._mat = data
         self._n = int(math.log2(self._mat.shape[0]))
+        self._dense = True
+
+    @property
+    def controls(self):
+        """Getter for the control qubit indices.
+
+        Returns:
+            tuple: The control qubits (empty for uncontrolled gates).
+        """
+        return self._controls
 
-    def form_matrix(self, target, control):
+    @property
+    def polarity(self):
+        """Getter for the control values.
+
+        Returns:
+            tuple: One value per control, 1 for |1> and 0 for |0> controls.
+        """
+        return self._polarity
+
+    @property
+    def parameters(self):
+        """Getter for the names of the gate's unbound parameters.
+
+        Returns:
+            set: Parameter names (empty for fixed gates).
+        """
+        return set()
+
+    def signature(self):
+        """Get a hashable description of the gate.
+
+        Gates with equal signatures act identically on the same register.
+
+        Returns:
+            tuple: (kind, target, ((control, polarity), ...), angle).
+        """
+        return (type(self).__name__, self._target,
+                tuple(sorted(zip(self._controls, self._polarity))), None)
+
+    def base_matrix(self, values=None):
+        """Get the 2x2 matrix applied to the target qubit.
+
+        Args:
+            values (dict, optional): Parameter values keyed by name. Unused
+                                     by fixed gates.
+
+        Returns:
+            numpy.ndarray: The 2x2 base matrix of the gate.
+        """
+        return self._base_mat
+
+    def resized(self, n):
+        """Create the same gate acting on a register of n qubits.
+
+        Args:
+            n (int): The new number of qubits.
+
+        Returns:
+            Base: A copy of the gate for n qubits.
+
+        Raises:
+            ValueError: If the target or control qubit is not smaller than n.
+        """
+        if n <= max((self._target,) + self._controls):
+            raise ValueError(f"Gate qubits must be smaller than n({n})")
+        ret = copy.copy(self)
+        ret._n = n
+        ret._mat = None
+        return ret
+
+    def _full_matrix(self):
+        """Form the dense matrix of the gate on all n qubits."""
+        return self.form_matrix(self._target, self._control, self._polarity)
+
+    @prof.timed("gates.form_matrix")
+    def form_matrix(self, target, control, polarity=None):
         """Form the matrix representation of the gate.
 
+        A controlled gate is I - P + P (x) U, where P projects onto the
+        states whose control qubits match the polarity.
+
+        Args:
+            target (int): The target qubit index.
+            control (int or list): The control qubit index or indices.
+            polarity (int or list, optional): Control values (default all 1).
+
         Returns:
             numpy.ndarray: The matrix representation of the gate.
         """
         ret = Identity_matrix
-        if control == -1:
+        controls = as_controls(control)
+        if not controls:
             if target == (self._n - 1):
                 ret = self._base_mat
             for i in range(self._n - 2, -1, -1):
@@ -126,28 +294,46 @@ class Base(object):
                     ret = np.kron(ret, Identity_matrix)
 
         else:
-            base0 = base1 = Identity_matrix
-            if target == self._n - 1:
-                base0 = Identity_matrix
-                base1 = self._base_mat
-            elif control == self._n - 1:
-                base0 = Base0
-                base1 = Base1
-            for i in range(self._n - 2, -1, -1):
+            polarity = as_polarity(polarity, len(controls))
+            projector = active = np.ones((1, 1), dtype=np.complex128)
+            for i in range(self._n - 1, -1, -1):
                 if i == target:
-                    base0 = np.kron(base0, Identity_matrix)
-                    base1 = np.kron(base1, self._base_mat)
-                elif i == control:
-                    base0 = np.kron(base0, Base0)
-                    base1 = np.kron(base1, Base1)
+                    projector = np.kron(projector, Identity_matrix)
+                    active = np.kron(active, self._base_mat)
+                elif i in controls:
+                    base = Base1 if polarity[controls.index(i)] else Base0
+                    projector = np.kron(projector, base)
+                    active = np.kron(active, base)
                 else:
-                    base0 = np.kron(base0, Identity_matrix)
-                    base1 = np.kron(base1, Identity_matrix)
-            ret = base0 + base1
+                    projector = np.kron(projector, Identity_matrix)
+                    active = np.kron(active, Identity_matrix)
+            ret = np.identity(2**self._n, dtype=np.complex128) - projector
+            ret += active
 
         return ret
 
 
+class Diagonal(Base):
+    """Base class of gates whose matrix is diagonal.
+
+    A diagonal gate only multiplies amplitudes by phases, so the simulation
+    engine never mixes amplitude pairs for it and can fuse consecutive
+    diagonal gates into a single multiplication.
+    """
+
+    def diagonal(self, values=None):
+        """Get the diagonal entries of the 2x2 base matrix.
+
+        Args:
+            values (dict, optional): Parameter values keyed by name.
+
+        Returns:
+            tuple: (d0, d1), scalars or arrays for a parameter batch.
+        """
+        u = self.base_matrix(values)
+        return u[..., 0, 0], u[..., 1, 1]
+
+
 class X(Base):
     """Class representing an X gate.
 
@@ -157,19 +343,22 @@ class X(Base):
         _base_mat (numpy.ndarray): The base matrix representing the X gate.
     """
 
-    def __init__(self, n: int = 1, target: int = 0, control: int = -1) -> None:
+    def __init__(self, n: int = 1, target: int = 0, control=-1,
+                 polarity=None) -> None:
         """
         Initialize an X gate.
 
         Args:
             n (int, optional): The number of qubits (default is 1).
             target (int, optional): The target qubit index (default is 0).
-            control (int, optional): The index of the control qubit (
-                                     default is -1, which means uncontrolled).
+            control (int or list, optional): The index or list of indices of
+                                             the control qubits (default is -1,
+                                             which means uncontrolled).
+            polarity (int or list, optional): Control values; 1 triggers on
+                                              |1>, 0 on |0> (default is all 1).
         """
-        super().__init__(n, target, control)
+        super().__init__(n, target, control, polarity)
         self._base_mat = np.array([[0, 1], [1, 0]], dtype=np.complex128)
-        self._mat = self.form_matrix(target, control)
 
 
 class Y(Base):
@@ -181,43 +370,100 @@ class Y(Base):
         _base_mat (numpy.ndarray): The base matrix representing the Y gate.
     """
 
-    def __init__(self, n: int = 1, target: int = 0, control: int = -1) -> None:
+    def __init__(self, n: int = 1, target: int = 0, control=-1,
+                 polarity=None) -> None:
         """
         Initialize a Y gate.
 
         Args:
             n (int, optional): The number of qubits (default is 1).
             target (int, optional): The target qubit index (default is 0).
-            control (int, optional): The index of the control qubit 
-                                     (default is -1, which means uncontrolled).
+            control (int or list, optional): The index or list of indices of
+                                             the control qubits (default is -1,
+                                             which means uncontrolled).
+            polarity (int or list, optional): Control values; 1 triggers on
+                                              |1>, 0 on |0> (default is all 1).
         """
-        super().__init__(n, target, control)
+        super().__init__(n, target, control, polarity)
         self._base_mat = np.array([[0, -1.j], [1.j, 0]], dtype=np.complex128)
-        self._mat = self.form_matrix(target, control)
 
 
-class Z(Base):
+class Z(Diagonal):
     """Class representing a Z gate.
 
-    This class inherits from the Base class and represents the Z gate.
+    This class inherits from the Diagonal class and represents the Z gate.
 
     Attributes:
         _base_mat (numpy.ndarray): The base matrix representing the Z gate.
     """
 
-    def __init__(self, n: int = 1, target: int = 0, control: int = -1) -> None:
+    def __init__(self, n: int = 1, target: int = 0, control=-1,
+                 polarity=None) -> None:
         """
         Initialize a Z gate.
 
         Args:
             n (int, optional): The number of qubits (default is 1).
             target (int, optional): The target qubit index (default is 0).
-            control (int, optional): The index of the control qubit
-                                     (default is -1, which means uncontrolled).
+            control (int or list, optional): The index or list of indices of
+                                             the control qubits (default is -1,
+                                             which means uncontrolled).
+            polarity (int or list, optional): Control values; 1 triggers on
+                                              |1>, 0 on |0> (default is all 1).
         """
-        super().__init__(n, target, control)
+        super().__init__(n, target, control, polarity)
         self._base_mat = np.array([[1, 0], [0, -1]], dtype=np.complex128)
-        self._mat = self.form_matrix(target, control)
+
+
+class S(Diagonal):
+    """Class representing an S gate, diag(1, i).
+
+    Attributes:
+        _base_mat (numpy.ndarray): The base matrix representing the S gate.
+    """
+
+    def __init__(self, n: int = 1, target: int = 0, control=-1,
+                 polarity=None) -> None:
+        """
+        Initialize an S gate.
+
+        Args:
+            n (int, optional): The number of qubits (default is 1).
+            target (int, optional): The target qubit index (default is 0).
+            control (int or list, optional): The index or list of indices of
+                                             the control qubits (default is -1,
+                                             which means uncontrolled).
+            polarity (int or list, optional): Control values; 1 triggers on
+                                              |1>, 0 on |0> (default is all 1).
+        """
+        super().__init__(n, target, control, polarity)
+        self._base_mat = np.array([[1, 0], [0, 1.j]], dtype=np.complex128)
+
+
+class T(Diagonal):
+    """Class representing a T gate, diag(1, exp(i pi / 4)).
+
+    Attributes:
+        _base_mat (numpy.ndarray): The base matrix representing the T gate.
+    """
+
+    def __init__(self, n: int = 1, target: int = 0, control=-1,
+                 polarity=None) -> None:
+        """
+        Initialize a T gate.
+
+        Args:
+            n (int, optional): The number of qubits (default is 1).
+            target (int, optional): The target qubit index (default is 0).
+            control (int or list, optional): The index or list of indices of
+                                             the control qubits (default is -1,
+                                             which means uncontrolled).
+            polarity (int or list, optional): Control values; 1 triggers on
+                                              |1>, 0 on |0> (default is all 1).
+        """
+        super().__init__(n, target, control, polarity)
+        self._base_mat = np.array([[1, 0], [0, np.exp(0.25j * math.pi)]],
+                                  dtype=np.complex128)
 
 
 class H(Base):
@@ -229,21 +475,24 @@ class H(Base):
         _base_mat (numpy.ndarray): The base matrix representing the H gate.
     """
 
-    def __init__(self, n: int = 1, target: int = 0, control: int = -1) -> None:
+    def __init__(self, n: int = 1, target: int = 0, control=-1,
+                 polarity=None) -> None:
         """
         Initialize an H gate.
 
         Args:
             n (int, optional): The number of qubits (default is 1).
             target (int, optional): The target qubit index (default is 0).
-            control (int, optional): The index of the control qubit
-                                     (default is -1, which means uncontrolled).
+            control (int or list, optional): The index or list of indices of
+                                             the control qubits (default is -1,
+                                             which means uncontrolled).
+            polarity (int or list, optional): Control values; 1 triggers on
+                                              |1>, 0 on |0> (default is all 1).
         """
-        super().__init__(n, target, control)
+        super().__init__(n, target, control, polarity)
         temp = 1 / math.sqrt(2)
         self._base_mat = np.array([[temp, temp], [temp, -temp]],
                                   dtype=np.complex128)
-        self._mat = self.form_matrix(target, control)
 
 
 class Swap(X):
@@ -271,7 +520,416 @@ class Swap(X):
             ValueError: If the target or control qubit indices are not valid.
         """
         super().__init__(n, target, control)
-        self._mat = np.dot(
-            self.form_matrix(target, control),
-            np.dot(self.form_matrix(control, target),
-                   self.form_matrix(target, control)))
+
+    def _full_matrix(self):
+        """Form the dense matrix as a product of three CNOT matrices."""
+        cnot = self.form_matrix(self._target, self._control)
+        return np.dot(cnot, np.dot(self.form_matrix(self._control,
+                                                    self._target), cnot))
+
+    def signature(self):
+        """Get a hashable description of the gate.
+
+        Returns:
+            tuple: ("Swap", lower qubit, ((higher qubit, 1),), None).
+        """
+        low, high = sorted((self._target, self._control))
+        return ("Swap", low, ((high, 1),), None)
+
+    def resized(self, n):
+        """Create the same Swap gate acting on a register of n qubits.
+
+        Args:
+            n (int): The new number of qubits.
+
+        Returns:
+            Swap: A Swap gate for n qubits.
+        """
+        return Swap(n, self._target, self._control)
+
+
+class Parameter(object):
+    """Symbolic parameter of a rotation gate.
+
+    Parameters are identified by name, so two `Parameter("theta")` objects
+    refer to the same value when the circuit is evaluated.
+
+    Attributes:
+        _name (str): The parameter name.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialize a parameter.
+
+        Args:
+            name (str): The parameter name.
+        """
+        self._name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Parameter) and self._name == other._name
+
+    def __hash__(self):
+        return hash(self._name)
+
+    def __repr__(self) -> str:
+        return f"Parameter({self._name!r})"
+
+    @property
+    def name(self):
+        """Getter for the parameter name."""
+        return self._name
+
+    def resolve(self, values):
+        """Look up the value of the parameter.
+
+        Args:
+            values (dict): Values keyed by parameter name or `Parameter`.
+
+        Returns:
+            float or numpy.ndarray: The parameter value(s).
+
+        Raises:
+            ValueError: If no value is given for the parameter.
+        """
+        if values is not None:
+            if self._name in values:
+                return values[self._name]
+            if self in values:
+                return values[self]
+        raise ValueError(f"No value given for parameter '{self._name}'")
+
+
+class Rotation(Base, abc.ABC):
+    """Base class of gates parameterized by a single angle.
+
+    The angle is either a number or a `Parameter`. Gates with a symbolic
+    angle have no matrix form until they are bound, but the simulation engine
+    can apply them for a whole array of angle values at once.
+
+    Subclasses must implement `rotation_matrix` and `derivative_matrix`.
+
+    Attributes:
+        _theta (float or Parameter): The rotation angle.
+    """
+
+    def __init__(self, n: int = 1, target: int = 0, control=-1,
+                 theta=0.0, polarity=None) -> None:
+        """
+        Initialize a rotation gate.
+
+        Args:
+            n (int, optional): The number of qubits (default is 1).
+            target (int, optional): The target qubit index (default is 0).
+            control (int or list, optional): The index or list of indices of
+                                             the control qubits (default is -1,
+                                             which means uncontrolled).
+            theta (float or Parameter, optional): The rotation angle
+                                                  (default is 0).
+            polarity (int or list, optional): Control values; 1 triggers on
+                                              |1>, 0 on |0> (default is all 1).
+        """
+        super().__init__(n, target, control, polarity)
+        self._theta = theta
+        if isinstance(theta, Parameter):
+            self._base_mat = None
+        else:
+            self._base_mat = self.rotation_matrix(theta)
+
+    @property
+    def theta(self):
+        """Getter for the rotation angle."""
+        return self._theta
+
+    @property
+    def parameters(self):
+        if isinstance(self._theta, Parameter):
+            return {self._theta.name}
+        return set()
+
+    def signature(self):
+        kind, target, controls, _ = super().signature()
+        theta = self._theta
+        if not isinstance(theta, Parameter):
+            theta = float(theta)
+        return (kind, target, controls, theta)
+
+    @abc.abstractmethod
+    def rotation_matrix(self, theta):
+        """Compute the 2x2 matrix for the given angle(s).
+
+        Args:
+            theta (float or numpy.ndarray): Rotation angle(s).
+
+        Returns:
+            numpy.ndarray: Array of shape theta.shape + (2, 2).
+        """
+
+    def base_matrix(self, values=None):
+        """Get the 2x2 matrix applied to the target qubit.
+
+        Args:
+            values (dict, optional): Parameter values keyed by name. An array
+                                     value gives a batch of matrices.
+
+        Returns:
+            numpy.ndarray: Array of shape (2, 2), or (P, 2, 2) for P values.
+
+        Raises:
+            ValueError: If the angle is symbolic and has no value.
+        """
+        if isinstance(self._theta, Parameter):
+            return self.rotation_matrix(self._theta.resolve(values))
+        return self._base_mat
+
+    @abc.abstractmethod
+    def derivative_matrix(self, theta):
+        """Compute d/dtheta of the 2x2 matrix for the given angle(s).
+
+        Args:
+            theta (float or numpy.ndarray): Rotation angle(s).
+
+        Returns:
+            numpy.ndarray: Array of shape theta.shape + (2, 2).
+        """
+
+    def base_derivative(self, values=None):
+        """Get d/dtheta of the 2x2 matrix applied to the target qubit.
+
+        Args:
+            values (dict, optional): Parameter values keyed by name.
+
+        Returns:
+            numpy.ndarray: The derivative of `base_matrix(values)`.
+        """
+        theta = self._theta
+        if isinstance(theta, Parameter):
+            theta = theta.resolve(values)
+        return self.derivative_matrix(theta)
+
+    def bind(self, values):
+        """Create a copy of the gate with its parameter replaced by a value.
+
+        Args:
+            values (dict): Parameter values keyed by name.
+
+        Returns:
+            Rotation: The bound gate (self if the angle is already fixed).
+        """
+        if not isinstance(self._theta, Parameter):
+            return self
+        ret = copy.copy(self)
+        ret._theta = float(self._theta.resolve(values))
+        ret._base_mat = ret.rotation_matrix(ret._theta)
+        ret._mat = None
+        return ret
+
+
+class RX(Rotation):
+    """Class representing a rotation about the X axis, exp(-i theta X / 2)."""
+
+    def rotation_matrix(self, theta):
+        theta = np.asarray(theta, dtype=np.float64)
+        cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+        ret = np.empty(theta.shape + (2, 2), dtype=np.complex128)
+        ret[..., 0, 0] = ret[..., 1, 1] = cos
+        ret[..., 0, 1] = ret[..., 1, 0] = -1.j * sin
+        return ret
+
+    def derivative_matrix(self, theta):
+        theta = np.asarray(theta, dtype=np.float64)
+        cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+        ret = np.empty(theta.shape + (2, 2), dtype=np.complex128)
+        ret[..., 0, 0] = ret[..., 1, 1] = -0.5 * sin
+        ret[..., 0, 1] = ret[..., 1, 0] = -0.5j * cos
+        return ret
+
+
+class RY(Rotation):
+    """Class representing a rotation about the Y axis, exp(-i theta Y / 2)."""
+
+    def rotation_matrix(self, theta):
+        theta = np.asarray(theta, dtype=np.float64)
+        cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+        ret = np.empty(theta.shape + (2, 2), dtype=np.complex128)
+        ret[..., 0, 0] = ret[..., 1, 1] = cos
+        ret[..., 0, 1] = -sin
+        ret[..., 1, 0] = sin
+        return ret
+
+    def derivative_matrix(self, theta):
+        theta = np.asarray(theta, dtype=np.float64)
+        cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+        ret = np.empty(theta.shape + (2, 2), dtype=np.complex128)
+        ret[..., 0, 0] = ret[..., 1, 1] = -0.5 * sin
+        ret[..., 0, 1] = -0.5 * cos
+        ret[..., 1, 0] = 0.5 * cos
+        return ret
+
+
+class RZ(Diagonal, Rotation):
+    """Class representing a rotation about the Z axis, exp(-i theta Z / 2)."""
+
+    def rotation_matrix(self, theta):
+        theta = np.asarray(theta, dtype=np.float64)
+        ret = np.zeros(theta.shape + (2, 2), dtype=np.complex128)
+        ret[..., 0, 0] = np.exp(-0.5j * theta)
+        ret[..., 1, 1] = np.exp(0.5j * theta)
+        return ret
+
+    def derivative_matrix(self, theta):
+        theta = np.asarray(theta, dtype=np.float64)
+        ret = np.zeros(theta.shape + (2, 2), dtype=np.complex128)
+        ret[..., 0, 0] = -0.5j * np.exp(-0.5j * theta)
+        ret[..., 1, 1] = 0.5j * np.exp(0.5j * theta)
+        return ret
+
+
+class Phase(Diagonal, Rotation):
+    """Class representing a phase gate, diag(1, exp(i theta))."""
+
+    def rotation_matrix(self, theta):
+        theta = np.asarray(theta, dtype=np.float64)
+        ret = np.zeros(theta.shape + (2, 2), dtype=np.complex128)
+        ret[..., 0, 0] = 1
+        ret[..., 1, 1] = np.exp(1.j * theta)
+        return ret
+
+    def derivative_matrix(self, theta):
+        theta = np.asarray(theta, dtype=np.float64)
+        ret = np.zeros(theta.shape + (2, 2), dtype=np.complex128)
+        ret[..., 1, 1] = 1.j * np.exp(1.j * theta)
+        return ret
+
+
+class Operator(object):
+    """Lazy product of gates and small dense factors.
+
+    An operator keeps its factors in application order instead of
+    multiplying 2^n x 2^n matrices. A factor is a gate, or a pair
+    (matrix, qubits) of a 2^k x 2^k matrix acting on k named qubits, where
+    bit i of the matrix index belongs to qubits[i]. Composing operators
+    concatenates their factors, and applying an operator to a qubit runs
+    the factors through `qubit.engine`. The dense matrix is only formed,
+    and cached, when `mat` is read.
+
+    Attributes:
+        _n (int): The number of qubits.
+        _factors (list): Gates and (matrix, qubits) pairs in application
+                         order.
+        _mat (numpy.ndarray): The cached dense matrix or None.
+    """
+
+    def __init__(self, n: int = 1, factors=()) -> None:
+        """Initialize an operator.
+
+        Args:
+            n (int, optional): The number of qubits (default is 1).
+            factors (iterable, optional): Gates and (matrix, qubits) pairs in
+                                          application order (default is
+                                          none, the identity).
+        """
+        self._n = n
+        self._factors = list(factors)
+        self._mat = None
+
+    @staticmethod
+    def of(item):
+        """Wrap a gate or operator as an operator.
+
+        Args:
+            item (Base or Operator): The gate or operator.
+
+        Returns:
+            Operator: `item` itself if it is an operator.
+        """
+        if isinstance(item, Operator):
+            return item
+        if item._dense:
+            return Operator(len(item), [(item.mat, tuple(range(len(item))))])
+        return Operator(len(item), [item])
+
+    def __len__(self):
+        """Get the number of qubits of the operator."""
+        return self._n
+
+    def __str__(self) -> str:
+        return self.mat.__str__()
+
+    def __mul__(self, other):
+        """Compose with a gate or operator, or apply to a qubit.
+
+        As for matrices, self * other applies other first.
+
+        Args:
+            other (Base, Operator or qb.Qubit): The right-hand side.
+
+        Returns:
+            Operator or qb.Qubit: The product operator, or a new qubit.
+
+        Raises:
+            ValueError: If the number of qubits differs.
+        """
+        if len(other) != self._n:
+            raise ValueError(f"Cannot multiply {self._n} and {len(other)} "
+                             "qubit operands")
+        if isinstance(other, qb.Qubit):
+            ret = qb.Qubit()
+            ret.mat = self.apply(np.array(other.mat, dtype=np.complex128,
+                                          order='C'))
+            return ret
+        return Operator(self._n, Operator.of(other)._factors + self._factors)
+
+    __matmul__ = __mul__
+
+    @property
+    def factors(self):
+        """Getter for the factors in application order."""
+        return tuple(self._factors)
+
+    @property
+    def mat(self):
+        """Getter for the dense matrix, formed on first access.
+
+        Returns:
+            numpy.ndarray: The 2^n x 2^n matrix of the product.
+        """
+        if self._mat is None:
+            self._mat = self.apply(np.identity(2**self._n,
+                                               dtype=np.complex128))
+        return self._mat
+
+    def apply(self, state, values=None):
+        """Apply the operator to a state in place.
+
+        Args:
+            state (numpy.ndarray): C-contiguous state array of shape
+                                   (2^n, B).
+            values (dict, optional): Parameter values of symbolic gates.
+
+        Returns:
+            numpy.ndarray: The updated state (the same array).
+        """
+        for factor in self._factors:
+            if isinstance(factor, Base):
+                qe.apply_gate(state, factor, values)
+            else:
+                _apply_factor(state, *factor)
+        return state
+
+
+def _apply_factor(state, u, qubits):
+    """Applies a 2^k x 2^k matrix on k qubits to a state in place."""
+    dim, batch = state.shape
+    n = int(math.log2(dim))
+    k = len(qubits)
+    if tuple(qubits) == tuple(range(n)):
+        state[...] = np.dot(u, state)
+        return state
+    tensor = state.reshape((2,) * n + (batch,))
+    # matrix axis j belongs to qubit qubits[k - 1 - j]
+    axes = [n - 1 - q for q in reversed(qubits)]
+    ret = np.tensordot(np.asarray(u).reshape((2,) * (2 * k)), tensor,
+                       axes=(list(range(k, 2 * k)), axes))
+    tensor[...] = np.moveaxis(ret, list(range(k)), axes)
+    return state
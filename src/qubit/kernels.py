@@ -0,0 +1,203 @@
+"""
+Compiled Gate Kernels
+
+This module holds loop kernels for the hot paths of the simulator: single
+qubit and controlled gate application, diagonal gates and the
+proportionality check of the entanglement analysis. When Numba is
+importable the kernels are JIT compiled (with a parallel loop over
+amplitude pairs) and `qubit.engine` and `qubit.entanglment` call them
+instead of their NumPy code. Without Numba the kernels stay plain Python
+functions, which are only used by the tests to cross-check the NumPy
+reference path.
+
+Controls are passed as two bit masks: `mask` selects the control bits and
+`value` holds the bits they must have.
+
+The backend in use is logged when this module is imported and returned by
+`backend()`. Setting the environment variable EV_KERNELS=numpy disables the
+compiled kernels.
+
+Author: Minjong Kim
+Email: tlemsl@dgist.ac.kr
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Functions:
+    backend(): Name of the kernel backend in use.
+    set_backend(name): Selects the "numba" or "numpy" backend.
+    enabled(): Checks if the compiled kernels are in use.
+    control_masks(controls, polarity): Bit masks of controls.
+    matrix_kernel(state, u, target, mask, value): Applies 2x2 matrices.
+    phase_kernel(state, d, target, mask, value): Applies diagonal gates.
+    proportional_kernel(list1, list2, threshold): Proportionality check.
+"""
+
+import logging
+import os
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+logger = logging.getLogger(__name__)
+
+if numba is not None:
+    _jit = numba.njit(cache=True, parallel=True)
+    _prange = numba.prange
+else:
+    def _jit(func):
+        return func
+    _prange = range
+
+_backend = "numba" if numba is not None and \
+    os.environ.get("EV_KERNELS", "numba") != "numpy" else "numpy"
+logger.info("Gate kernel backend: %s", _backend)
+
+
+def backend():
+    """Name of the kernel backend in use.
+
+    Returns:
+        str: "numba" or "numpy".
+    """
+    return _backend
+
+
+def set_backend(name):
+    """Selects the kernel backend.
+
+    Args:
+        name (str): "numba" for the compiled kernels, "numpy" for the NumPy
+                    reference path.
+
+    Raises:
+        ValueError: If the name is unknown or Numba is not installed.
+    """
+    global _backend
+    if name not in ("numba", "numpy"):
+        raise ValueError(f"Unknown kernel backend '{name}'")
+    if name == "numba" and numba is None:
+        raise ValueError("Numba is not installed")
+    _backend = name
+    logger.info("Gate kernel backend: %s", _backend)
+
+
+def enabled():
+    """Checks if the compiled kernels are in use.
+
+    Returns:
+        bool: True for the numba backend.
+    """
+    return _backend == "numba"
+
+
+def control_masks(controls, polarity):
+    """Converts controls into (mask, value) bit masks.
+
+    Args:
+        controls (tuple): Control qubit indices.
+        polarity (tuple): Control values, one per control.
+
+    Returns:
+        tuple: (mask, value) integers.
+    """
+    mask = value = 0
+    for control, bit in zip(controls, polarity):
+        mask |= 1 << control
+        value |= bit << control
+    return mask, value
+
+
+@_jit
+def matrix_kernel(state, u, target, mask, value):
+    """Applies 2x2 matrices to the amplitude pairs of a target in place.
+
+    Args:
+        state (numpy.ndarray): complex128 state of shape (2^n, B).
+        u (numpy.ndarray): complex128 matrices of shape (1, 2, 2) or
+                           (B, 2, 2).
+        target (int): The target qubit.
+        mask (int): Control bit mask.
+        value (int): Required control bits.
+    """
+    dim, batch = state.shape
+    bit = 1 << target
+    low = bit - 1
+    shared = u.shape[0] == 1
+    for pair in _prange(dim // 2):
+        i = ((pair >> target) << (target + 1)) | (pair & low)
+        if (i & mask) != value:
+            continue
+        j = i | bit
+        for b in range(batch):
+            k = 0 if shared else b
+            amp0 = state[i, b]
+            amp1 = state[j, b]
+            state[i, b] = u[k, 0, 0] * amp0 + u[k, 0, 1] * amp1
+            state[j, b] = u[k, 1, 0] * amp0 + u[k, 1, 1] * amp1
+
+
+@_jit
+def phase_kernel(state, d, target, mask, value):
+    """Applies diagonal gates diag(d[k, 0], d[k, 1]) in place.
+
+    Args:
+        state (numpy.ndarray): complex128 state of shape (2^n, B).
+        d (numpy.ndarray): complex128 phases of shape (1, 2) or (B, 2).
+        target (int): The target qubit.
+        mask (int): Control bit mask.
+        value (int): Required control bits.
+    """
+    dim, batch = state.shape
+    shared = d.shape[0] == 1
+    for i in _prange(dim):
+        if (i & mask) != value:
+            continue
+        side = (i >> target) & 1
+        for b in range(batch):
+            state[i, b] *= d[0 if shared else b, side]
+
+
+@_jit
+def proportional_kernel(list1, list2, threshold):
+    """Checks if two amplitude vectors are proportional.
+
+    Mirrors `qubit.entanglment.proportional` for vectors that are not
+    approximately zero: the ratio of the first pair that is not near zero
+    is the reference, and pairs of near-zero entries are skipped.
+
+    Args:
+        list1 (numpy.ndarray): complex128 vector.
+        list2 (numpy.ndarray): complex128 vector of the same length.
+        threshold (float): Tolerance of zero and of the ratio.
+
+    Returns:
+        bool: True if the vectors are proportional.
+    """
+    inf = complex(np.inf, 0)
+    val = complex(np.nan, 0)
+    for i in range(len(list1)):
+        x, y = list1[i], list2[i]
+        if abs(x) < threshold and abs(y) < threshold:
+            continue
+        if abs(y) > threshold:
+            val = x / y
+        elif abs(x) < threshold:
+            val = complex(1, 0)
+        else:
+            val = inf
+        break
+    for i in range(len(list1)):
+        v1, v2 = list1[i], list2[i]
+        if abs(v2) < threshold and abs(v1) < threshold:
+            continue
+        if abs(v2) > threshold:
+            temp = v1 / v2
+        elif abs(v1) < threshold:
+            temp = complex(1, 0)
+        else:
+            temp = inf
+        if not abs(temp - val) <= threshold:
+            return False
+    return True
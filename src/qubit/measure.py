@@ -0,0 +1,176 @@
+"""
+Measurement Sampling Module
+
+This module provides shot-based measurement of quantum states. Outcome
+probabilities are reduced to the measured qubits first, so measuring k of n
+qubits only builds a cumulative distribution with 2^k entries, and shots are
+drawn in bulk with a single vectorized `searchsorted` call.
+
+States are column vectors of shape (2^n, 1) as stored in `Qubit.mat`, or
+batches of column vectors of shape (2^n, B). Qubit k corresponds to bit k of
+the basis index, so outcome strings read like the kets printed by `Qubit`
+(the highest measured qubit is the leftmost character).
+
+Author: Minjong Kim
+Email: tlemsl@dgist.ac.kr
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Functions:
+    marginal_probabilities(mat, qubits): Outcome probabilities of a subset of
+                                         qubits.
+    cumulative_probabilities(mat, qubits): Normalized cumulative distribution
+                                           used for sampling.
+    draw(cdf, shots, seed): Draws shots from a cumulative distribution.
+    sample_counts(mat, shots, qubits, seed): Count histogram of measurement
+                                             outcomes.
+    counts_to_dict(counts, width): Converts a count histogram to
+                                   {bitstring: count}.
+"""
+
+import math
+import numpy as np
+
+
+def _qubit_num(mat):
+    """Returns the number of qubits of a state matrix."""
+    return int(math.log2(mat.shape[0]))
+
+
+def _as_batch(mat):
+    """Returns the state as a 2D (2^n, B) array."""
+    mat = np.asarray(mat)
+    if mat.ndim == 1:
+        return mat.reshape(-1, 1)
+    return mat
+
+
+def marginal_probabilities(mat, qubits=None):
+    """Calculates the outcome probabilities of measuring a subset of qubits.
+
+    The probabilities are summed over the unmeasured qubits on the
+    (2, ..., 2, B) tensor view of the state, so only the 2^k marginal
+    outcomes are kept.
+
+    Args:
+        mat (numpy.ndarray): State of shape (2^n, 1) or batch (2^n, B).
+        qubits (list, optional): Measured qubit indices. Bit j of an outcome
+                                 is the value of qubits[j]. Defaults to all
+                                 qubits in order.
+
+    Returns:
+        numpy.ndarray: Real array of shape (2^k, B) with unnormalized
+                       outcome probabilities.
+
+    Raises:
+        ValueError: If a qubit index is out of range or repeated.
+    """
+    mat = _as_batch(mat)
+    n = _qubit_num(mat)
+    batch = mat.shape[1]
+    if qubits is None:
+        qubits = list(range(n))
+    qubits = list(qubits)
+    if len(set(qubits)) != len(qubits):
+        raise ValueError("Measured qubits must be unique")
+    for q in qubits:
+        if not 0 <= q < n:
+            raise ValueError(f"Qubit({q}) must be in [0, {n-1}]")
+
+    prob = (mat.real**2 + mat.imag**2).reshape((2,) * n + (batch,))
+    # tensor axis of qubit q is n-1-q (the highest qubit is the slowest axis)
+    keep = [n - 1 - q for q in reversed(qubits)]
+    drop = tuple(axis for axis in range(n) if axis not in keep)
+    if drop:
+        prob = prob.sum(axis=drop)
+    kept_sorted = sorted(keep)
+    prob = np.transpose(prob,
+                        [kept_sorted.index(axis) for axis in keep] + [len(keep)])
+    return prob.reshape(2**len(qubits), batch)
+
+
+def cumulative_probabilities(mat, qubits=None):
+    """Calculates the normalized cumulative outcome distribution.
+
+    Args:
+        mat (numpy.ndarray): State of shape (2^n, 1) or batch (2^n, B).
+        qubits (list, optional): Measured qubit indices (default is all).
+
+    Returns:
+        numpy.ndarray: Array of shape (2^k, B). Each column is
+                       non-decreasing and ends at 1.
+
+    Raises:
+        ValueError: If a state in the batch has zero norm.
+    """
+    cdf = np.cumsum(marginal_probabilities(mat, qubits), axis=0)
+    total = cdf[-1]
+    if np.any(total <= 0):
+        raise ValueError("Cannot sample from a zero state")
+    cdf /= total
+    cdf[-1] = 1.0
+    return cdf
+
+
+def draw(cdf, shots, seed=None):
+    """Draws measurement outcomes from cumulative distributions.
+
+    All columns are sampled with one `searchsorted` call: column b of the
+    distribution is shifted by b so the concatenated columns stay sorted.
+
+    Args:
+        cdf (numpy.ndarray): Cumulative distributions of shape (K, B).
+        shots (int): Number of shots per column.
+        seed (int or numpy.random.Generator, optional): Random seed.
+
+    Returns:
+        numpy.ndarray: Integer count histogram of shape (K, B).
+
+    Raises:
+        ValueError: If shots is negative.
+    """
+    if shots < 0:
+        raise ValueError("shots must be non-negative")
+    outcomes, batch = cdf.shape
+    rng = np.random.default_rng(seed)
+    offset = np.arange(batch, dtype=np.float64)
+    flat = (cdf + offset).T.reshape(-1)
+    u = rng.random((batch, shots)) + offset[:, None]
+    base = np.arange(batch)[:, None] * outcomes
+    idx = np.searchsorted(flat, u.reshape(-1), side='right').reshape(batch, -1)
+    # guard against u rounding up to the next column's offset
+    np.clip(idx - base, 0, outcomes - 1, out=idx)
+    idx += base
+    counts = np.bincount(idx.reshape(-1), minlength=outcomes * batch)
+    return counts.reshape(batch, outcomes).T
+
+
+def sample_counts(mat, shots, qubits=None, seed=None):
+    """Samples measurement outcomes of a state or a batch of states.
+
+    Args:
+        mat (numpy.ndarray): State of shape (2^n, 1) or batch (2^n, B).
+        shots (int): Number of shots per state.
+        qubits (list, optional): Measured qubit indices (default is all).
+        seed (int or numpy.random.Generator, optional): Random seed.
+
+    Returns:
+        numpy.ndarray: Integer count histogram of shape (2^k, B).
+    """
+    return draw(cumulative_probabilities(mat, qubits), shots, seed)
+
+
+def counts_to_dict(counts, width):
+    """Converts a count histogram into a compact {bitstring: count} dict.
+
+    Args:
+        counts (numpy.ndarray): 1D count histogram of length 2^width.
+        width (int): Number of measured qubits.
+
+    Returns:
+        dict: Outcomes with at least one count, keyed by bitstring.
+    """
+    counts = np.asarray(counts).reshape(-1)
+    return {
+        format(int(k), 'b').zfill(width): int(counts[k])
+        for k in np.flatnonzero(counts)
+    }
@@ -0,0 +1,131 @@
+"""
+Quantum Noise Channels
+
+This module defines single-qubit noise channels as Kraus operators. A
+channel maps rho to sum_k K_k rho K_k^+ with sum_k K_k^+ K_k = I, so it is
+stored as a (k, 2, 2) array. The density-matrix backend applies a channel as
+one 4x4 superoperator, and trajectory simulation picks a single Kraus
+operator per application with probability ||K_k psi||^2.
+
+A `NoiseModel` attaches channels to gates: after every gate, each channel
+acts on every qubit the gate touches (its target and controls).
+
+Author: Minjong Kim
+Email: tlemsl@dgist.ac.kr
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    NoiseModel: Channels applied after every gate.
+
+Functions:
+    depolarizing(p): Depolarizing channel.
+    dephasing(p): Dephasing (phase flip) channel.
+    amplitude_damping(gamma): Amplitude damping channel.
+    superoperator(kraus): 4x4 superoperator of a channel.
+"""
+
+import numpy as np
+
+Pauli_matrices = np.array([[[0, 1], [1, 0]], [[0, -1j], [1j, 0]],
+                           [[1, 0], [0, -1]]], dtype=np.complex128)
+
+
+def _check_probability(p, name):
+    """Raises ValueError unless 0 <= p <= 1."""
+    if not 0 <= p <= 1:
+        raise ValueError(f"{name} must be in [0, 1], got {p}")
+
+
+def depolarizing(p):
+    """Depolarizing channel rho -> (1 - p) rho + p/3 (X rho X + Y rho Y + Z rho Z).
+
+    Args:
+        p (float): Error probability.
+
+    Returns:
+        numpy.ndarray: Kraus operators of shape (4, 2, 2).
+    """
+    _check_probability(p, "p")
+    return np.concatenate([np.sqrt(1 - p) * np.identity(2)[None],
+                           np.sqrt(p / 3) * Pauli_matrices])
+
+
+def dephasing(p):
+    """Dephasing channel rho -> (1 - p) rho + p Z rho Z.
+
+    Args:
+        p (float): Phase flip probability.
+
+    Returns:
+        numpy.ndarray: Kraus operators of shape (2, 2, 2).
+    """
+    _check_probability(p, "p")
+    return np.array([np.sqrt(1 - p) * np.identity(2),
+                     np.sqrt(p) * Pauli_matrices[2]], dtype=np.complex128)
+
+
+def amplitude_damping(gamma):
+    """Amplitude damping channel, decaying |1> to |0> with probability gamma.
+
+    Args:
+        gamma (float): Decay probability.
+
+    Returns:
+        numpy.ndarray: Kraus operators of shape (2, 2, 2).
+    """
+    _check_probability(gamma, "gamma")
+    return np.array([[[1, 0], [0, np.sqrt(1 - gamma)]],
+                     [[0, np.sqrt(gamma)], [0, 0]]], dtype=np.complex128)
+
+
+def superoperator(kraus):
+    """Builds the 4x4 superoperator of a channel.
+
+    Args:
+        kraus (numpy.ndarray): Kraus operators of shape (k, 2, 2).
+
+    Returns:
+        numpy.ndarray: S with S[2a + b, 2c + d] = sum_k K[a, c] conj(K[b, d]),
+                       acting on (row bit, column bit) pairs of rho.
+    """
+    kraus = np.asarray(kraus, dtype=np.complex128)
+    return np.einsum("kac,kbd->abcd", kraus, kraus.conj()).reshape(4, 4)
+
+
+class NoiseModel:
+    """Channels applied after every gate.
+
+    Attributes:
+        channels (list): Kraus operator arrays of shape (k, 2, 2).
+    """
+
+    def __init__(self, *channels):
+        """Initialize a noise model.
+
+        Args:
+            *channels (numpy.ndarray): Kraus operators of shape (k, 2, 2).
+
+        Raises:
+            ValueError: If a channel is not trace preserving.
+        """
+        self.channels = [np.asarray(kraus, dtype=np.complex128)
+                         for kraus in channels]
+        for kraus in self.channels:
+            total = np.einsum("kba,kbc->ac", kraus.conj(), kraus)
+            if not np.allclose(total, np.identity(2)):
+                raise ValueError("Kraus operators must sum to the identity")
+
+    def __bool__(self):
+        return bool(self.channels)
+
+    def after(self, gate):
+        """Lists the channel applications that follow a gate.
+
+        Args:
+            gate (qubit.gates.Base): The gate.
+
+        Returns:
+            list: (qubit, kraus) pairs in application order.
+        """
+        qubits = (gate._target,) + tuple(gate.controls)
+        return [(qubit, kraus) for qubit in qubits for kraus in self.channels]
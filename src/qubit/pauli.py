@@ -0,0 +1,193 @@
+"""
+Pauli String Expectation Module
+
+This module evaluates expectation values of Pauli strings such as "XZIY"
+directly on state vectors. A Pauli string P maps a basis state |b> to
+i^y (-1)^popcount(b & z) |b ^ x>, where x marks the qubits carrying X or Y,
+z marks the qubits carrying Z or Y and y counts the Y factors. Therefore
+
+    <psi|P|psi> = i^y sum_b conj(psi[b ^ x]) psi[b] (-1)^popcount(b & z)
+
+needs only an index permutation and a sign vector, never a 2^n x 2^n matrix.
+Strings sharing the same X-support share the permuted product, and large
+groups evaluate every Z-pattern at once with a fast Walsh-Hadamard transform.
+
+The leftmost character of a string acts on the highest qubit, matching the
+ket order printed by `Qubit`.
+
+Author: Minjong Kim
+Email: tlemsl@dgist.ac.kr
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Functions:
+    parse(pauli, n): Converts a Pauli string into bit masks.
+    expectation(mat, paulis): Expectation values of Pauli strings.
+    apply(mat, pauli): Applies a Pauli string to a state.
+    apply_observable(mat, observable): Applies a weighted sum of Pauli strings.
+"""
+
+import math
+import numpy as np
+
+Chunk_size = 2**16
+
+
+def parse(pauli: str, n: int):
+    """Converts a Pauli string into its bit mask representation.
+
+    Args:
+        pauli (str): String over "IXYZ" with n characters.
+        n (int): The number of qubits.
+
+    Returns:
+        tuple: (x_mask, z_mask, y_count).
+
+    Raises:
+        ValueError: If the string has a wrong length or an unknown character.
+    """
+    if len(pauli) != n:
+        raise ValueError(f"Pauli string '{pauli}' must have {n} characters")
+    x_mask = z_mask = y_count = 0
+    for i, char in enumerate(pauli.upper()):
+        bit = 1 << (n - 1 - i)
+        if char == "X":
+            x_mask |= bit
+        elif char == "Z":
+            z_mask |= bit
+        elif char == "Y":
+            x_mask |= bit
+            z_mask |= bit
+            y_count += 1
+        elif char != "I":
+            raise ValueError(f"Unknown Pauli operator '{char}' in '{pauli}'")
+    return x_mask, z_mask, y_count
+
+
+def _parity(values):
+    """Returns popcount(values) & 1 for an integer array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values) & 1
+    values = values.copy()
+    shift = 32
+    while shift:
+        values ^= values >> shift
+        shift //= 2
+    return values & 1
+
+
+def _walsh_hadamard(vec):
+    """Fast Walsh-Hadamard transform along axis 0 of a (2^n, B) array.
+
+    Returns:
+        numpy.ndarray: w[z] = sum_b (-1)^popcount(b & z) vec[b].
+    """
+    dim, batch = vec.shape
+    ret = vec.copy()
+    half = 1
+    while half < dim:
+        view = ret.reshape(-1, 2, half, batch)
+        upper = view[:, 0].copy()
+        view[:, 0] += view[:, 1]
+        view[:, 1] = upper - view[:, 1]
+        half *= 2
+    return ret
+
+
+def expectation(mat, paulis):
+    """Calculates expectation values of Pauli strings.
+
+    Args:
+        mat (numpy.ndarray): State of shape (2^n, 1) or batch (2^n, B).
+        paulis (list): Pauli strings, e.g. ["XZIY", "ZZII"].
+
+    Returns:
+        numpy.ndarray: Real array of shape (len(paulis), B).
+    """
+    psi = np.asarray(mat)
+    if psi.ndim == 1:
+        psi = psi.reshape(-1, 1)
+    dim, batch = psi.shape
+    n = int(math.log2(dim))
+    index = np.arange(dim, dtype=np.int64)
+
+    groups = {}
+    phases = np.empty(len(paulis), dtype=np.complex128)
+    for pos, pauli in enumerate(paulis):
+        x_mask, z_mask, y_count = parse(pauli, n)
+        phases[pos] = 1j**(y_count % 4)
+        groups.setdefault(x_mask, []).append((pos, z_mask))
+
+    ret = np.zeros((len(paulis), batch), dtype=np.complex128)
+    small = []
+    for x_mask, members in groups.items():
+        if len(members) <= n:
+            small.append((x_mask, members))
+            continue
+        # one transform yields every Z-pattern for this X-support
+        product = psi[index ^ x_mask].conj() * psi
+        transformed = _walsh_hadamard(product)
+        for pos, z_mask in members:
+            ret[pos] = transformed[z_mask]
+
+    # remaining groups are evaluated a chunk of X-supports at a time
+    columns = np.ascontiguousarray(psi.T)
+    step = max(1, Chunk_size // (dim * batch))
+    for start in range(0, len(small), step):
+        chunk = small[start:start + step]
+        x_masks = np.array([x_mask for x_mask, _ in chunk], dtype=np.int64)
+        products = columns[:, index[None, :] ^ x_masks[:, None]].conj()
+        products *= columns[:, None, :]
+        owners, z_masks, positions = [], [], []
+        for owner, (_, members) in enumerate(chunk):
+            for pos, z_mask in members:
+                owners.append(owner)
+                z_masks.append(z_mask)
+                positions.append(pos)
+        if len(owners) != len(chunk):
+            products = products[:, owners]
+        z_masks = np.array(z_masks, dtype=np.int64)
+        signs = 1.0 - 2.0 * _parity(index[None, :] & z_masks[:, None])
+        ret[positions] = np.einsum("md,bmd->mb", signs, products)
+
+    return (ret * phases[:, None]).real
+
+
+def apply(mat, pauli):
+    """Applies a Pauli string to a state.
+
+    Args:
+        mat (numpy.ndarray): State of shape (2^n, 1) or batch (2^n, B).
+        pauli (str): Pauli string, e.g. "XZIY".
+
+    Returns:
+        numpy.ndarray: New array P|psi> of the same shape.
+    """
+    psi = np.asarray(mat)
+    dim = psi.shape[0]
+    x_mask, z_mask, y_count = parse(pauli, int(math.log2(dim)))
+    source = np.arange(dim, dtype=np.int64) ^ x_mask
+    signs = 1.0 - 2.0 * _parity(source & z_mask)
+    phase = 1j**(y_count % 4)
+    return (phase * signs).reshape((dim,) + (1,) * (psi.ndim - 1)) * psi[source]
+
+
+def apply_observable(mat, observable):
+    """Applies an observable given as a weighted sum of Pauli strings.
+
+    Args:
+        mat (numpy.ndarray): State of shape (2^n, 1) or batch (2^n, B).
+        observable (str, list or dict): A Pauli string, a list of strings
+                                        (summed with weight 1) or a dict
+                                        {pauli: coefficient}.
+
+    Returns:
+        numpy.ndarray: New array H|psi> of the same shape.
+    """
+    if isinstance(observable, str):
+        observable = {observable: 1.0}
+    elif not isinstance(observable, dict):
+        observable = {pauli: 1.0 for pauli in observable}
+    ret = np.zeros(np.shape(mat), dtype=np.complex128)
+    for pauli, coefficient in observable.items():
+        ret += coefficient * apply(mat, pauli)
+    return ret
@@ -7,13 +7,23 @@ Author: Minjong Kim
 Email: tlemsl@dgist.ac.kr
 Website: https://github.com/tlemsl/Entanglement_visualizer
 
+Kets are rendered without visiting every basis state: NumPy selects the
+amplitudes above `Threshold`, optionally keeps only the largest `top_k`, and
+builds the bit labels of all kept terms at once.
+
 Classes:
     Qubit: Represents quantum qubits and their operations.
+
+Functions:
+    format_ket(vec, top_k, tolerance): Renders amplitudes as a ket string.
 """
 
 import math
 import numpy as np
 import qubit.entanglment
+import qubit.measure
+import qubit.pauli
+import qubit.snapshot
 
 Threshold = 0.0001
 
@@ -32,6 +42,38 @@ def _complex_to_str(number: complex) -> str:
     return ret
 
 
+def format_ket(vec, top_k=None, tolerance=Threshold):
+    """Renders state amplitudes as a ket string such as "0.707|00> + ...".
+
+    Args:
+        vec (numpy.ndarray): Amplitudes of shape (2^n,) or (2^n, 1).
+        top_k (int, optional): Keep only the k largest amplitudes and append
+                               "+ N more terms" (default is all terms).
+        tolerance (float, optional): Amplitudes with a magnitude not above
+                                     it are omitted.
+
+    Returns:
+        str: The terms in basis order, "" if every amplitude is omitted.
+    """
+    vec = np.asarray(vec).reshape(-1)
+    n = int(math.log2(len(vec)))
+    index = np.flatnonzero(np.abs(vec) > tolerance)
+    hidden = 0
+    if top_k is not None and len(index) > top_k:
+        hidden = len(index) - top_k
+        keep = np.argpartition(-np.abs(vec[index]), top_k - 1)[:top_k]
+        index = np.sort(index[keep])
+    # one row of '0'/'1' bytes per kept basis state, most significant first
+    bits = (index[:, None] >> np.arange(n - 1, -1, -1)) & 1
+    labels = (bits.astype(np.uint8) + ord("0")).view(f"S{max(n, 1)}")
+    terms = [f"{_complex_to_str(amp)}|{label.decode()}>"
+             for amp, label in zip(vec[index].tolist(), labels[:, 0])] \
+        if n else [f"{_complex_to_str(amp)}|>" for amp in vec[index]]
+    if hidden:
+        terms.append(f"{hidden} more term{'s' if hidden > 1 else ''}")
+    return " + ".join(terms)
+
+
 class Qubit:
     """A class representing a quantum qubit.
 
@@ -64,6 +106,8 @@ class Qubit:
         self._n = n
         self._mat = np.zeros((2**n, 1), dtype=np.complex128)
         self._mat[v, 0] = 1
+        self._cdf_cache = {}
+        self._ket_cache = {}
 
     def tensor_product(self, other):
         """Compute the tensor product of two qubits.
@@ -128,13 +172,22 @@ class Qubit:
 
     def __str__(self) -> str:
         """Return a string representation of the qubit state."""
-        ret = ""
-        for i in range(2**self._n):
-            if self.mat[i, 0]:
-                binary = str(bin(i))[2:]
-                ret += f"{_complex_to_str(self.mat[i,0])}|{binary.zfill(self._n)}>"
-                ret += " + "
-        return ret[:-3]
+        return self.ket()
+
+    def ket(self, top_k=None):
+        """Renders the state as a ket string, cached per state.
+
+        Args:
+            top_k (int, optional): Keep only the k largest amplitudes and
+                                   append "+ N more terms" (default is all).
+
+        Returns:
+            str: The ket string.
+        """
+        ret = self._ket_cache.get(top_k)
+        if ret is None:
+            ret = self._ket_cache[top_k] = format_ket(self._mat, top_k)
+        return ret
 
     def __len__(self) -> int:
         """Return the number of qubits in the state."""
@@ -159,6 +212,8 @@ class Qubit:
             raise ValueError("Qubit must be a column vector!")
         self._mat = data
         self._n = int(math.log2(self._mat.shape[0]))
+        self._cdf_cache = {}
+        self._ket_cache = {}
 
     @property
     def T(self):
@@ -178,6 +233,73 @@ class Qubit:
 
         return qubit.entanglment.entanglement(self.mat)
 
+    def sample(self, shots, qubits=None, seed=None):
+        """Simulates measuring the qubit state `shots` times.
+
+        The cumulative outcome distribution of the measured qubits is cached
+        on the state, so repeated sampling only pays for drawing the shots.
+
+        Args:
+            shots (int): Number of measurement shots.
+            qubits (list, optional): Measured qubit indices (default is all).
+                                     Bit j of an outcome is qubits[j], so the
+                                     last listed qubit is the leftmost char.
+            seed (int or numpy.random.Generator, optional): Random seed.
+
+        Returns:
+            dict: Count histogram {bitstring: count} of observed outcomes.
+        """
+        if qubits is None:
+            qubits = range(self._n)
+        key = tuple(qubits)
+        cdf = self._cdf_cache.get(key)
+        if cdf is None:
+            cdf = qubit.measure.cumulative_probabilities(self._mat, key)
+            self._cdf_cache[key] = cdf
+        counts = qubit.measure.draw(cdf, shots, seed)
+        return qubit.measure.counts_to_dict(counts[:, 0], len(key))
+
+    def expectation(self, paulis):
+        """Calculates expectation values of Pauli strings on the state.
+
+        Args:
+            paulis (str or list): A Pauli string such as "XZIY" or a list of
+                                  them. The leftmost character acts on the
+                                  highest qubit.
+
+        Returns:
+            float or numpy.ndarray: One value per Pauli string.
+        """
+        if isinstance(paulis, str):
+            return float(qubit.pauli.expectation(self._mat, [paulis])[0, 0])
+        return qubit.pauli.expectation(self._mat, paulis)[:, 0]
+
+    def save(self, path, sparse=False):
+        """Writes the state to a binary snapshot file.
+
+        Args:
+            path (str): The output file.
+            sparse (bool, optional): Store only the nonzero amplitudes
+                                     (default is False).
+        """
+        qubit.snapshot.write_state(path, self._mat, sparse)
+
+    @staticmethod
+    def load(path, mmap=True):
+        """Reads a state from a binary snapshot file.
+
+        Args:
+            path (str): The snapshot file.
+            mmap (bool, optional): Map a dense state copy-on-write instead
+                                   of reading it (default is True).
+
+        Returns:
+            Qubit: The loaded state.
+        """
+        ret = Qubit()
+        ret.mat = qubit.snapshot.read_state(path, mmap)
+        return ret
+
     @staticmethod
     def base(n, k):
         """Create a base state vector for a given qubit configuration.
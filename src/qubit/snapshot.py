@@ -0,0 +1,175 @@
+"""
+Binary Circuit and State Snapshots
+
+This module defines a compact little-endian file format for states and
+circuits. Every file starts with a 32 byte header
+
+    magic (8s) | kind (B) | flags (B) | reserved (H) | n (I) | a (Q) | b (Q)
+
+followed by 16 byte aligned data blocks.
+
+A state (kind 0) stores its 2^n complex128 amplitudes as a raw buffer, so a
+dense state is loaded through a copy-on-write memory map without reading or
+copying the data. With the sparse flag only the nonzero amplitudes are
+stored, as b uint64 indices followed by b amplitudes.
+
+A circuit (kind 1) stores a = gate_num columns and b gate records of dtype
+`Record_dtype` (kind, row, column, target, control and polarity bit masks,
+angle), a JSON list of parameter names and the input state as an embedded
+state snapshot. Gate matrices are never stored.
+
+Author: Minjong Kim
+Email: tlemsl@dgist.ac.kr
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Functions:
+    write_state(path, mat, sparse): Writes a state snapshot.
+    read_state(path, mmap): Reads a state snapshot.
+    write_circuit(path, n, gate_num, records, names, mat, sparse): Writes a
+                                                                   circuit.
+    read_circuit(path, mmap): Reads a circuit snapshot.
+"""
+
+import json
+import math
+import struct
+import numpy as np
+
+Magic = b"EVSNAP\x00\x01"
+Header = struct.Struct("<8sBBHIQQ")
+State_kind, Circuit_kind = 0, 1
+Sparse_flag = 1
+# gate kind codes of the records; the position in the tuple is the code
+Gate_kinds = ("X", "Y", "Z", "H", "S", "T", "Swap", "RX", "RY", "RZ",
+              "Phase")
+No_parameter = 0xFFFFFFFF
+Record_dtype = np.dtype([("kind", "<u1"), ("pad", "<u1"), ("row", "<u2"),
+                         ("column", "<u4"), ("target", "<u4"),
+                         ("parameter", "<u4"), ("controls", "<u8"),
+                         ("polarity", "<u8"), ("theta", "<f8")])
+
+
+def _padding(offset):
+    """Number of bytes that align an offset to 16."""
+    return -offset % 16
+
+
+def _state_blocks(mat, sparse):
+    """Returns (flags, b, [buffers]) of a state."""
+    vec = np.ascontiguousarray(np.asarray(mat).reshape(-1),
+                               dtype=np.complex128)
+    if not sparse:
+        return 0, len(vec), [vec]
+    index = np.flatnonzero(vec).astype("<u8")
+    return Sparse_flag, len(index), [index, bytes(_padding(index.nbytes)),
+                                     vec[index]]
+
+
+def _write_state(file, mat, sparse):
+    """Writes a state header and its data at the current position."""
+    vec = np.asarray(mat)
+    n = int(math.log2(vec.shape[0]))
+    flags, count, blocks = _state_blocks(vec, sparse)
+    file.write(Header.pack(Magic, State_kind, flags, 0, n, 2**n, count))
+    for block in blocks:
+        file.write(block if isinstance(block, bytes) else block.tobytes())
+
+
+def _read_state(file, path, mmap):
+    """Reads a state whose header starts at the current file position."""
+    offset = file.tell()
+    magic, kind, flags, _, n, dim, count = Header.unpack(
+        file.read(Header.size))
+    if magic != Magic or kind != State_kind:
+        raise ValueError(f"{path} does not hold a state snapshot")
+    if not flags & Sparse_flag:
+        if mmap:
+            return np.memmap(path, dtype="<c16", mode="c",
+                             offset=offset + Header.size, shape=(dim, 1))
+        return np.fromfile(file, dtype="<c16", count=dim).reshape(dim, 1)
+    index = np.fromfile(file, dtype="<u8", count=count)
+    file.seek(_padding(index.nbytes), 1)
+    values = np.fromfile(file, dtype="<c16", count=count)
+    ret = np.zeros((dim, 1), dtype=np.complex128)
+    ret[index.astype(np.int64), 0] = values
+    return ret
+
+
+def write_state(path, mat, sparse=False):
+    """Writes a state snapshot.
+
+    Args:
+        path (str): The output file.
+        mat (numpy.ndarray): State of shape (2^n, 1) or (2^n,).
+        sparse (bool, optional): Store only the nonzero amplitudes
+                                 (default is False).
+    """
+    with open(path, "wb") as file:
+        _write_state(file, mat, sparse)
+
+
+def read_state(path, mmap=True):
+    """Reads a state snapshot.
+
+    Args:
+        path (str): The snapshot file.
+        mmap (bool, optional): Map a dense state copy-on-write instead of
+                               reading it (default is True).
+
+    Returns:
+        numpy.ndarray: The state of shape (2^n, 1).
+
+    Raises:
+        ValueError: If the file is not a state snapshot.
+    """
+    with open(path, "rb") as file:
+        return _read_state(file, path, mmap)
+
+
+def write_circuit(path, n, gate_num, records, names, mat, sparse=False):
+    """Writes a circuit snapshot.
+
+    Args:
+        path (str): The output file.
+        n (int): The number of qubits.
+        gate_num (int): The number of columns.
+        records (numpy.ndarray): Gate records of dtype `Record_dtype`.
+        names (list): Parameter names referenced by the records.
+        mat (numpy.ndarray): The input state.
+        sparse (bool, optional): Store the input state sparsely.
+    """
+    records = np.ascontiguousarray(records, dtype=Record_dtype)
+    names = json.dumps(list(names)).encode("utf-8")
+    with open(path, "wb") as file:
+        file.write(Header.pack(Magic, Circuit_kind, 0, 0, n, gate_num,
+                               len(records)))
+        file.write(records.tobytes())
+        file.write(struct.pack("<Q", len(names)) + names)
+        file.write(bytes(_padding(file.tell())))
+        _write_state(file, mat, sparse)
+
+
+def read_circuit(path, mmap=True):
+    """Reads a circuit snapshot.
+
+    Args:
+        path (str): The snapshot file.
+        mmap (bool, optional): Map a dense input state copy-on-write.
+
+    Returns:
+        tuple: (n, gate_num, records, names, mat).
+
+    Raises:
+        ValueError: If the file is not a circuit snapshot.
+    """
+    with open(path, "rb") as file:
+        magic, kind, _, _, n, gate_num, count = Header.unpack(
+            file.read(Header.size))
+        if magic != Magic or kind != Circuit_kind:
+            raise ValueError(f"{path} does not hold a circuit snapshot")
+        records = np.fromfile(file, dtype=Record_dtype, count=count)
+        length, = struct.unpack("<Q", file.read(8))
+        names = json.loads(file.read(length).decode("utf-8"))
+        file.seek(_padding(file.tell()), 1)
+        mat = _read_state(file, path, mmap)
+    return n, gate_num, records, names, mat
@@ -0,0 +1,261 @@
+"""
+Peak Memory Benchmarks
+
+This module measures the peak memory of the main simulator paths at
+increasing qubit counts: gate construction, circuit construction with row
+resizing, `calculate_qubit_state` and entanglement analysis. Every run
+records the tracemalloc peak (Python and NumPy allocations) and the growth
+of the process resident set size (VmHWM, reset through
+/proc/self/clear_refs on Linux).
+
+A state vector costs O(2^n) memory, so a path whose peak grows faster than
+that, e.g. one forming 2^n x 2^n matrices, is flagged: the growth exponent
+is the least-squares slope of log2(peak) over the upper half of the qubit
+counts and must stay below 1 + `Growth_tolerance`. Results are stored as
+JSON baselines and later runs are compared against them:
+
+    python -m util.memory_benchmark --max-qubits 14 --output new.json \\
+        --baseline old.json
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Functions:
+    measure(func, *args): Peak memory of one call.
+    growth_exponent(ns, peaks): Growth of the peaks per added qubit.
+    run(ns, scenarios): Runs the benchmark scenarios.
+    compare(result, baseline, tolerance): Lists peak regressions.
+    save(result, path): Writes results as JSON.
+    load(path): Reads JSON results.
+    main(argv): Command line entry point.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+import numpy as np
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+
+Growth_tolerance = 0.25
+Regression_tolerance = 0.2
+Circuit_columns = 8
+
+
+def _status(key):
+    """Reads a size in bytes from /proc/self/status, None if unavailable."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as file:
+            for line in file:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_rss_peak():
+    """Resets VmHWM to the current RSS; returns False if not supported."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure(func, *args):
+    """Measures the peak memory of one call.
+
+    Args:
+        func (function): The function to run.
+        *args: Its arguments.
+
+    Returns:
+        tuple: (result, tracemalloc peak in bytes, RSS growth in bytes or
+               None if the platform does not support it).
+    """
+    gc.collect()
+    rss = _status("VmRSS") if _reset_rss_peak() else None
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if rss is not None:
+        rss = max(_status("VmHWM") - rss, 0)
+    return result, peak, rss
+
+
+def _ghz_circuit(n):
+    """GHZ preparation padded with rotations to `Circuit_columns`."""
+    circuit = qc.QuantumCircuit(qb.Qubit(n, 0), Circuit_columns)
+    circuit.add_gate(0, 0, qg.H(n, 0))
+    for col in range(1, Circuit_columns):
+        q = col % n
+        if q:
+            circuit.add_gate(q, col, qg.X(n, q, q - 1))
+        else:
+            circuit.add_gate(0, col, qg.RZ(n, 0, theta=0.1 * col))
+    return circuit
+
+
+def _gate_construction(n):
+    gates = [qg.H(n, n - 1), qg.X(n, 0, n - 1), qg.X(n, 0, [1, n - 1]),
+             qg.RY(n, 1, 0, theta=0.3), qg.Swap(n, 0, n - 1)]
+    return len(gates)
+
+
+def _circuit_construction(n):
+    circuit = _ghz_circuit(n)
+    circuit.add_circuit_row()
+    circuit.del_circuit_row()
+    return circuit._shape
+
+
+def _calculate_qubit_state(n):
+    return len(_ghz_circuit(n).calculate_qubit_state())
+
+
+def _entanglement(n):
+    state = _ghz_circuit(n).final_state()
+    return state.entangled()
+
+
+Scenarios = {
+    "gate_construction": _gate_construction,
+    "circuit_construction": _circuit_construction,
+    "calculate_qubit_state": _calculate_qubit_state,
+    "entanglement": _entanglement,
+}
+
+
+def growth_exponent(ns, peaks):
+    """Fits the growth of peak memory per added qubit.
+
+    Args:
+        ns (list): Qubit counts in increasing order.
+        peaks (list): Peak bytes per qubit count.
+
+    Returns:
+        float: Least-squares slope of log2(peak) over the upper half of the
+               qubit counts; 1 means O(2^n), 2 means O(4^n).
+    """
+    half = len(ns) // 2
+    x = np.asarray(ns[half:], dtype=np.float64)
+    y = np.log2(np.maximum(np.asarray(peaks[half:], dtype=np.float64), 1))
+    if len(x) < 2:
+        return 0.0
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def run(ns, scenarios=None):
+    """Runs the benchmark scenarios for every qubit count.
+
+    Args:
+        ns (list): Qubit counts in increasing order, each at least 2.
+        scenarios (dict, optional): Functions of n keyed by name (default is
+                                    `Scenarios`).
+
+    Returns:
+        dict: {"n": ns, "scenarios": {name: {"tracemalloc": [...],
+               "rss": [...], "exponent": float, "flagged": bool}}}.
+    """
+    scenarios = Scenarios if scenarios is None else scenarios
+    ret = {"n": list(ns), "scenarios": {}}
+    for name, func in scenarios.items():
+        traced, rss = [], []
+        for n in ns:
+            _, peak, grown = measure(func, n)
+            traced.append(peak)
+            rss.append(grown)
+        exponent = growth_exponent(ns, traced)
+        ret["scenarios"][name] = {"tracemalloc": traced, "rss": rss,
+                                  "exponent": exponent,
+                                  "flagged": exponent > 1 + Growth_tolerance}
+    return ret
+
+
+def compare(result, baseline, tolerance=Regression_tolerance):
+    """Lists the peaks that grew against a baseline.
+
+    Args:
+        result (dict): Output of `run`.
+        baseline (dict): An earlier output of `run`.
+        tolerance (float, optional): Allowed relative growth.
+
+    Returns:
+        list: (scenario, n, baseline bytes, new bytes) per regression.
+    """
+    ret = []
+    for name, stats in result["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        previous = dict(zip(baseline["n"], old["tracemalloc"]))
+        for n, peak in zip(result["n"], stats["tracemalloc"]):
+            if n in previous and peak > previous[n] * (1 + tolerance):
+                ret.append((name, n, previous[n], peak))
+    return ret
+
+
+def save(result, path):
+    """Writes benchmark results as JSON.
+
+    Args:
+        result (dict): Output of `run`.
+        path (str): The output file.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(result, file, indent=2)
+
+
+def load(path):
+    """Reads benchmark results from JSON.
+
+    Args:
+        path (str): The results file.
+
+    Returns:
+        dict: The results.
+    """
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def main(argv=None):
+    """Runs the suite from the command line.
+
+    Returns:
+        int: 1 if a path was flagged or regressed, else 0.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--min-qubits", type=int, default=4)
+    parser.add_argument("--max-qubits", type=int, default=12)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    args = parser.parse_args(argv)
+
+    result = run(list(range(args.min_qubits, args.max_qubits + 1)))
+    status = 0
+    for name, stats in result["scenarios"].items():
+        flag = "  FLAGGED" if stats["flagged"] else ""
+        print(f"{name:24s} peak {stats['tracemalloc'][-1]:>12d} B  "
+              f"growth 2^({stats['exponent']:.2f} n){flag}")
+        status |= stats["flagged"]
+    if args.baseline:
+        for name, n, old, new in compare(result, load(args.baseline)):
+            print(f"regression: {name} n={n} {old} B -> {new} B")
+            status = 1
+    if args.output:
+        save(result, args.output)
+    return int(status)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
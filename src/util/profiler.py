@@ -0,0 +1,208 @@
+"""
+Profiling Counters and Timers
+
+This module collects per-stage statistics of the simulator in one global
+registry: counters (gates constructed, Swap reorders, cuts tested,
+proportionality checks, ...) and timers (total seconds and calls per
+stage). Instrumented functions are wrapped with `timed` and call `count`;
+both return after a single flag check while profiling is disabled, so the
+instrumentation stays in production code. Setting the environment variable
+EV_PROFILE=1 enables profiling at import.
+
+    with profiler.Profile() as profile:
+        circuit.calculate_qubit_state()
+    profile.dump("profile.json")
+
+Nested timers each record their own total, e.g. "engine.apply_gate" time
+is part of "circuit.calculate_columns".
+
+Author: Chanyu Moon
+Email: moonchanyu@gmail.com
+Website: https://github.com/tlemsl/Entanglement_visualizer
+
+Classes:
+    Profile: Context manager profiling a block of code.
+
+Functions:
+    enable(): Turns profiling on.
+    disable(): Turns profiling off.
+    enabled(): Checks if profiling is on.
+    reset(): Clears all counters and timers.
+    count(name, k): Adds to a counter.
+    add_time(name, seconds): Adds a timed call to a timer.
+    timer(name): Context manager timing a block.
+    timed(name): Decorator timing every call of a function.
+    snapshot(): Returns the collected statistics.
+    dump(path): Writes the statistics as JSON.
+"""
+
+import collections
+import contextlib
+import functools
+import json
+import os
+import time
+
+Enabled = os.environ.get("EV_PROFILE", "0") == "1"
+_counters = collections.Counter()
+_seconds = collections.defaultdict(float)
+_calls = collections.Counter()
+
+
+def enable():
+    """Turns profiling on."""
+    global Enabled
+    Enabled = True
+
+
+def disable():
+    """Turns profiling off."""
+    global Enabled
+    Enabled = False
+
+
+def enabled():
+    """Checks if profiling is on.
+
+    Returns:
+        bool: True if statistics are collected.
+    """
+    return Enabled
+
+
+def reset():
+    """Clears all counters and timers."""
+    _counters.clear()
+    _seconds.clear()
+    _calls.clear()
+
+
+def count(name, k=1):
+    """Adds to a counter if profiling is on.
+
+    Args:
+        name (str): The counter name, "<module>.<event>".
+        k (int, optional): The amount to add (default is 1).
+    """
+    if Enabled:
+        _counters[name] += k
+
+
+def add_time(name, seconds):
+    """Adds one timed call to a timer.
+
+    Args:
+        name (str): The timer name, "<module>.<stage>".
+        seconds (float): The duration of the call.
+    """
+    _seconds[name] += seconds
+    _calls[name] += 1
+
+
+@contextlib.contextmanager
+def timer(name):
+    """Times a block if profiling is on.
+
+    Args:
+        name (str): The timer name.
+    """
+    if not Enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator timing every call of a function while profiling is on.
+
+    Args:
+        name (str): The timer name.
+
+    Returns:
+        function: The decorator.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_time(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """Returns the collected statistics.
+
+    Returns:
+        dict: {"counters": {name: count},
+               "timers": {name: {"calls": calls, "seconds": seconds}}}.
+    """
+    return {"counters": dict(sorted(_counters.items())),
+            "timers": {name: {"calls": _calls[name],
+                              "seconds": _seconds[name]}
+                       for name in sorted(_seconds)}}
+
+
+def dump(path, stats=None):
+    """Writes statistics as JSON.
+
+    Args:
+        path (str): The output file.
+        stats (dict, optional): Statistics to write (default is the current
+                                `snapshot()`).
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot() if stats is None else stats, file, indent=2)
+
+
+class Profile:
+    """Context manager profiling a block of code.
+
+    The block is profiled on an empty registry, so `stats` holds only its
+    statistics. On exit the statistics collected before the block are
+    restored with the block's added to them, and the previous enabled state
+    is restored.
+
+    Attributes:
+        stats (dict): The `snapshot()` of the block taken on exit.
+    """
+
+    def __init__(self):
+        self.stats = None
+        self._previous = False
+        self._saved = None
+
+    def __enter__(self):
+        self._previous = Enabled
+        self._saved = (_counters.copy(), _seconds.copy(), _calls.copy())
+        reset()
+        enable()
+        return self
+
+    def __exit__(self, *args):
+        self.stats = snapshot()
+        counters, seconds, calls = self._saved
+        _counters.update(counters)
+        for name, value in seconds.items():
+            _seconds[name] += value
+        _calls.update(calls)
+        self._saved = None
+        if not self._previous:
+            disable()
+
+    def dump(self, path):
+        """Writes the statistics of the block as JSON.
+
+        Args:
+            path (str): The output file.
+        """
+        dump(path, self.stats)
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import circuit.batch as qbatch
+import circuit.cache as qcache
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+
+
+def variant(tail, cols=6):
+    """Shared four-column prefix followed by a variant tail gate."""
+    circuit = qc.QuantumCircuit(qb.Qubit(3, 0), cols)
+    circuit.add_gate(0, 0, qg.H(3, 0))
+    circuit.add_gate(1, 1, qg.X(3, 1, 0))
+    circuit.add_gate(2, 2, qg.RY(3, 2, theta=0.3))
+    circuit.add_gate(0, 3, qg.T(3, 0))
+    if tail is not None:
+        gate, row = tail
+        circuit.add_gate(row, 4, gate)
+        circuit.add_gate(2, 5, qg.H(3, 2))
+    return circuit
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.circuits = [variant((qg.X(3, 0), 0)), variant((qg.Y(3, 1), 1)),
+                         variant((qg.Z(3, 2, 0), 2)), variant(None),
+                         variant((qg.X(3, 0), 0))]
+
+    def check(self, result, per_column):
+        for circuit, states in zip(self.circuits, result.states):
+            expected = circuit.calculate_qubit_state()
+            if not per_column:
+                self.assertTrue(np.allclose(states.mat, expected[-1].mat))
+                continue
+            self.assertEqual(len(states), len(expected))
+            for state, reference in zip(states, expected):
+                self.assertTrue(np.allclose(state.mat, reference.mat))
+
+    def test_shares_prefixes(self):
+        result = qbatch.simulate(self.circuits)
+        self.check(result, False)
+        self.assertEqual(result.total_columns, 30)
+        # four prefix columns plus two tail columns per distinct variant
+        self.assertEqual(result.simulated_columns, 4 + 3 * 2)
+        self.assertEqual(result.recomputed_columns, 0)
+
+    def test_per_column(self):
+        result = qbatch.simulate(self.circuits, per_column=True)
+        self.check(result, True)
+        self.assertIs(result.states[0][2], result.states[1][2])
+        with self.assertRaises(ValueError):
+            qbatch.simulate(self.circuits, per_column=True, memory_limit=1)
+
+    def test_memory_limit(self):
+        result = qbatch.simulate(self.circuits, memory_limit=1)
+        self.check(result, False)
+        self.assertGreater(result.recomputed_columns, 0)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = qcache.ResultCache(os.path.join(directory, "r.sqlite"))
+            results.run(self.circuits[3])
+            result = qbatch.simulate(self.circuits, cache=results)
+            results.close()
+        self.assertEqual(result.cache_hits, 1)
+        self.check(result, False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import circuit.cache as cache
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+
+
+def bell(control_first=True):
+    circuit = qc.QuantumCircuit(qb.Qubit(3, 0), 3)
+    circuit.add_gate(0, 0, qg.H(3, 0))
+    circuit.add_gate(1, 1, qg.X(3, 1, 0))
+    controls = [0, 1] if control_first else [1, 0]
+    circuit.add_gate(2, 2, qg.X(3, 2, controls))
+    return circuit
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "results.sqlite")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_key(self):
+        self.assertEqual(cache.circuit_key(bell()),
+                         cache.circuit_key(bell(False)))
+        other = bell()
+        other.change_qubit_value(1)
+        self.assertNotEqual(cache.circuit_key(bell()),
+                            cache.circuit_key(other))
+        self.assertNotEqual(cache.circuit_key(bell()),
+                            cache.circuit_key(bell(), backend="density"))
+
+    def test_run_hits_after_restart(self):
+        results = cache.ResultCache(self.path)
+        states, entanglement = results.run(bell())
+        results.close()
+
+        results = cache.ResultCache(self.path)
+        cached, cached_entanglement = results.run(bell(False))
+        self.assertEqual(cached_entanglement, entanglement)
+        for state, expected in zip(cached, states):
+            self.assertTrue(np.allclose(state.mat, expected.mat))
+        stats = results.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 0.5)
+        results.close()
+
+    def test_schema_version(self):
+        key = cache.circuit_key(bell())
+        results = cache.ResultCache(self.path)
+        results.run(bell())
+        results.close()
+
+        version = cache.Schema_version
+        try:
+            cache.Schema_version = version + 1
+            self.assertNotEqual(cache.circuit_key(bell()), key)
+            results = cache.ResultCache(self.path)
+            self.assertEqual(results.stats()["entries"], 0)
+            results.close()
+        finally:
+            cache.Schema_version = version
+
+    def test_lru_eviction(self):
+        results = cache.ResultCache(self.path)
+        states = np.random.default_rng(0).normal(size=(2, 256))
+        results.put("a", states, [[set()]] * 2)
+        size = results.stats()["bytes"]
+        results.max_bytes = 2 * size + size // 2
+        results.put("b", states + 1, [[set()]] * 2)
+        results.get("a")
+        results.put("c", states + 2, [[{0, 1}]] * 2)
+        self.assertIsNotNone(results.get("a"))
+        self.assertIsNone(results.get("b"))
+        self.assertEqual(results.get("c").entanglement, [[{0, 1}]] * 2)
+        self.assertEqual(results.stats()["entries"], 2)
+
+        results.max_bytes = 10
+        self.assertFalse(results.put("d", states, [[set()]] * 2))
+        results.clear()
+        self.assertEqual(results.stats()["entries"], 0)
+        results.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+import math
+import unittest
+import numpy as np
 import circuit.quantum_circuit as qc
 import qubit.gates as qg
 import qubit.qubit as qb
@@ -55,3 +58,196 @@ print(f"states:\n{states}")
 for i in range(len(states)):
     print(len(states[i]))
     print(states[i])
+
+
+class TestQuantumCircuit(unittest.TestCase):
+
+    def test_matches_dense_products(self):
+        """Column states agree with stacking dense gate matrices."""
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0b010), 3)
+        circuit.add_gate(0, 0, qg.H(3, 0))
+        circuit.add_gate(2, 0, qg.Y(3, 2))
+        circuit.add_gate(1, 1, qg.X(3, 1, 0))
+        circuit.add_gate(2, 2, qg.RY(3, 2, 1, theta=0.4))
+
+        state = circuit._qubit.mat
+        for col, result in enumerate(circuit.calculate_qubit_state()):
+            column = [gate for gate in (circuit._gate_list[row][col]
+                                        for row in range(3)) if gate]
+            op = column[0]
+            for gate in column[1:]:
+                op = op * gate
+            state = np.dot(op.mat, state)
+            self.assertTrue(np.allclose(result.mat, state))
+
+    def test_final_state(self):
+        """Fusing diagonal gates across columns keeps the output state."""
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0), 5)
+        circuit.add_gate(0, 0, qg.H(3, 0))
+        circuit.add_gate(1, 0, qg.H(3, 1))
+        circuit.add_gate(0, 1, qg.T(3, 0))
+        circuit.add_gate(1, 2, qg.S(3, 1, 0))
+        circuit.add_gate(2, 2, qg.X(3, 2, 1))
+        circuit.add_gate(0, 3, qg.Z(3, 0, [1, 2]))
+        circuit.add_gate(1, 4, qg.Phase(3, 1, theta=0.3))
+        final = circuit.final_state()
+        states = circuit.calculate_qubit_state()
+        self.assertTrue(np.allclose(final.mat, states[-1].mat))
+
+    def test_add_row_keeps_rotation(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(2, 0), 1)
+        circuit.add_gate(0, 0, qg.RX(2, 0, 1, theta=qg.Parameter("a")))
+        circuit.add_circuit_row()
+        gate = circuit._gate_list[0][0]
+        self.assertIsInstance(gate, qg.RX)
+        self.assertEqual(len(gate), 3)
+        self.assertEqual(circuit.parameters, ["a"])
+
+    def test_sweep(self):
+        """A sweep matches evaluating each parameter value on its own."""
+        theta = qg.Parameter("theta")
+        circuit = qc.QuantumCircuit(qb.Qubit(2, 0), 3)
+        circuit.add_gate(0, 0, qg.RY(2, 0, theta=theta))
+        circuit.add_gate(1, 1, qg.X(2, 1, 0))
+        circuit.add_gate(0, 2, qg.Phase(2, 0, theta=qg.Parameter("phi")))
+
+        thetas = np.linspace(0, math.pi, 5)
+        result = circuit.sweep({"theta": thetas, "phi": 0.5})
+        self.assertEqual(len(result), 5)
+        self.assertEqual(result.states.shape, (3, 4, 5))
+        self.assertEqual(result.labels.shape, (5, 3, 2))
+        for point, value in enumerate(thetas):
+            states = circuit.calculate_qubit_state({"theta": value,
+                                                    "phi": 0.5})
+            for col, state in enumerate(states):
+                self.assertTrue(np.allclose(result.states[col, :, point],
+                                            state.mat[:, 0]))
+        # theta = 0 stays |00>; the CNOT entangles every other point
+        self.assertFalse(result.entangled[0].any())
+        self.assertTrue(result.entangled[2, 1:].all())
+        self.assertFalse(result.entangled[:, 0].any())
+
+        with self.assertRaises(ValueError):
+            circuit.sweep({"theta": thetas})
+        with self.assertRaises(ValueError):
+            circuit.sweep({"theta": thetas, "phi": [0.1, 0.2]})
+
+    def test_classical_mode(self):
+        """X/CNOT/Toffoli circuits run on bitstrings and stay separable."""
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0b011), 4)
+        circuit.add_gate(2, 0, qg.X(3, 2, [0, 1]))
+        circuit.add_gate(0, 1, qg.X(3, 0))
+        circuit.add_gate(1, 2, qg.X(3, 1, 2, polarity=0))
+        circuit.add_gate(0, 3, qg.X(3, 0, 2))
+        self.assertTrue(circuit.is_classical())
+
+        inputs = np.arange(8, dtype=np.uint64)
+        outputs = circuit.run_classical(inputs)
+        ops = [circuit._gate_list[row][col].mat
+               for row, col in [(2, 0), (0, 1), (1, 2), (0, 3)]]
+        for value, output in zip(inputs, outputs):
+            state = qb.Qubit(3, int(value)).mat
+            for op in ops:
+                state = np.dot(op, state)
+            self.assertEqual(int(np.argmax(abs(state))), int(output))
+
+        states = circuit.calculate_qubit_state()
+        self.assertEqual([int(np.argmax(abs(s.mat))) for s in states],
+                         list(circuit.run_classical([3], per_column=True)[:, 0]))
+        self.assertEqual(circuit.calculate_entanglement(states),
+                         [[set()]] * 4)
+
+        circuit.add_gate(1, 1, qg.H(3, 1))
+        self.assertFalse(circuit.is_classical())
+        with self.assertRaises(ValueError):
+            circuit.run_classical([0])
+
+    def assert_states(self, circuit):
+        """Cached states agree with a fresh simulation."""
+        fresh = qc.QuantumCircuit(circuit._qubit, circuit._shape[1])
+        fresh._gate_list = circuit._gate_list
+        for state, expected in zip(circuit.calculate_qubit_state(),
+                                   fresh.calculate_qubit_state()):
+            self.assertTrue(np.allclose(state.mat, expected.mat))
+
+    def test_undo_redo(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(2, 0), 4)
+        circuit.add_gate(0, 0, qg.H(2, 0))
+        circuit.add_gate(1, 1, qg.X(2, 1, 0))
+        before = circuit.calculate_qubit_state()
+
+        # last-column edits patch the cached output in place of a re-run
+        circuit.add_gate(0, 3, qg.S(2, 0))
+        self.assertEqual(circuit._valid, 4)
+        self.assertIs(circuit.calculate_qubit_state()[1], before[1])
+        self.assertTrue(circuit.undo())
+        self.assertEqual(circuit._valid, 4)
+        self.assertTrue(np.allclose(circuit.calculate_qubit_state()[3].mat,
+                                    before[3].mat))
+        self.assertTrue(circuit.redo())
+        self.assert_states(circuit)
+
+        # earlier edits reuse the states in front of the edited column
+        circuit.del_gate(1, 1)
+        self.assertEqual(circuit._valid, 1)
+        self.assertIs(circuit.calculate_qubit_state()[0], before[0])
+        self.assert_states(circuit)
+
+        circuit.change_qubit_value(3)
+        circuit.add_circuit_row()
+        self.assertEqual(circuit._shape, (3, 4))
+        self.assert_states(circuit)
+        self.assertTrue(circuit.undo())
+        self.assertEqual(circuit._shape, (2, 4))
+        self.assertTrue(circuit.undo())
+        self.assertTrue(np.allclose(circuit._qubit.mat[:, 0], [1, 0, 0, 0]))
+        self.assertTrue(circuit.undo())
+        self.assertIsInstance(circuit._gate_list[1][1], qg.X)
+        self.assert_states(circuit)
+        while circuit.undo():
+            pass
+        self.assertFalse(any(circuit.gate_sequence()))
+        self.assertTrue(circuit.redo())
+        circuit.add_gate(1, 2, qg.H(2, 1))
+        self.assertFalse(circuit.redo())
+        self.assert_states(circuit)
+
+
+    def test_unitary(self):
+        """The unitary matches dense products and is cached until edited."""
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0), 3)
+        circuit.add_gate(0, 0, qg.H(3, 0))
+        circuit.add_gate(2, 1, qg.X(3, 2, 0))
+        circuit.add_gate(1, 2, qg.RY(3, 1, theta=0.7))
+        expected = np.dot(qg.RY(3, 1, theta=0.7).mat,
+                          np.dot(qg.X(3, 2, 0).mat, qg.H(3, 0).mat))
+        unitary = circuit.unitary()
+        self.assertTrue(np.allclose(unitary, expected))
+        self.assertIs(circuit.unitary(), unitary)
+        circuit.add_gate(1, 0, qg.Z(3, 1))
+        self.assertIsNot(circuit.unitary(), unitary)
+        circuit.undo()
+        self.assertTrue(np.allclose(circuit.unitary(), expected))
+
+    def test_equivalent(self):
+        """Circuits are compared up to a global phase."""
+        theta = 0.9
+        rz = qc.QuantumCircuit(qb.Qubit(2, 0), 2)
+        rz.add_gate(0, 0, qg.H(2, 0))
+        rz.add_gate(1, 1, qg.RZ(2, 1, theta=theta))
+        phase = qc.QuantumCircuit(qb.Qubit(2, 0), 2)
+        phase.add_gate(1, 0, qg.Phase(2, 1, theta=theta))
+        phase.add_gate(0, 1, qg.H(2, 0))
+        self.assertTrue(rz.equivalent(phase))
+        phase.unitary()
+        self.assertTrue(phase.equivalent(rz))
+
+        other = qc.QuantumCircuit(qb.Qubit(2, 0), 2)
+        other.add_gate(0, 0, qg.H(2, 0))
+        other.add_gate(1, 1, qg.RZ(2, 1, theta=-theta))
+        self.assertFalse(rz.equivalent(other))
+        self.assertFalse(rz.equivalent(qc.QuantumCircuit(qb.Qubit(3, 0), 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import numpy as np
+import circuit.quantum_circuit as qc
+import qubit.density as qdm
+import qubit.gates as qg
+import qubit.noise as qn
+import qubit.qubit as qb
+
+
+def bell_circuit(n=2):
+    circuit = qc.QuantumCircuit(qb.Qubit(n, 0), 2)
+    circuit.add_gate(0, 0, qg.H(n, 0))
+    circuit.add_gate(1, 1, qg.X(n, 1, 0))
+    return circuit
+
+
+class TestDensity(unittest.TestCase):
+
+    def test_gates_match_pure_states(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0b010), 4)
+        circuit.add_gate(0, 0, qg.H(3, 0))
+        circuit.add_gate(2, 0, qg.RY(3, 2, theta=0.7))
+        circuit.add_gate(1, 1, qg.X(3, 1, [0, 2], polarity=[1, 0]))
+        circuit.add_gate(2, 2, qg.T(3, 2, 1))
+        circuit.add_gate(0, 3, qg.Swap(3, 0, 2))
+        pure = circuit.calculate_qubit_state()
+        mixed = circuit.calculate_density_matrix()
+        for state, rho in zip(pure, mixed):
+            expected = state.mat @ state.mat.conj().T
+            self.assertTrue(np.allclose(rho.mat, expected))
+            self.assertAlmostEqual(rho.purity(), 1)
+
+    def test_channels(self):
+        rho = qdm.DensityMatrix(qb.Qubit(2, 0b10).mat)
+        rho.apply_channel(qn.amplitude_damping(0.25), 1)
+        self.assertTrue(np.allclose(rho.probabilities(), [.25, 0, .75, 0]))
+
+        plus = qb.Qubit(1, 0)
+        plus.mat = np.full((2, 1), 2**-0.5, dtype=np.complex128)
+        rho = qdm.DensityMatrix(plus.mat)
+        rho.apply_channel(qn.dephasing(0.5), 0)
+        self.assertTrue(np.allclose(rho.mat, np.identity(2) / 2))
+
+        rho = qdm.DensityMatrix(plus.mat)
+        rho.apply_channel(qn.depolarizing(0.75), 0)
+        self.assertTrue(np.allclose(rho.mat, np.identity(2) / 2))
+        self.assertAlmostEqual(np.trace(rho.mat).real, 1)
+
+        with self.assertRaises(ValueError):
+            qn.dephasing(1.5)
+        with self.assertRaises(ValueError):
+            qn.NoiseModel(np.ones((1, 2, 2)))
+
+    def test_blocked_updates(self):
+        """Small blocks and PPT chunks give the same results."""
+        rng = np.random.default_rng(5)
+        n = 4
+        amps = rng.normal(size=(2**n, 1)) + 1j * rng.normal(size=(2**n, 1))
+        rho = qdm.DensityMatrix(amps / np.linalg.norm(amps))
+        kraus = qn.amplitude_damping(0.3)
+        block, chunk = qdm.Channel_block, qdm.Ppt_chunk_bytes
+        try:
+            qdm.Channel_block, qdm.Ppt_chunk_bytes = 4, 16 * 4**n
+            for qubit in range(n):
+                high = np.identity(2**(n - 1 - qubit))
+                low = np.identity(2**qubit)
+                full = [np.kron(np.kron(high, k), low) for k in kraus]
+                expected = sum(k @ rho.mat @ k.conj().T for k in full)
+                rho.apply_channel(kraus, qubit)
+                self.assertTrue(np.allclose(rho.mat, expected))
+            self.assertEqual(qdm.ppt_chunk(n), 1)
+            blocked = rho.entangled()
+        finally:
+            qdm.Channel_block, qdm.Ppt_chunk_bytes = block, chunk
+        self.assertEqual(blocked, rho.entangled())
+
+    def test_ppt_entanglement(self):
+        rho = bell_circuit(3).calculate_density_matrix()[-1]
+        self.assertEqual(rho.entangled(), [{0, 1}])
+        self.assertEqual(rho.entangled(),
+                         bell_circuit(3).calculate_qubit_state()[-1]
+                         .entangled())
+
+        # a Werner state is separable once the Bell fraction drops to 1/3
+        bell = bell_circuit().calculate_density_matrix()[-1].mat
+        for fraction, entangled in [(0.5, [{0, 1}]), (0.3, [set()])]:
+            werner = fraction * bell + (1 - fraction) * np.identity(4) / 4
+            self.assertEqual(qdm.ppt_entanglement(werner), entangled)
+
+    def test_noisy_circuit(self):
+        noise = qn.NoiseModel(qn.depolarizing(0.3))
+        states = bell_circuit().calculate_density_matrix(noise)
+        self.assertLess(states[-1].purity(), 1)
+        self.assertAlmostEqual(np.trace(states[-1].mat).real, 1)
+        self.assertEqual(states[-1].entangled(), [set()])
+        weak = qn.NoiseModel(qn.dephasing(0.01))
+        states = bell_circuit().calculate_density_matrix(weak)
+        self.assertEqual(states[-1].entangled(), [{0, 1}])
+
+
+if __name__ == '__main__':
+    unittest.main()
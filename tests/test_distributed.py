@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+import circuit.quantum_circuit as qc
+import qubit.distributed as qdist
+import qubit.engine as qe
+import qubit.gates as qg
+import qubit.qubit as qb
+
+
+def mixed_gates(n):
+    """Gates hitting global targets, global controls and swaps."""
+    theta = qg.Parameter("t")
+    return [qg.H(n, q) for q in range(n)] + \
+        [qg.X(n, n - 1, 0), qg.RY(n, n - 2, [0, n - 1], theta=theta,
+                                  polarity=[1, 0]),
+         qg.Swap(n, 0, n - 1), qg.T(n, n - 1), qg.Z(n, n - 1, 1),
+         qg.S(n, 0, n - 2, polarity=0), qg.Y(n, n - 1, [0, 1]),
+         qg.Phase(n, 1, n - 1, theta=theta), qg.H(n, n - 2),
+         qg.X(n, 0, [n - 1, n - 2])]
+
+
+class TestDistributed(unittest.TestCase):
+
+    def test_matches_engine(self):
+        n = 4
+        rng = np.random.default_rng(3)
+        state = rng.normal(size=(2**n, 2)) + 1j * rng.normal(size=(2**n, 2))
+        gates = mixed_gates(n)
+        values = {"t": np.array([0.4, 2.1])}
+        expected = qe.apply_gates(state.copy(), gates, values)
+        for workers in (2, 4):
+            with qdist.DistributedState(state, workers) as dist:
+                dist.apply_gates(gates, values)
+                self.assertTrue(np.allclose(dist.mat, expected))
+
+    def test_circuit(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0), 3)
+        circuit.add_gate(2, 0, qg.H(3, 2))
+        circuit.add_gate(0, 1, qg.X(3, 0, 2))
+        circuit.add_gate(1, 2, qg.X(3, 1, 0))
+        state = circuit.calculate_distributed(workers=4)
+        expected = circuit.calculate_qubit_state()[-1]
+        self.assertTrue(np.allclose(state.mat, expected.mat))
+
+    def test_invalid_workers(self):
+        with self.assertRaises(ValueError):
+            qdist.DistributedState(qb.Qubit(2, 0).mat, 3)
+        with self.assertRaises(ValueError):
+            qdist.DistributedState(qb.Qubit(2, 0).mat, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+import numpy as np
+import qubit.engine as qe
+import qubit.gates as qg
+
+
+def random_state(n, batch=1, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.normal(size=(2**n, batch)) +
+            1j * rng.normal(size=(2**n, batch)))
+
+
+class TestEngine(unittest.TestCase):
+
+    def test_matches_dense_gates(self):
+        """Every gate kind agrees with its dense matrix."""
+        n = 4
+        gates = [
+            qg.X(n, 0), qg.Y(n, 3), qg.Z(n, 2), qg.H(n, 1),
+            qg.X(n, 2, 0), qg.Y(n, 0, 3), qg.Z(n, 3, 1), qg.H(n, 1, 2),
+            qg.RX(n, 1, theta=0.3), qg.RY(n, 2, 0, theta=1.1),
+            qg.RZ(n, 0, theta=-0.4), qg.Phase(n, 3, 2, theta=2.0),
+            qg.Swap(n, 1, 3),
+        ]
+        state = random_state(n, batch=3)
+        for gate in gates:
+            expected = np.dot(gate.mat, state)
+            result = qe.apply_gate(state.copy(), gate)
+            self.assertTrue(np.allclose(result, expected), type(gate))
+            undone = qe.apply_gate(result, gate, adjoint=True)
+            self.assertTrue(np.allclose(undone, state), type(gate))
+
+    def test_multi_controlled_gates(self):
+        """Index-mask application matches the dense multi-control matrix."""
+        n = 5
+        gates = [
+            qg.X(n, 0, [1, 2]), qg.Z(n, 4, [0, 1, 3]),
+            qg.H(n, 2, [4, 0], polarity=[0, 1]),
+            qg.Y(n, 1, 3, polarity=0),
+            qg.RY(n, 3, [0, 2, 4], theta=0.8, polarity=[1, 0, 0]),
+        ]
+        state = random_state(n, batch=2, seed=3)
+        for gate in gates:
+            expected = np.dot(gate.mat, state)
+            result = qe.apply_gate(state.copy(), gate)
+            self.assertTrue(np.allclose(result, expected))
+
+    def test_controlled_indices(self):
+        index = qe.controlled_indices(4, 1, (0, 3), (1, 0))
+        expected = [v for v in range(16)
+                    if (v >> 1) & 1 == 0 and v & 1 and not (v >> 3) & 1]
+        self.assertEqual(list(index), expected)
+
+    def test_index_cache_bound(self):
+        qe.clear_index_cache()
+        entry, total = qe.Index_cache_entry_bytes, qe.Index_cache_bytes
+        try:
+            qe.Index_cache_entry_bytes, qe.Index_cache_bytes = 2**10, 2**11
+            first = qe.controlled_indices(8, 0, (1,), (1,))
+            self.assertIs(qe.controlled_indices(8, 0, (1,), (1,)), first)
+            # 2^11 bytes of indices exceed the entry limit and are not kept
+            large = qe.controlled_indices(9, 0, (), ())
+            self.assertIsNot(qe.controlled_indices(9, 0, (), ()), large)
+            for target in range(1, 6):
+                qe.controlled_indices(8, target, (0,), (1,))
+            self.assertLessEqual(qe._index_cache_bytes, 2**11)
+            self.assertNotIn((8, 0, (1,), (1,)), qe._index_cache)
+        finally:
+            qe.Index_cache_entry_bytes, qe.Index_cache_bytes = entry, total
+            qe.clear_index_cache()
+
+    def test_diagonal_gates(self):
+        """Diagonal fast path and fused phase tables match dense products."""
+        n = 4
+        gates = [
+            qg.Z(n, 0), qg.S(n, 2, 1), qg.T(n, 3, [0, 1], polarity=[0, 1]),
+            qg.RZ(n, 1, theta=0.9), qg.Phase(n, 0, 3, theta=-1.7),
+            qg.Z(n, 2, [0, 3]),
+        ]
+        state = random_state(n, batch=2, seed=4)
+        expected = state.copy()
+        for gate in gates:
+            self.assertIsInstance(gate, qg.Diagonal)
+            single = qe.apply_gate(expected.copy(), gate)
+            expected = np.dot(gate.mat, expected)
+            self.assertTrue(np.allclose(single, expected))
+        fused = qe.apply_gates(state.copy(), gates)
+        self.assertTrue(np.allclose(fused, expected))
+
+    def test_mixed_sequence(self):
+        """Diagonal runs are fused between non-diagonal gates."""
+        n = 3
+        theta = qg.Parameter("t")
+        gates = [qg.H(n, 0), qg.T(n, 0), qg.Phase(n, 1, 0, theta=theta),
+                 qg.X(n, 2, 1), qg.S(n, 2), qg.Z(n, 0, 2), qg.H(n, 1)]
+        values = {"t": np.array([0.2, 1.4])}
+        state = random_state(n, batch=2, seed=5)
+        result = qe.apply_gates(state.copy(), gates, values)
+        for col in range(2):
+            expected = state[:, col]
+            for gate in gates:
+                bound = gate.bind({"t": values["t"][col]}) \
+                    if gate.parameters else gate
+                expected = np.dot(bound.mat, expected)
+            self.assertTrue(np.allclose(result[:, col], expected))
+
+    def test_batched_parameters(self):
+        """A parameter batch applies one matrix per state column."""
+        theta = qg.Parameter("t")
+        gate = qg.RX(3, 1, 2, theta=theta)
+        values = np.array([0.1, 0.5, 2.0])
+        state = random_state(3, batch=3)
+        result = qe.apply_gate(state.copy(), gate, {"t": values})
+        for col, value in enumerate(values):
+            bound = gate.bind({"t": value})
+            self.assertTrue(np.allclose(result[:, col],
+                                        np.dot(bound.mat, state[:, col])))
+
+    def test_requires_contiguous_state(self):
+        state = random_state(2, batch=2)
+        with self.assertRaises(ValueError):
+            qe.apply_gate(state.T, qg.X(2, 0))
+
+
+
+class TestThreadedEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.threads = qe.get_threads()
+        self.threshold = qe.Parallel_threshold
+        qe.Parallel_threshold = 1
+
+    def tearDown(self):
+        qe.set_threads(self.threads)
+        qe.Parallel_threshold = self.threshold
+
+    def run_both(self, n, gates, values=None, batch=2, count=4):
+        """Applies gates serially and with `count` threads."""
+        state = random_state(n, batch=batch, seed=7)
+        qe.set_threads(1)
+        serial = qe.apply_gates(state.copy(), gates, values)
+        qe.set_threads(count)
+        threaded = qe.apply_gates(state.copy(), gates, values)
+        return serial, threaded
+
+    def test_matches_serial(self):
+        """Blocks over low and high targets give the serial result."""
+        n = 5
+        theta = qg.Parameter("t")
+        gates = [qg.H(n, q) for q in range(n)] + \
+            [qg.X(n, 4, 0), qg.RY(n, 0, [3, 4], theta=theta,
+                                  polarity=[1, 0]),
+             qg.Swap(n, 1, 4), qg.T(n, 4), qg.S(n, 0),
+             qg.Phase(n, 2, 4, theta=theta), qg.Z(n, 3, [0, 1]),
+             qg.Y(n, 2)]
+        values = {"t": np.array([0.3, 1.7])}
+        for count in (2, 3, 4, 64):
+            serial, threaded = self.run_both(n, gates, values, count=count)
+            self.assertTrue(np.allclose(serial, threaded))
+
+    def test_single_diagonal(self):
+        """Single diagonal gates use the threaded phase kernel."""
+        n = 4
+        gates = [qg.T(n, 3), qg.Z(n, 0, 2, 0), qg.S(n, 1)]
+        serial, threaded = self.run_both(n, gates, batch=1)
+        self.assertTrue(np.allclose(serial, threaded))
+
+    def test_invalid_thread_count(self):
+        with self.assertRaises(ValueError):
+            qe.set_threads(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
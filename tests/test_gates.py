@@ -99,6 +99,124 @@ class TestQuantumGates(unittest.TestCase):
                                 dtype=np.complex128) / math.sqrt(2)
         self.assertTrue(np.allclose(result.mat, expected.mat))
 
+    def test_rotation_gates(self):
+        theta = 0.7
+        c, s = math.cos(theta / 2), math.sin(theta / 2)
+        self.assertTrue(np.allclose(qg.RX(1, 0, theta=theta).mat,
+                                    [[c, -1j * s], [-1j * s, c]]))
+        self.assertTrue(np.allclose(qg.RY(1, 0, theta=theta).mat,
+                                    [[c, -s], [s, c]]))
+        self.assertTrue(np.allclose(
+            qg.RZ(1, 0, theta=theta).mat,
+            np.diag([np.exp(-0.5j * theta), np.exp(0.5j * theta)])))
+        self.assertTrue(np.allclose(qg.Phase(1, 0, theta=math.pi).mat,
+                                    qg.Z(1, 0).mat))
+        # controlled RX(pi) applies -iX where qubit 0 is |1>
+        expected = np.array([[1, 0, 0, 0], [0, 0, 0, -1j], [0, 0, 1, 0],
+                             [0, -1j, 0, 0]])
+        self.assertTrue(np.allclose(qg.RX(2, 1, 0, theta=math.pi).mat,
+                                    expected))
+
+    def test_incomplete_rotation(self):
+        class Partial(qg.Rotation):
+            def rotation_matrix(self, theta):
+                return qg.RX.rotation_matrix(self, theta)
+
+        with self.assertRaises(TypeError):
+            qg.Rotation(1, 0, theta=0.1)
+        with self.assertRaises(TypeError):
+            Partial(1, 0, theta=0.1)
+
+    def test_parameterized_gate(self):
+        theta = qg.Parameter("theta")
+        gate = qg.RY(2, 0, theta=theta)
+        self.assertEqual(gate.parameters, {"theta"})
+        with self.assertRaises(ValueError):
+            gate.mat
+        with self.assertRaises(ValueError):
+            gate.base_matrix({})
+        bound = gate.bind({"theta": 0.3})
+        self.assertTrue(np.allclose(bound.mat, qg.RY(2, 0, theta=0.3).mat))
+        batch = gate.base_matrix({theta: np.array([0.0, math.pi])})
+        self.assertEqual(batch.shape, (2, 2, 2))
+        self.assertTrue(np.allclose(batch[1], [[0, -1], [1, 0]]))
+
+    def test_resized(self):
+        gate = qg.H(2, 0, 1).resized(3)
+        self.assertTrue(np.allclose(gate.mat, qg.H(3, 0, 1).mat))
+        with self.assertRaises(ValueError):
+            qg.X(3, 2).resized(2)
+
+    def test_phase_gates(self):
+        s_gate = qg.S(1, 0)
+        t_gate = qg.T(1, 0)
+        self.assertTrue(np.allclose((t_gate * t_gate).mat, s_gate.mat))
+        self.assertTrue(np.allclose((s_gate * s_gate).mat, qg.Z(1, 0).mat))
+        d0, d1 = qg.Z(2, 0, 1).diagonal()
+        self.assertEqual((d0, d1), (1, -1))
+
+    def test_toffoli_gate(self):
+        ccx = qg.X(3, 0, [1, 2])
+        for v in range(8):
+            expected = v ^ 1 if v & 0b110 == 0b110 else v
+            result = ccx * qb.Qubit(3, v)
+            self.assertTrue(np.allclose(result.mat, qb.Qubit(3, expected).mat))
+
+    def test_negative_control(self):
+        # flips qubit 0 when qubit 1 is |1> and qubit 2 is |0>
+        gate = qg.X(3, 0, [1, 2], polarity=[1, 0])
+        self.assertEqual(gate.controls, (1, 2))
+        self.assertEqual(gate.polarity, (1, 0))
+        result = gate * qb.Qubit(3, 0b010)
+        self.assertTrue(np.allclose(result.mat, qb.Qubit(3, 0b011).mat))
+        result = gate * qb.Qubit(3, 0b110)
+        self.assertTrue(np.allclose(result.mat, qb.Qubit(3, 0b110).mat))
+
+    def test_invalid_controls(self):
+        with self.assertRaises(ValueError):
+            qg.X(3, 0, [0, 1])
+        with self.assertRaises(ValueError):
+            qg.X(3, 0, [1, 3])
+        with self.assertRaises(ValueError):
+            qg.Z(3, 0, [1, 2], polarity=[1])
+
+
+    def test_lazy_operator(self):
+        """Products keep their factors and only densify on `.mat`."""
+        n = 3
+        op = qg.H(n, 0) * qg.X(n, 1, 0) @ qg.RY(n, 2, theta=0.3)
+        self.assertIsInstance(op, qg.Operator)
+        self.assertIsNone(op._mat)
+        self.assertEqual(len(op.factors), 3)
+        self.assertIsInstance(op.factors[0], qg.RY)
+        expected = np.dot(qg.H(n, 0).mat, np.dot(qg.X(n, 1, 0).mat,
+                                                 qg.RY(n, 2, theta=0.3).mat))
+        qubit = qb.Qubit(n, 0b100)
+        self.assertTrue(np.allclose((op * qubit).mat,
+                                    np.dot(expected, qubit.mat)))
+        self.assertIsNone(op._mat)
+        self.assertTrue(np.allclose(op.mat, expected))
+
+    def test_large_register(self):
+        """Gates on many qubits apply without forming 2^n x 2^n matrices."""
+        n = 22
+        op = qg.X(n, n - 1, 0) * qg.H(n, 0)
+        result = op * qb.Qubit(n, 0)
+        self.assertAlmostEqual(abs(result.mat[0, 0])**2, 0.5)
+        self.assertAlmostEqual(abs(result.mat[2**(n - 1) + 1, 0])**2, 0.5)
+
+    def test_dense_factors(self):
+        """Dense factors act on named qubits, bit i on qubits[i]."""
+        cnot = qg.X(2, 1, 0).mat
+        op = qg.Operator(3, [(cnot, (2, 0))])
+        self.assertTrue(np.allclose(op.mat, qg.X(3, 0, 2).mat))
+        dense = qg.Base()
+        dense.mat = qg.Swap(2, 0, 1).mat
+        self.assertTrue(np.allclose((dense * qg.X(2, 0)).mat,
+                                    qg.X(2, 1).mat @ dense.mat))
+        with self.assertRaises(ValueError):
+            qg.X(2, 0) * qb.Qubit(3, 0)
+
 
 if __name__ == '__main__':
     unittest.main()
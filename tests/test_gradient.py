@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+import circuit.gradient as cg
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+
+
+def build_circuit():
+    a, b, c = qg.Parameter("a"), qg.Parameter("b"), qg.Parameter("c")
+    circuit = qc.QuantumCircuit(qb.Qubit(3, 0), 4)
+    circuit.add_gate(0, 0, qg.RY(3, 0, theta=a))
+    circuit.add_gate(1, 0, qg.H(3, 1))
+    circuit.add_gate(2, 1, qg.RX(3, 2, 0, theta=b))
+    circuit.add_gate(1, 2, qg.RZ(3, 1, theta=a))
+    circuit.add_gate(0, 3, qg.Phase(3, 0, 1, theta=c))
+    circuit.add_gate(2, 3, qg.RY(3, 2, theta=0.3))
+    return circuit
+
+
+def expectation(circuit, observable, values):
+    state = circuit.calculate_qubit_state(values)[-1]
+    return sum(coefficient * state.expectation(pauli)
+               for pauli, coefficient in observable.items())
+
+
+class TestAdjointGradient(unittest.TestCase):
+
+    def test_against_finite_differences(self):
+        circuit = build_circuit()
+        observable = {"ZZI": 0.5, "XIY": -1.2, "IXX": 0.7, "ZIZ": 1.0}
+        values = {"a": 0.4, "b": -1.3, "c": 2.2}
+
+        result = cg.adjoint_gradient(circuit, observable, values)
+        self.assertAlmostEqual(result.value,
+                               expectation(circuit, observable, values))
+        eps = 1e-6
+        for name in values:
+            shifted = dict(values)
+            shifted[name] += eps
+            upper = expectation(circuit, observable, shifted)
+            shifted[name] -= 2 * eps
+            lower = expectation(circuit, observable, shifted)
+            self.assertAlmostEqual(result.gradients[name],
+                                   (upper - lower) / (2 * eps), places=6)
+        self.assertGreaterEqual(result.forward_time, 0)
+        self.assertGreaterEqual(result.backward_time, 0)
+
+    def test_single_string_observable(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(1, 0), 1)
+        circuit.add_gate(0, 0, qg.RX(1, 0, theta=qg.Parameter("t")))
+        # <Z> = cos(t), d<Z>/dt = -sin(t)
+        result = cg.adjoint_gradient(circuit, "Z", {"t": 0.9})
+        self.assertAlmostEqual(result.value, np.cos(0.9))
+        self.assertAlmostEqual(result.gradients["t"], -np.sin(0.9))
+
+    def test_missing_parameter(self):
+        with self.assertRaises(ValueError):
+            cg.adjoint_gradient(build_circuit(), "ZZZ", {"a": 0.1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+import qubit.engine as qe
+import qubit.entanglment as qent
+import qubit.gates as qg
+import qubit.kernels as qk
+
+
+def random_state(n, batch=1, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.normal(size=(2**n, batch)) +
+            1j * rng.normal(size=(2**n, batch)))
+
+
+class TestKernels(unittest.TestCase):
+    """Cross-checks the kernels against the NumPy reference path.
+
+    Without Numba the kernels run as plain Python, so the same checks
+    cover the compiled and the uncompiled kernels.
+    """
+
+    def setUp(self):
+        self.backend = qk._backend
+
+    def tearDown(self):
+        qk._backend = self.backend
+
+    def run_both(self, gates, state, values=None):
+        qk._backend = "numpy"
+        expected = qe.apply_gates(state.copy(), gates, values)
+        qk._backend = "numba"
+        result = qe.apply_gates(state.copy(), gates, values)
+        return expected, result
+
+    def test_gates(self):
+        n = 4
+        theta = qg.Parameter("t")
+        gates = [qg.H(n, 0), qg.X(n, 3, [0, 1], polarity=[1, 0]),
+                 qg.RY(n, 2, 3, theta=theta), qg.Y(n, 1), qg.T(n, 3),
+                 qg.Z(n, 0, 2, polarity=0), qg.Phase(n, 1, theta=theta),
+                 qg.Swap(n, 0, 3), qg.S(n, 2), qg.H(n, 3, [0, 1, 2])]
+        values = {"t": np.array([0.5, 1.5, -2.0])}
+        expected, result = self.run_both(gates, random_state(n, 3), values)
+        self.assertTrue(np.allclose(expected, result))
+
+    def test_single_column(self):
+        n = 3
+        gates = [qg.RX(n, q, theta=0.3 * (q + 1)) for q in range(n)] + \
+            [qg.T(n, 1, 0), qg.X(n, 0, 2)]
+        expected, result = self.run_both(gates, random_state(n, seed=4))
+        self.assertTrue(np.allclose(expected, result))
+
+    def test_proportional(self):
+        a = np.array([1, 2j, 0, -1], dtype=np.complex128)
+        cases = [(a, 0.5j * a), (a, a[::-1]), (a, np.array([0, 0, 0, 1e-3])),
+                 (np.array([1, 0, 0, 2]), np.array([2, 0, 0, 4])),
+                 (np.array([1, 0]), np.array([0, 0])),
+                 # leading zeros: the ratio comes from the first non-zero pair
+                 (np.array([0, 1j, 2]), np.array([0, 2j, 4])),
+                 (np.array([0, 1, 2]), np.array([0, 1, 3]))]
+        for list1, list2 in cases:
+            qk._backend = "numpy"
+            expected = qent.proportional((list(list1), list(list2)))
+            qk._backend = "numba"
+            self.assertEqual(qent.proportional((list(list1), list(list2))),
+                             expected)
+
+    def test_backend(self):
+        self.assertIn(qk.backend(), ("numba", "numpy"))
+        qk.set_backend("numpy")
+        self.assertFalse(qk.enabled())
+        with self.assertRaises(ValueError):
+            qk.set_backend("cuda")
+        if qk.numba is None:
+            with self.assertRaises(ValueError):
+                qk.set_backend("numba")
+
+
+if __name__ == '__main__':
+    unittest.main()
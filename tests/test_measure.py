@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.measure as qm
+import qubit.qubit as qb
+
+
+class TestMeasure(unittest.TestCase):
+
+    def test_marginal_probabilities(self):
+        """Marginals follow the qubit order given by the caller."""
+        qubit = qb.Qubit(3)
+        # |001> and |110> with probabilities 1/4 and 3/4
+        qubit.mat = np.array([[0], [0.5], [0], [0], [0], [0], [0.75**0.5],
+                              [0]], dtype=np.complex128)
+        full = qm.marginal_probabilities(qubit.mat)
+        self.assertTrue(np.allclose(full[:, 0], [0, .25, 0, 0, 0, 0, .75, 0]))
+
+        # outcome bit 0 is qubit 2, bit 1 is qubit 0
+        part = qm.marginal_probabilities(qubit.mat, [2, 0])
+        self.assertTrue(np.allclose(part[:, 0], [0, .75, .25, 0]))
+
+        with self.assertRaises(ValueError):
+            qm.marginal_probabilities(qubit.mat, [0, 0])
+        with self.assertRaises(ValueError):
+            qm.marginal_probabilities(qubit.mat, [3])
+
+    def test_sample_basis_state(self):
+        """A basis state always yields the same outcome."""
+        qubit = qb.Qubit(3, 0b101)
+        self.assertEqual(qubit.sample(1000), {"101": 1000})
+        self.assertEqual(qubit.sample(10, qubits=[1, 2]), {"10": 10})
+
+    def test_sample_circuit_state(self):
+        """Bell state out of a circuit gives correlated outcomes."""
+        circuit = qc.QuantumCircuit(qb.Qubit(2, 0), 2)
+        circuit.add_gate(0, 0, qg.H(2, 0))
+        circuit.add_gate(1, 1, qg.X(2, 1, 0))
+        state = circuit.calculate_qubit_state()[-1]
+
+        counts = state.sample(200000, seed=7)
+        self.assertEqual(set(counts), {"00", "11"})
+        self.assertEqual(sum(counts.values()), 200000)
+        self.assertAlmostEqual(counts["00"] / 200000, 0.5, delta=0.01)
+        self.assertEqual(state.sample(100, seed=3), state.sample(100, seed=3))
+
+    def test_sample_batch(self):
+        """Each state of a batch is sampled independently."""
+        batch = np.zeros((4, 3), dtype=np.complex128)
+        batch[0, 0] = 1
+        batch[3, 1] = 1
+        batch[1, 2] = batch[2, 2] = 2**-0.5
+        counts = qm.sample_counts(batch, 5000, seed=1)
+        self.assertEqual(counts.shape, (4, 3))
+        self.assertTrue(np.array_equal(counts[:, 0], [5000, 0, 0, 0]))
+        self.assertTrue(np.array_equal(counts[:, 1], [0, 0, 0, 5000]))
+        self.assertEqual(counts[0, 2] + counts[3, 2], 0)
+        self.assertEqual(counts[:, 2].sum(), 5000)
+
+    def test_zero_state(self):
+        """Sampling a zero vector is an error."""
+        with self.assertRaises(ValueError):
+            qm.sample_counts(np.zeros((2, 1)), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
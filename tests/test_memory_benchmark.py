@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import util.memory_benchmark as mb
+
+
+class TestMemoryBenchmark(unittest.TestCase):
+
+    def test_measure(self):
+        result, peak, _ = mb.measure(lambda size: np.ones(size).sum(), 2**16)
+        self.assertEqual(result, 2**16)
+        self.assertGreaterEqual(peak, 8 * 2**16)
+
+    def test_flags_dense_growth(self):
+        """Allocating 4^n is flagged, allocating 2^n is not."""
+        scenarios = {"vector": lambda n: np.zeros(2**n, dtype=np.complex128),
+                     "matrix": lambda n: np.zeros((2**n, 2**n),
+                                                  dtype=np.complex128)}
+        result = mb.run(list(range(6, 11)), scenarios)
+        self.assertFalse(result["scenarios"]["vector"]["flagged"])
+        self.assertTrue(result["scenarios"]["matrix"]["flagged"])
+        self.assertAlmostEqual(result["scenarios"]["matrix"]["exponent"], 2,
+                               delta=0.1)
+
+    def test_scenarios(self):
+        result = mb.run([3, 4, 5])
+        self.assertEqual(set(result["scenarios"]), set(mb.Scenarios))
+        for stats in result["scenarios"].values():
+            self.assertEqual(len(stats["tracemalloc"]), 3)
+
+    def test_baseline(self):
+        result = {"n": [4, 5], "scenarios": {
+            "a": {"tracemalloc": [100, 200], "rss": [None, None],
+                  "exponent": 1.0, "flagged": False}}}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            mb.save(result, path)
+            baseline = mb.load(path)
+        self.assertEqual(baseline, result)
+        self.assertEqual(mb.compare(result, baseline), [])
+        result["scenarios"]["a"]["tracemalloc"] = [110, 300]
+        self.assertEqual(mb.compare(result, baseline), [("a", 5, 200, 300)])
+
+
+if __name__ == '__main__':
+    unittest.main()
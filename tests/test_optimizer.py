@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+import circuit.optimizer as qopt
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+
+
+class TestOptimizer(unittest.TestCase):
+
+    def test_commutes(self):
+        self.assertTrue(qopt.commutes(qg.X(3, 0), qg.H(3, 1)))
+        self.assertTrue(qopt.commutes(qg.Z(3, 0, 1), qg.T(3, 1)))
+        self.assertTrue(qopt.commutes(qg.X(3, 1, 0), qg.Z(3, 0)))
+        self.assertTrue(qopt.commutes(qg.X(3, 2, 0), qg.X(3, 2, 1)))
+        self.assertFalse(qopt.commutes(qg.X(3, 1, 0), qg.Z(3, 1)))
+        self.assertFalse(qopt.commutes(qg.X(3, 1, 0), qg.H(3, 0)))
+        self.assertFalse(qopt.commutes(qg.Swap(3, 0, 1), qg.Swap(3, 1, 2)))
+
+    def test_cancels(self):
+        self.assertTrue(qopt.cancels(qg.H(2, 0), qg.H(2, 0)))
+        self.assertTrue(qopt.cancels(qg.X(3, 2, [0, 1]), qg.X(3, 2, [1, 0])))
+        self.assertTrue(qopt.cancels(qg.Swap(2, 0, 1), qg.Swap(2, 1, 0)))
+        self.assertFalse(qopt.cancels(qg.X(2, 1, 0), qg.X(2, 1, 0, 0)))
+        self.assertFalse(qopt.cancels(qg.S(2, 0), qg.S(2, 0)))
+        self.assertFalse(qopt.cancels(qg.RX(2, 0, theta=1.), qg.RX(2, 0, theta=1.)))
+
+    def test_cancel_through_commuting_gates(self):
+        """CNOT pairs cancel across a Z on their control."""
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0), 5)
+        circuit.add_gate(0, 0, qg.H(3, 0))
+        circuit.add_gate(1, 1, qg.X(3, 1, 0))
+        circuit.add_gate(0, 2, qg.Z(3, 0))
+        circuit.add_gate(2, 2, qg.H(3, 2))
+        circuit.add_gate(1, 3, qg.X(3, 1, 0))
+        circuit.add_gate(2, 4, qg.H(3, 2))
+        result = circuit.optimize()
+        self.assertEqual(result.removed, 4)
+        self.assertEqual([gate.signature()[0] for _, gate in result.gates],
+                         ["H", "Z"])
+        self.assertEqual(result.identity_columns, [])
+
+        states = circuit.calculate_qubit_state(optimize=True)
+        reference = circuit.calculate_qubit_state()
+        for state, expected in zip(states, reference):
+            self.assertTrue(np.allclose(state.mat, expected.mat))
+        self.assertTrue(np.allclose(circuit.final_state().mat,
+                                    reference[-1].mat))
+
+    def test_identity_columns_share_states(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(2, 1), 4)
+        circuit.add_gate(0, 0, qg.H(2, 0))
+        circuit.add_gate(1, 1, qg.X(2, 1))
+        circuit.add_gate(1, 2, qg.X(2, 1))
+        result = circuit.optimize()
+        self.assertEqual(result.identity_columns, [3])
+        self.assertEqual(result.same_as, [None, None, 0, 0])
+
+        states = circuit.calculate_qubit_state(optimize=True)
+        self.assertIs(states[2], states[0])
+        self.assertIs(states[3], states[0])
+        reference = circuit.calculate_qubit_state()
+        for state, expected in zip(states, reference):
+            self.assertTrue(np.allclose(state.mat, expected.mat))
+
+    def test_parameterized(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(2, 0), 3)
+        circuit.add_gate(0, 0, qg.RY(2, 0, theta=qg.Parameter("a")))
+        circuit.add_gate(1, 0, qg.H(2, 1))
+        circuit.add_gate(0, 1, qg.RX(2, 0, 1, theta=0.3))
+        circuit.add_gate(1, 2, qg.H(2, 1))
+        states = circuit.calculate_qubit_state({"a": 0.7}, optimize=True)
+        reference = circuit.calculate_qubit_state({"a": 0.7})
+        for state, expected in zip(states, reference):
+            self.assertTrue(np.allclose(state.mat, expected.mat))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import itertools
+import numpy as np
+import qubit.gates as qg
+import qubit.pauli as qp
+import qubit.qubit as qb
+
+
+def dense_expectation(mat, pauli):
+    """Reference value built from dense gate matrices."""
+    n = len(pauli)
+    op = np.identity(2**n, dtype=np.complex128)
+    gates = {"X": qg.X, "Y": qg.Y, "Z": qg.Z}
+    for i, char in enumerate(pauli):
+        if char != "I":
+            op = np.dot(gates[char](n, n - 1 - i).mat, op)
+    return np.vdot(mat, np.dot(op, mat)).real
+
+
+class TestPauli(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        vec = rng.normal(size=(8, 1)) + 1j * rng.normal(size=(8, 1))
+        self.qubit = qb.Qubit(3)
+        self.qubit.mat = vec / np.linalg.norm(vec)
+
+    def test_parse(self):
+        self.assertEqual(qp.parse("XZIY", 4), (0b1001, 0b0101, 1))
+        with self.assertRaises(ValueError):
+            qp.parse("XZ", 3)
+        with self.assertRaises(ValueError):
+            qp.parse("XQZ", 3)
+
+    def test_basis_states(self):
+        qubit = qb.Qubit(2, 0b01)  # qubit 0 is |1>
+        self.assertAlmostEqual(qubit.expectation("IZ"), -1)
+        self.assertAlmostEqual(qubit.expectation("ZI"), 1)
+        self.assertAlmostEqual(qubit.expectation("XI"), 0)
+
+    def test_against_dense_gates(self):
+        """All 64 strings on 3 qubits match the dense gate matrices."""
+        paulis = ["".join(p) for p in itertools.product("IXYZ", repeat=3)]
+        values = self.qubit.expectation(paulis)
+        for pauli, value in zip(paulis, values):
+            self.assertAlmostEqual(value,
+                                   dense_expectation(self.qubit.mat, pauli))
+
+    def test_small_groups(self):
+        """Groups below the transform threshold give the same result."""
+        paulis = ["XYZ", "YXI", "ZZZ"]
+        values = self.qubit.expectation(paulis)
+        for pauli, value in zip(paulis, values):
+            self.assertAlmostEqual(value,
+                                   dense_expectation(self.qubit.mat, pauli))
+
+    def test_batch(self):
+        batch = np.zeros((4, 2), dtype=np.complex128)
+        batch[0, 0] = 1
+        batch[0, 1] = batch[3, 1] = 2**-0.5  # Bell state
+        values = qp.expectation(batch, ["ZZ", "XX", "ZI"])
+        self.assertTrue(np.allclose(values, [[1, 1], [0, 1], [1, 0]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
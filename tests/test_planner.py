@@ -0,0 +1,98 @@
+import unittest
+import circuit.planner as planner
+import circuit.quantum_circuit as qc
+import qubit.density as qdm
+import qubit.gates as qg
+import qubit.qubit as qb
+
+
+def bell_circuit(n=3):
+    circuit = qc.QuantumCircuit(qb.Qubit(n, 0), 3)
+    circuit.add_gate(0, 0, qg.H(n, 0))
+    circuit.add_gate(1, 1, qg.X(n, 1, 0))
+    return circuit
+
+
+class TestPlanner(unittest.TestCase):
+
+    def test_features(self):
+        circuit = bell_circuit()
+        circuit.add_gate(2, 2, qg.X(3, 2, [0, 1]))
+        info = planner.features(circuit)
+        self.assertEqual(info["n"], 3)
+        self.assertEqual(info["gates"], 3)
+        self.assertEqual(info["busy_columns"], 3)
+        self.assertEqual(info["kinds"], {"H": 1, "X": 2})
+        self.assertEqual(info["max_controls"], 2)
+        self.assertEqual(info["edges"], [(0, 1), (0, 2), (1, 2)])
+        self.assertEqual(info["components"], [{0, 1, 2}])
+        self.assertFalse(info["clifford"])
+        self.assertFalse(info["classical"])
+        self.assertEqual(info["depth"], 3)
+
+        info = planner.features(bell_circuit())
+        self.assertTrue(info["clifford"])
+        self.assertEqual(info["components"], [{0, 1}, {2}])
+
+    def test_classical_plan(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0b001), 2)
+        circuit.add_gate(1, 0, qg.X(3, 1, 0))
+        circuit.add_gate(2, 1, qg.X(3, 2, [0, 1]))
+        self.assertEqual(planner.plan(circuit).choice.strategy, "classical")
+
+    def test_budget(self):
+        circuit = bell_circuit()
+        plan = planner.plan(circuit)
+        self.assertEqual(plan.choice.strategy, "statevector")
+        self.assertTrue(plan.fits)
+
+        small = planner.plan(circuit, memory_budget=plan.choice.memory - 1)
+        self.assertNotEqual(small.choice, plan.choice)
+        self.assertFalse(planner.plan(circuit, memory_budget=16).fits)
+
+        final = planner.plan(circuit, per_column=False)
+        self.assertIn(final.choice.strategy, ("final_state", "distributed"))
+
+        # one more qubit doubles the state vectors
+        bigger = planner.plan(circuit, extra_qubits=1)
+        self.assertGreater(bigger.choice.memory, plan.choice.memory)
+
+    def test_time_budget(self):
+        circuit = bell_circuit()
+        plan = planner.plan(circuit)
+        self.assertIsNone(plan.limit)
+        slow = planner.plan(circuit, time_budget=plan.choice.seconds / 2)
+        self.assertFalse(slow.fits)
+        self.assertEqual(slow.limit, "time")
+        self.assertEqual(slow.min_seconds, plan.choice.seconds)
+        self.assertEqual(planner.plan(circuit, memory_budget=16).limit,
+                         "memory")
+
+        large = qc.QuantumCircuit(qb.Qubit(22, 0), 10)
+        large.add_gate(0, 0, qg.H(22, 0))
+        self.assertEqual(planner.plan(large, time_budget=30).limit, "time")
+
+    def test_noise(self):
+        plan = planner.plan(bell_circuit(), noise=True)
+        self.assertEqual(plan.choice.strategy, "density_matrix")
+        large = qc.QuantumCircuit(qb.Qubit(20, 0), 1)
+        self.assertFalse(planner.plan(large, noise=True).fits)
+        # noiseless runs never pick the density matrix
+        self.assertNotIn("density_matrix",
+                         [e.strategy for e in
+                          planner.plan(bell_circuit()).estimates
+                          if e.available])
+
+        # PPT cuts are diagonalized in chunks, not all 252 cuts at once
+        ten = qc.QuantumCircuit(qb.Qubit(10, 0), 1)
+        ten.add_gate(0, 0, qg.H(10, 0))
+        density = [e for e in planner.plan(ten, noise=True).estimates
+                   if e.strategy == "density_matrix"][0]
+        matrix = 16 * 4**10
+        self.assertLessEqual(density.memory,
+                             2 * matrix + 2 * qdm.ppt_chunk(10) * matrix)
+        self.assertLess(density.memory, 252 * matrix)
+
+
+if __name__ == '__main__':
+    unittest.main()
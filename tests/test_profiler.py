@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import unittest
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+import util.profiler as prof
+
+
+def ghz_circuit(n=4):
+    circuit = qc.QuantumCircuit(qb.Qubit(n, 0), n)
+    circuit.add_gate(0, 0, qg.H(n, 0))
+    for q in range(1, n):
+        circuit.add_gate(q, q, qg.X(n, q, q - 1))
+    return circuit
+
+
+class TestProfiler(unittest.TestCase):
+
+    def tearDown(self):
+        prof.disable()
+        prof.reset()
+
+    def test_disabled(self):
+        prof.disable()
+        prof.reset()
+        circuit = ghz_circuit()
+        circuit.calculate_entanglement()
+        self.assertEqual(prof.snapshot(), {"counters": {}, "timers": {}})
+
+    def test_profile(self):
+        circuit = ghz_circuit()
+        with prof.Profile() as profile:
+            circuit.calculate_entanglement()
+        self.assertFalse(prof.enabled())
+        counters, timers = profile.stats["counters"], profile.stats["timers"]
+        # reorder applies its Swap gates through the engine as well
+        self.assertEqual(counters["engine.gates_applied"],
+                         4 + counters["entanglement.swaps"])
+        self.assertEqual(counters["circuit.columns_simulated"], 4)
+        self.assertGreater(counters["entanglement.cuts"], 0)
+        for name in ("circuit.calculate_columns", "engine.apply_gate",
+                     "entanglement.entanglement", "entanglement.proportional",
+                     "circuit.calculate_entanglement"):
+            self.assertGreater(timers[name]["calls"], 0)
+            self.assertGreaterEqual(timers[name]["seconds"], 0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.json")
+            profile.dump(path)
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(json.load(file), profile.stats)
+
+    def test_optimized(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(2, 0), 3)
+        circuit.add_gate(0, 0, qg.H(2, 0))
+        circuit.add_gate(1, 1, qg.X(2, 1, 0))
+        with prof.Profile() as profile:
+            circuit.calculate_qubit_state(optimize=True)
+        # the empty last column reuses the state of column 1
+        self.assertEqual(
+            profile.stats["counters"]["circuit.columns_simulated"], 2)
+        self.assertEqual(
+            profile.stats["counters"]["circuit.columns_reused"], 1)
+        self.assertEqual(
+            profile.stats["timers"]["circuit.calculate_optimized"]["calls"], 1)
+
+    def test_profile_keeps_registry(self):
+        prof.enable()
+        prof.count("outer", 2)
+        with prof.Profile() as profile:
+            prof.count("outer")
+            prof.count("inner")
+        self.assertTrue(prof.enabled())
+        self.assertEqual(profile.stats["counters"], {"inner": 1, "outer": 1})
+        self.assertEqual(prof.snapshot()["counters"], {"inner": 1, "outer": 3})
+
+    def test_gate_construction(self):
+        with prof.Profile() as profile:
+            gate = qg.X(3, 0, 1)
+            gate.mat
+            gate.mat
+        self.assertEqual(profile.stats["counters"]["gates.construct"], 1)
+        self.assertEqual(
+            profile.stats["timers"]["gates.form_matrix"]["calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
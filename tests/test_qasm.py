@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import circuit.qasm as qasm
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+
+Program = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg a[2];
+qreg b[1];
+creg c[3];
+h a[0];  // superpose
+cx a[0],a[1]; rz(-pi/4) b[0];
+ccx a[0],a[1],
+    b[0];
+barrier a;
+cp(pi/2) b[0],a[1];
+swap a[0],b[0];
+x a;
+measure a[0] -> c[0];
+"""
+
+
+class TestQasm(unittest.TestCase):
+
+    def test_parse(self):
+        program = qasm.loads(Program)
+        self.assertEqual(program.n, 3)
+        self.assertEqual(program.unsupported, [])
+        kinds = [record[:3] for record in program.records]
+        self.assertEqual(kinds, [("H", 0, ()), ("X", 1, (0,)), ("RZ", 2, ()),
+                                 ("X", 2, (0, 1)), ("barrier", None, (0, 1)),
+                                 ("Phase", 1, (2,)), ("Swap", 2, (0,)),
+                                 ("X", 0, ()), ("X", 1, ())])
+        self.assertAlmostEqual(program.records[2][3], -np.pi / 4)
+        self.assertEqual(program.records[3][4], 8)
+
+    def test_to_circuit(self):
+        circuit = qasm.to_circuit(qasm.loads(Program))
+        self.assertEqual(circuit._shape, (3, 6))
+        self.assertIsInstance(circuit._gate_list[1][1], qg.X)
+        self.assertIsInstance(circuit._gate_list[2][0], qg.RZ)
+        # the barrier keeps the cp out of the ccx column
+        self.assertIsInstance(circuit._gate_list[1][3], qg.Phase)
+
+    def test_unsupported(self):
+        program = qasm.loads("qreg q[2];\nh q[0];\nu3(0,0,0) q[1];\n"
+                             "cx q[0],q[5];\nreset q[0];\n")
+        self.assertEqual([number for number, _ in program.unsupported],
+                         [3, 4, 5])
+        with self.assertRaises(ValueError) as context:
+            qasm.to_circuit(program)
+        self.assertIn("line 3", str(context.exception))
+        self.assertEqual(qasm.to_circuit(program, strict=False)._shape,
+                         (2, 1))
+
+    def test_repeated_operand(self):
+        program = qasm.loads("qreg q[2];\nh q[0];\ncx q[1],q[1];\n")
+        self.assertEqual(program.unsupported, [(3, "cx q[1],q[1]")])
+        with self.assertRaises(ValueError) as context:
+            qasm.to_circuit(program)
+        self.assertIn("line 3", str(context.exception))
+
+    def test_fast_import(self):
+        circuit = qasm.to_circuit(qasm.loads(
+            "qreg q[2];\nh q[0];\nh q[0];\ncx q[0],q[1];\n"))
+        self.assertEqual(circuit._history, [])
+        self.assertFalse(circuit.undo())
+        # equal gates share one object
+        self.assertIs(circuit._gate_list[0][0], circuit._gate_list[0][1])
+
+    def test_register_width_mismatch(self):
+        program = qasm.loads("qreg q[2];\nqreg r[3];\ncx q, r;\n")
+        self.assertEqual([number for number, _ in program.unsupported], [3])
+        with self.assertRaises(ValueError) as context:
+            qasm.to_circuit(program)
+        self.assertIn("line 3", str(context.exception))
+
+    def test_round_trip(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0), 4)
+        circuit.add_gate(0, 0, qg.H(3, 0))
+        circuit.add_gate(2, 0, qg.RY(3, 2, theta=0.25))
+        circuit.add_gate(1, 1, qg.X(3, 1, 0, polarity=0))
+        circuit.add_gate(2, 2, qg.Z(3, 2, 1))
+        circuit.add_gate(0, 3, qg.Swap(3, 0, 2))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "circuit.qasm")
+            qasm.dump(circuit, path)
+            loaded = qasm.to_circuit(qasm.load(path))
+        self.assertTrue(np.allclose(loaded.final_state().mat,
+                                    circuit.final_state().mat))
+
+    def test_export_errors(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 0), 1)
+        circuit.add_gate(2, 0, qg.H(3, 2, [0, 1]))
+        with self.assertRaises(ValueError):
+            qasm.dumps(circuit)
+        circuit.add_gate(2, 0, qg.RX(3, 2, theta=qg.Parameter("a")))
+        with self.assertRaises(ValueError):
+            qasm.dumps(circuit)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -127,5 +127,23 @@ class TestQubit(unittest.TestCase):
                          [1, 2])  # Only the first two qubits are entangled
 
 
+    def test_ket(self):
+        """Kets skip tiny amplitudes, truncate to the largest terms and are
+        cached per state."""
+        qubit = qb.Qubit(3)
+        qubit.mat = np.array([[0.6], [1e-9], [0], [0], [0], [0.8j], [0], [0]],
+                             dtype=np.complex128)
+        self.assertEqual(qubit.ket(), "0.600|000> + 0.800j|101>")
+        self.assertEqual(qubit.ket(top_k=1), "0.800j|101> + 1 more term")
+        self.assertIs(qubit.ket(), qubit.ket())
+        qubit.mat = qb.Qubit(3, 4).mat
+        self.assertEqual(str(qubit), "1.000|100>")
+
+        state = np.full((2**12, 1), 2**-6, dtype=np.complex128)
+        state[7, 0] = 0.5
+        self.assertEqual(qb.format_ket(state, top_k=1),
+                         "0.500|000000000111> + 4095 more terms")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+
+
+class TestSchedule(unittest.TestCase):
+
+    def setUp(self):
+        # a staircase drawn one gate per column
+        self.circuit = qc.QuantumCircuit(qb.Qubit(4, 0), 7)
+        self.circuit.add_gate(0, 0, qg.H(4, 0))
+        self.circuit.add_gate(2, 1, qg.H(4, 2))
+        self.circuit.add_gate(1, 2, qg.X(4, 1, 0))
+        self.circuit.add_gate(3, 3, qg.X(4, 3, 2))
+        self.circuit.add_gate(0, 4, qg.T(4, 0))
+        self.circuit.add_gate(2, 5, qg.Z(4, 2, 1))
+
+    def test_layers(self):
+        layout = self.circuit.schedule()
+        self.assertEqual(layout.depth, 3)
+        self.assertEqual(self.circuit.depth, 3)
+        self.assertEqual(layout.layer_sizes, [2, 2, 2])
+        self.assertEqual(layout.gate_layers, [0, 0, 1, 1, 2, 2])
+        self.assertEqual(layout.column_layers,
+                         [None, 0, None, 1, None, 2, 2])
+
+    def test_layer_states(self):
+        layout, states = self.circuit.calculate_layer_states()
+        self.assertEqual(len(states), layout.depth)
+        columns = self.circuit.calculate_qubit_state()
+        for col, layer in enumerate(layout.column_layers):
+            if layer is not None:
+                self.assertTrue(np.allclose(columns[col].mat,
+                                            states[layer].mat))
+
+    def test_empty(self):
+        circuit = qc.QuantumCircuit(qb.Qubit(2, 0), 3)
+        layout = circuit.schedule()
+        self.assertEqual(layout.depth, 0)
+        self.assertEqual(layout.column_layers, [-1, -1, -1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import circuit.quantum_circuit as qc
+import qubit.gates as qg
+import qubit.qubit as qb
+import qubit.snapshot as qsnap
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_state_round_trip(self):
+        rng = np.random.default_rng(3)
+        state = qb.Qubit(5)
+        state.mat = rng.normal(size=(32, 1)) + 1j * rng.normal(size=(32, 1))
+        state.save(self.path("dense.snap"))
+        loaded = qb.Qubit.load(self.path("dense.snap"))
+        self.assertIsInstance(loaded.mat, np.memmap)
+        self.assertEqual(len(loaded), 5)
+        self.assertTrue(np.array_equal(loaded.mat, state.mat))
+        # copy-on-write: changing the loaded state leaves the file alone
+        loaded.mat[0, 0] = 7
+        self.assertTrue(np.array_equal(qb.Qubit.load(self.path("dense.snap"),
+                                                     mmap=False).mat,
+                                       state.mat))
+
+    def test_sparse_state(self):
+        state = qb.Qubit(10, 0)
+        state.mat[0, 0] = state.mat[1023, 0] = 2**-0.5
+        state.save(self.path("sparse.snap"), sparse=True)
+        self.assertLess(os.path.getsize(self.path("sparse.snap")), 128)
+        self.assertTrue(np.array_equal(
+            qb.Qubit.load(self.path("sparse.snap")).mat, state.mat))
+
+    def test_circuit_round_trip(self):
+        theta = qg.Parameter("theta")
+        circuit = qc.QuantumCircuit(qb.Qubit(3, 5), 4)
+        circuit.add_gate(0, 0, qg.H(3, 0))
+        circuit.add_gate(2, 0, qg.RY(3, 2, theta=theta))
+        circuit.add_gate(1, 1, qg.X(3, 1, [0, 2], polarity=[1, 0]))
+        circuit.add_gate(2, 2, qg.Phase(3, 2, 1, theta=0.4))
+        circuit.add_gate(0, 3, qg.Swap(3, 0, 1))
+        circuit.save(self.path("circuit.snap"), sparse=True)
+        loaded = qc.QuantumCircuit.load(self.path("circuit.snap"))
+
+        self.assertEqual(loaded._shape, circuit._shape)
+        self.assertEqual(loaded.parameters, ["theta"])
+        for row in range(3):
+            for col in range(4):
+                gate, other = circuit._gate_list[row][col], \
+                    loaded._gate_list[row][col]
+                self.assertEqual(gate is None, other is None)
+                if gate is not None:
+                    self.assertEqual(gate.signature(), other.signature())
+        values = {"theta": 0.9}
+        self.assertTrue(np.allclose(loaded.final_state(values).mat,
+                                    circuit.final_state(values).mat))
+
+    def test_wrong_kind(self):
+        qb.Qubit(2, 1).save(self.path("state.snap"))
+        with self.assertRaises(ValueError):
+            qsnap.read_circuit(self.path("state.snap"))
+
+
+if __name__ == '__main__':
+    unittest.main()
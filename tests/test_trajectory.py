@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import circuit.quantum_circuit as qc
+import circuit.trajectory as qtraj
+import qubit.gates as qg
+import qubit.noise as qn
+import qubit.qubit as qb
+
+
+def bell_circuit():
+    circuit = qc.QuantumCircuit(qb.Qubit(2, 0), 2)
+    circuit.add_gate(0, 0, qg.H(2, 0))
+    circuit.add_gate(1, 1, qg.X(2, 1, 0))
+    return circuit
+
+
+class TestTrajectory(unittest.TestCase):
+
+    def test_noiseless(self):
+        result = qtraj.simulate(bell_circuit(), None, max_trajectories=100,
+                                processes=1, seed=1)
+        self.assertTrue(result.converged)
+        self.assertEqual(result.trajectories, 50)
+        self.assertTrue(np.allclose(result.probabilities, [.5, 0, 0, .5]))
+        self.assertEqual(set(result.counts), {"00", "11"})
+        self.assertTrue(np.array_equal(result.entangled, [[0, 0], [1, 1]]))
+
+    def test_matches_density_matrix(self):
+        circuit = bell_circuit()
+        noise = qn.NoiseModel(qn.amplitude_damping(0.2))
+        expected = circuit.calculate_density_matrix(noise)[-1].probabilities()
+        result = qtraj.simulate(circuit, noise, max_trajectories=3000,
+                                tolerance=0.02, processes=1, seed=3,
+                                entanglement=False, batch_size=100)
+        self.assertTrue(result.converged)
+        self.assertIsNone(result.entangled)
+        self.assertTrue(np.all(abs(result.probabilities - expected) <
+                               2 * result.probability_error + 1e-9))
+
+    def test_reproducible_across_workers(self):
+        noise = qn.NoiseModel(qn.depolarizing(0.1))
+        kwargs = dict(max_trajectories=40, min_trajectories=20, tolerance=0,
+                      seed=11, batch_size=10)
+        serial = qtraj.simulate(bell_circuit(), noise, processes=1, **kwargs)
+        parallel = qtraj.simulate(bell_circuit(), noise, processes=2,
+                                  **kwargs)
+        self.assertFalse(serial.converged)
+        self.assertEqual(serial.trajectories, 40)
+        self.assertEqual(serial.counts, parallel.counts)
+        self.assertTrue(np.allclose(serial.probabilities,
+                                    parallel.probabilities))
+        self.assertTrue(np.array_equal(serial.entangled, parallel.entangled))
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            qtraj.simulate(bell_circuit(), None, max_trajectories=0,
+                           processes=1)
+        with self.assertRaises(ValueError):
+            qtraj.simulate(bell_circuit(), None, max_trajectories=10,
+                           min_trajectories=20, processes=1)
+
+
+if __name__ == '__main__':
+    unittest.main()